@@ -0,0 +1,20 @@
+"""
+Import paths
+============
+
+The shared helpers in src/tools (`http_pool`, `response_cache`,
+`tool_telemetry`) are imported as top-level modules by the API, the toolkits
+and the pattern engine, so each process loads a single copy of them (one
+session pool, one response cache, one telemetry context).
+
+Importing this module puts src/tools on sys.path; it is the only place that
+does. Import it before any of those helpers.
+"""
+
+import os
+import sys
+
+TOOLS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+if TOOLS_DIR not in sys.path:
+    sys.path.append(TOOLS_DIR)
@@ -0,0 +1,337 @@
+"""
+Analysis result cache
+=====================
+
+Two analyses of the same coin, currency and term type a few minutes apart are
+effectively identical, yet each costs a full agent run and dozens of upstream
+calls. `AnalysisCache` keeps successful `run_analysis` responses keyed by
+(coin_id, vs_currency, term_type):
+
+- Fresh for a per-term window (`ttl_by_term`, e.g. short 5 min, long 1 h):
+  answered straight from the cache.
+- Stale for `stale_seconds` more (stale-while-revalidate): still answered
+  instantly, while one background refresh per key runs on the analysis pool.
+  When the pool is saturated the refresh is skipped and retried on a later hit.
+- Single-flight per key: a request for a key that is already being analysed
+  (a concurrent miss, or a miss during a refresh) joins that analysis with
+  `join()` before taking a worker, instead of starting its own. Its progress
+  events are fanned out to every joined listener (earlier ones replayed first)
+  and all of them get the same response.
+- Bounded by `max_entries` with LRU eviction; with `path` set, entries are
+  mirrored to SQLite and reloaded on startup.
+
+Cached responses carry `meta.cache` = {status: fresh | stale | miss,
+age_seconds, refreshing}. Failed analyses are never cached.
+
+Configuration (env): ANALYSIS_CACHE_ENABLED (default true),
+ANALYSIS_CACHE_TTL_SHORT / _MEDIUM / _LONG (300 / 900 / 3600 seconds),
+ANALYSIS_CACHE_STALE_SECONDS (3600), ANALYSIS_CACHE_MAX_ENTRIES (256),
+ANALYSIS_CACHE_PATH (SQLite file; unset = memory only).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_TTL_BY_TERM = {"short": 300.0, "medium": 900.0, "long": 3600.0}
+
+CacheKey = Tuple[str, str, str]
+EventListener = Callable[[str, Any], None]
+
+
+class _Flight:
+    """One running analysis: its Future and the progress events sent to everyone waiting on it."""
+
+    def __init__(self):
+        self.future: Future = Future()
+        self._lock = threading.Lock()
+        self._events: List[Tuple[str, Any]] = []
+        self._listeners: List[EventListener] = []
+
+    def listen(self, on_event: EventListener) -> None:
+        """Replay the events emitted so far to `on_event`, then forward the next ones."""
+        with self._lock:
+            for event, data in self._events:
+                _notify(on_event, event, data)
+            self._listeners.append(on_event)
+
+    def emit(self, event: str, data: Any) -> None:
+        """`on_event` of the running analysis."""
+        with self._lock:
+            self._events.append((event, data))
+            for listener in self._listeners:
+                _notify(listener, event, data)
+
+
+class AnalysisCache:
+    """
+    Stale-while-revalidate LRU cache of whole analysis responses.
+
+    Args:
+        runner (Callable): run_analysis-like callable (coin_id, vs_currency=, term_type=, ...) -> response.
+        submit (Optional[Callable]): AnalysisPool.try_submit-like scheduler for background refreshes.
+        ttl_by_term (Dict[str, float]): Freshness window in seconds per term type.
+        stale_seconds (float): How long past freshness an entry is still served while refreshing.
+        max_entries (int): LRU bound.
+        path (Optional[str]): SQLite file mirroring the entries (None = memory only).
+        clock (Callable): Time source (seconds since epoch).
+    """
+
+    def __init__(self, runner: Callable[..., Dict[str, Any]],
+                 submit: Optional[Callable[..., Optional[Future]]] = None,
+                 ttl_by_term: Optional[Dict[str, float]] = None, stale_seconds: float = 3600.0,
+                 max_entries: int = 256, path: Optional[str] = None,
+                 clock: Callable[[], float] = time.time):
+        self.runner = runner
+        self.submit = submit
+        self.ttl_by_term = dict(ttl_by_term or DEFAULT_TTL_BY_TERM)
+        self.stale_seconds = max(0.0, float(stale_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._refreshing: set = set()
+        # Analyses running right now, one per key; later callers join it
+        self._computing: Dict[CacheKey, _Flight] = {}
+        self._stats = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "stores": 0, "coalesced": 0,
+                       "evictions": 0, "refreshes": 0, "refresh_skipped": 0}
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            self._open(path)
+
+    # ----------------------------- keys / freshness -----------------------------
+
+    def key(self, coin_id: str, vs_currency: str, term_type: str) -> CacheKey:
+        term = (term_type or "short").lower()
+        if term not in self.ttl_by_term:
+            term = "short"  # run_analysis falls back to short as well
+        return ((coin_id or "").strip().lower(), (vs_currency or "usd").strip().lower(), term)
+
+    def _ttl(self, key: CacheKey) -> float:
+        return float(self.ttl_by_term[key[2]])
+
+    # ----------------------------- public API -----------------------------
+
+    def lookup(self, coin_id: str, vs_currency: str, term_type: str) -> Optional[Dict[str, Any]]:
+        """Cached response (fresh or stale) or None; a stale hit schedules a background refresh."""
+        key = self.key(coin_id, vs_currency, term_type)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self._ttl(key) + self.stale_seconds:
+                self._delete(key)
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            created_at, response = entry
+            stale = now - created_at > self._ttl(key)
+            self._stats["stale_hits" if stale else "fresh_hits"] += 1
+        refreshing = self.refresh(*key) if stale else False
+        return _with_cache_meta(response, "stale" if stale else "fresh", now - created_at, refreshing)
+
+    def join(self, coin_id: str, vs_currency: str, term_type: str,
+             on_event: Optional[EventListener] = None) -> Optional[Future]:
+        """
+        Future of the analysis already running for this key, or None when there is none.
+
+        Call it before submitting to the pool: a joined request waits on the running
+        analysis without taking a worker. `on_event` receives that analysis' progress
+        events (the ones already emitted are replayed first); the Future resolves to
+        the response `compute` returns.
+        """
+        key = self.key(coin_id, vs_currency, term_type)
+        with self._lock:
+            flight = self._computing.get(key)
+            if flight is None:
+                return None
+            self._stats["coalesced"] += 1
+        if on_event is not None:
+            flight.listen(on_event)
+        joined: Future = Future()
+
+        def resolve(done: Future) -> None:
+            if done.exception() is not None:
+                joined.set_exception(done.exception())
+            else:
+                joined.set_result(_as_miss(done.result()))
+
+        flight.future.add_done_callback(resolve)
+        return joined
+
+    def compute(self, coin_id: str, **params: Any) -> Dict[str, Any]:
+        """
+        Run the analysis and cache it when it succeeded (no lookup).
+
+        If an analysis of the same key is already running (a caller that raced past
+        `join`), wait for it and return its response instead of running another one.
+        `params["on_event"]` is registered like a `join` listener.
+        """
+        vs_currency = params.get("vs_currency") or os.getenv("DEFAULT_VS_CURRENCY", "usd")
+        term_type = params.get("term_type", "short")
+        key = self.key(coin_id, vs_currency, term_type)
+        with self._lock:
+            flight = self._computing.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._computing[key] = _Flight()
+            else:
+                self._stats["coalesced"] += 1
+        if params.get("on_event") is not None:
+            flight.listen(params["on_event"])
+        if not leader:
+            return _as_miss(flight.future.result())
+        try:
+            response = self.runner(coin_id, **{**params, "on_event": flight.emit})
+            if isinstance(response, dict) and response.get("ok"):
+                # Stored before the key is released, so the next caller finds the entry
+                self.store(coin_id, vs_currency, term_type, response)
+            flight.future.set_result(response)
+        except BaseException as exc:
+            flight.future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._computing.pop(key, None)
+        return _as_miss(response)
+
+    def run(self, coin_id: str, **params: Any) -> Dict[str, Any]:
+        """Cached response when available, otherwise `compute` (job API runner)."""
+        vs_currency = params.get("vs_currency") or os.getenv("DEFAULT_VS_CURRENCY", "usd")
+        cached = self.lookup(coin_id, vs_currency, params.get("term_type", "short"))
+        return cached if cached is not None else self.compute(coin_id, **params)
+
+    def store(self, coin_id: str, vs_currency: str, term_type: str, response: Dict[str, Any]) -> None:
+        key = self.key(coin_id, vs_currency, term_type)
+        created_at = self.clock()
+        with self._lock:
+            self._entries[key] = (created_at, response)
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analises (chave, resposta, criado_em) VALUES (?, ?, ?)",
+                    (json.dumps(key), json.dumps(response, default=str), created_at))
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._delete(oldest)
+                self._stats["evictions"] += 1
+
+    def refresh(self, coin_id: str, vs_currency: str, term_type: str) -> bool:
+        """Schedule one background re-run of this key; True while a refresh is running for it."""
+        if self.submit is None:
+            return False
+        key = self.key(coin_id, vs_currency, term_type)
+        with self._lock:
+            if key in self._refreshing or key in self._computing:
+                return True
+            self._refreshing.add(key)
+        future = self.submit(self._refresh, key)
+        with self._lock:
+            if future is None:
+                self._refreshing.discard(key)
+                self._stats["refresh_skipped"] += 1
+                return False
+            self._stats["refreshes"] += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._stats["fresh_hits"] + self._stats["stale_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": self._conn is not None,
+                "ttl_by_term": dict(self.ttl_by_term),
+                "stale_seconds": self.stale_seconds,
+                "refreshing": len(self._refreshing),
+                "computing": len(self._computing),
+                **self._stats,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM analises")
+
+    # ----------------------------- internals -----------------------------
+
+    def _refresh(self, key: CacheKey) -> None:
+        coin_id, vs_currency, term_type = key
+        try:
+            self.compute(coin_id, vs_currency=vs_currency, term_type=term_type)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _delete(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM analises WHERE chave = ?", (json.dumps(key),))
+
+    def _open(self, path: str) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analises ("
+            " chave TEXT PRIMARY KEY, resposta TEXT NOT NULL, criado_em REAL NOT NULL)")
+        now = self.clock()
+        rows = self._conn.execute(
+            "SELECT chave, resposta, criado_em FROM analises ORDER BY criado_em DESC LIMIT ?",
+            (self.max_entries,)).fetchall()
+        # Oldest first so the most recent entries end up at the LRU tail
+        for chave, resposta, criado_em in reversed(rows):
+            key = tuple(json.loads(chave))
+            if key[2] in self.ttl_by_term and now - criado_em <= self._ttl(key) + self.stale_seconds:
+                self._entries[key] = (criado_em, json.loads(resposta))
+        self._conn.execute(
+            "DELETE FROM analises WHERE criado_em < ?",
+            (now - max(self.ttl_by_term.values()) - self.stale_seconds,))
+
+
+def _with_cache_meta(response: Dict[str, Any], status: str, age: float, refreshing: bool) -> Dict[str, Any]:
+    """Shallow copy of `response` with meta.cache filled (the cached object is never mutated)."""
+    meta = dict(response.get("meta") or {})
+    meta["cache"] = {"status": status, "age_seconds": round(age, 1), "refreshing": refreshing}
+    return {**response, "meta": meta}
+
+
+def _as_miss(response: Dict[str, Any]) -> Dict[str, Any]:
+    """`compute` result: successful responses get meta.cache status miss, failures are returned as is."""
+    if isinstance(response, dict) and response.get("ok"):
+        return _with_cache_meta(response, "miss", 0.0, False)
+    return response
+
+
+def _notify(listener: EventListener, event: str, data: Any) -> None:
+    """Deliver one event; a failing listener never breaks the analysis or the other listeners."""
+    try:
+        listener(event, data)
+    except Exception:
+        pass
+
+
+def analysis_cache_from_env(runner: Callable[..., Dict[str, Any]],
+                            submit: Optional[Callable[..., Optional[Future]]] = None) -> Optional[AnalysisCache]:
+    """AnalysisCache configured from ANALYSIS_CACHE_* (None when ANALYSIS_CACHE_ENABLED=false)."""
+    if os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() in ("false", "0", "off"):
+        return None
+    ttl_by_term = {term: float(os.getenv(f"ANALYSIS_CACHE_TTL_{term.upper()}", default))
+                   for term, default in DEFAULT_TTL_BY_TERM.items()}
+    return AnalysisCache(
+        runner, submit=submit, ttl_by_term=ttl_by_term,
+        stale_seconds=float(os.getenv("ANALYSIS_CACHE_STALE_SECONDS", "3600")),
+        max_entries=int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "256")),
+        path=os.getenv("ANALYSIS_CACHE_PATH") or None,
+    )
@@ -0,0 +1,214 @@
+"""
+Deterministic prefetch
+======================
+
+Every analysis needs the same data sources no matter what the LLM decides:
+CoinGecko market data and technical analysis, the deterministic technical
+signal, the Fear & Greed index, CoinDesk news and `detect_patterns`. Fetched by
+the agent, they cost one tool call (and one LLM round trip) each, in sequence.
+
+`AnalysisPrefetcher.start()` submits all of them at once, as soon as the request
+arrives, on a dedicated thread pool (never the analysis pool, whose workers are
+the ones waiting). `PrefetchHandle.wait()` returns whatever finished within the
+timeout, and `as_prompt_context()` renders those results for the agent prompt,
+so the stage costs roughly the slowest source instead of the sum of all.
+
+Tasks run in a copy of the caller's context, so the per-request tool telemetry
+(`tool_telemetry.collect`) records them like agent tool calls. Each result keeps
+the structured values behind its text in `PrefetchResult.data` (the toolkits'
+`fetch_*_data` dicts, or the parsed JSON of the JSON tools), so consumers such
+as `/analyze/stream` never parse the rendered text.
+
+Configuration (env): PREFETCH_ENABLED (default true), PREFETCH_MAX_WORKERS
+(default 6 per analysis worker, so concurrent analyses do not queue),
+PREFETCH_TIMEOUT_SECONDS (default 60), PREFETCH_MAX_CHARS (per result in the
+prompt, default 8000).
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Analysis range (days) used for the prefetched technical analysis per term type
+PREFETCH_DAYS_BY_TERM = {"short": "30", "medium": "90", "long": "365"}
+# Sources submitted per analysis (see `AnalysisPrefetcher.tasks`)
+PREFETCH_TASKS_PER_ANALYSIS = 6
+
+# (text shown to the agent, structured values behind it or None)
+_Output = Tuple[str, Optional[Dict[str, Any]]]
+
+
+class PrefetchResult(NamedTuple):
+    label: str
+    value: Optional[str]
+    error: Optional[str]
+    seconds: float
+    data: Optional[Dict[str, Any]] = None
+
+
+class PrefetchHandle:
+    """Futures of one request's prefetch; results are read with `wait()`."""
+
+    def __init__(self, futures: Dict[str, Any], labels: Dict[str, str], started: float):
+        self._futures = futures
+        self._labels = labels
+        self._started = started
+        self._results: Optional[Dict[str, PrefetchResult]] = None
+        self.elapsed = 0.0
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, PrefetchResult]:
+        """Results finished within `timeout` seconds; late tasks are left out (the agent can still call them)."""
+        if self._results is None:
+            done, _ = wait(list(self._futures.values()), timeout=timeout)
+            self._results = {name: _result_of(self._labels[name], future)
+                             for name, future in self._futures.items() if future in done}
+            self.elapsed = time.time() - self._started
+        return self._results
+
+    def get(self, name: str) -> Optional[str]:
+        """Successful result of task `name` (None if failed, late or not waited for)."""
+        result = (self._results or {}).get(name)
+        return result.value if result is not None else None
+
+    def as_prompt_context(self, max_chars: int = 8000) -> str:
+        """Prompt section with each finished result, truncated to `max_chars`."""
+        lines: List[str] = []
+        for result in (self._results or {}).values():
+            if result.value is None:
+                continue
+            text = result.value
+            if len(text) > max_chars:
+                text = text[:max_chars] + "\n... (truncated; call the tool for the full output)"
+            lines.append(f"### {result.label}\n{text}")
+        if not lines:
+            return ""
+        header = ("PREFETCHED TOOL RESULTS (already fetched for this request - use them directly "
+                  "and do NOT call these tools again with the same arguments):")
+        return header + "\n\n" + "\n\n".join(lines)
+
+    def stats(self) -> Dict[str, Any]:
+        results = self._results or {}
+        return {
+            "tasks": len(self._futures),
+            "completed": sum(1 for r in results.values() if r.error is None),
+            "failed": sum(1 for r in results.values() if r.error is not None),
+            "late": len(self._futures) - len(results),
+            "elapsed_seconds": round(self.elapsed, 2),
+            "slowest_seconds": round(max((r.seconds for r in results.values()), default=0.0), 2),
+            "sum_seconds": round(sum(r.seconds for r in results.values()), 2),
+        }
+
+
+class AnalysisPrefetcher:
+    """
+    Starts the deterministic data sources of an analysis concurrently.
+
+    Args:
+        coingecko: CoinGeckoToolKit instance.
+        fear_greed: FearGreedToolKit instance.
+        coindesk: CoinDeskToolKit instance.
+        patterns: PatternToolKit instance.
+        max_workers (int): Threads shared by all concurrent prefetches.
+        news_limit (int): Articles requested from CoinDesk.
+    """
+
+    def __init__(self, coingecko: Any, fear_greed: Any, coindesk: Any, patterns: Any,
+                 max_workers: int = 24, news_limit: int = 10):
+        self.coingecko = coingecko
+        self.fear_greed = fear_greed
+        self.coindesk = coindesk
+        self.patterns = patterns
+        self.news_limit = news_limit
+        self.max_workers = max(1, int(max_workers))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._started = 0
+
+    def tasks(self, coin_id: str, vs_currency: str, term_type: str) -> List[Tuple[str, str, Callable[[], _Output]]]:
+        """(name, label shown to the agent, call returning (text, data)) for every prefetched source."""
+        days = PREFETCH_DAYS_BY_TERM.get(term_type, "30")
+        cg, fg, c, v = self.coingecko, self.fear_greed, coin_id, vs_currency
+        return [
+            ("market_data", f"CoinGeckoToolKit.get_market_data(coin_id='{c}', vs_currency='{v}')",
+             lambda: _formatted(cg.fetch_market_data(c, v), cg.format_market_data)),
+            ("technical_analysis",
+             f"CoinGeckoToolKit.perform_technical_analysis(coin_id='{c}', vs_currency='{v}', days='{days}')",
+             lambda: (cg.perform_technical_analysis(c, v, days), None)),
+            ("technical_signal",
+             f"CoinGeckoToolKit.calculate_deterministic_technical_signal(coin_id='{c}', vs_currency='{v}', days='{days}')",
+             lambda: _with_json(cg.calculate_deterministic_technical_signal(c, v, days))),
+            ("fear_greed", "FearGreedToolKit.get_current_fear_greed()",
+             lambda: _formatted(fg.fetch_fear_greed_data(), fg.format_fear_greed)),
+            ("news", f"CoinDeskToolKit.get_latest_articles(limit={self.news_limit})",
+             lambda: (self.coindesk.get_latest_articles(limit=self.news_limit), None)),
+            ("patterns",
+             f"PatternToolKit.detect_patterns(coin_id='{c}', vs_currency='{v}', term_type='{term_type}', save_csv=false)",
+             lambda: _with_json(self.patterns.detect_patterns(coin_id=c, vs_currency=v, term_type=term_type,
+                                                              save_csv=False))),
+        ]
+
+    def start(self, coin_id: str, vs_currency: str, term_type: str,
+              on_result: Optional[Callable[[str, PrefetchResult], None]] = None) -> PrefetchHandle:
+        """Submit every source and return immediately; `on_result(name, result)` fires as each one finishes."""
+        started = time.time()
+        futures: Dict[str, Any] = {}
+        labels: Dict[str, str] = {}
+        for name, label, call in self.tasks(coin_id, vs_currency, term_type):
+            labels[name] = label
+            futures[name] = self._executor.submit(contextvars.copy_context().run, _timed, call)
+            if on_result is not None:
+                futures[name].add_done_callback(
+                    lambda future, name=name, label=label: on_result(name, _result_of(label, future)))
+        with self._lock:
+            self._started += 1
+        return PrefetchHandle(futures, labels, started)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"prefetches": self._started, "max_workers": self.max_workers}
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+def _result_of(label: str, future: Any) -> PrefetchResult:
+    try:
+        (value, data), seconds = future.result()
+        return PrefetchResult(label, value, None, seconds, data)
+    except Exception as exc:
+        return PrefetchResult(label, None, str(exc), 0.0)
+
+
+def _timed(call: Callable[[], _Output]) -> Tuple[_Output, float]:
+    started = time.perf_counter()
+    output = call()
+    return output, time.perf_counter() - started
+
+
+def _formatted(values: Dict[str, Any], render: Callable[[Dict[str, Any]], str]) -> _Output:
+    """Text the agent would get from the tool, plus the values it was rendered from."""
+    return render(values), values
+
+
+def _with_json(text: str) -> _Output:
+    """Output of a tool that answers in JSON, with its parsed object (None if it is not a JSON object)."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text, None
+    return text, data if isinstance(data, dict) else None
+
+
+def prefetcher_from_env(coingecko: Any, fear_greed: Any, coindesk: Any, patterns: Any,
+                        analysis_workers: int = 4) -> Optional[AnalysisPrefetcher]:
+    """Prefetcher sized for `analysis_workers` concurrent analyses (None when PREFETCH_ENABLED=false)."""
+    if os.getenv("PREFETCH_ENABLED", "true").lower() in ("false", "0", "off"):
+        return None
+    default_workers = PREFETCH_TASKS_PER_ANALYSIS * max(1, int(analysis_workers))
+    return AnalysisPrefetcher(coingecko, fear_greed, coindesk, patterns,
+                              max_workers=int(os.getenv("PREFETCH_MAX_WORKERS", default_workers)))
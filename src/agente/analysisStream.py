@@ -0,0 +1,111 @@
+"""
+Analysis event streaming
+========================
+
+`POST /analyze/stream` answers with Server-Sent Events while `run_analysis`
+works on the worker pool, so the client gets its first bytes immediately and
+can render the analysis section by section:
+
+- `accepted` / `started`: the request was admitted / picked up by a worker.
+- `tool`: one finished tool call (toolkit, function, duration_ms, bytes_returned,
+  http_requests, error), from the per-request tool telemetry.
+- `obtainable`: `ObtainableData` fields as soon as a prefetched source yields
+  them (partial dicts), then the complete section once the agent is done.
+- `thoughts`, `metadata`: the remaining `CryptoAnalysis` sections.
+- `done`: the same response body `/analyze` returns.
+
+`AnalysisEventStream` bridges the worker thread (`emit`) and the event loop
+(`events`); `obtainable_from_source` maps the structured values of a prefetched
+source (`PrefetchResult.data`) to fields.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+STREAM_HEARTBEAT_SECONDS = 15.0
+_CLOSED = object()
+
+# ObtainableData field <- key of the CoinGeckoToolKit.fetch_market_data values
+_MARKET_FIELDS = {
+    "price_current": "price",
+    "price_change_24h": "price_change_24h",
+    "market_cap": "market_cap",
+    "volume_24h": "volume_24h",
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """One Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def obtainable_from_source(name: str, data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """`ObtainableData` fields known from the structured values of one prefetched source (`PrefetchResult.data`)."""
+    fields: Dict[str, Any] = {}
+    if not data:
+        return fields
+    if name == "market_data":
+        for field, key in _MARKET_FIELDS.items():
+            if isinstance(data.get(key), (int, float)):
+                fields[field] = data[key]
+    elif name == "fear_greed":
+        if isinstance(data.get("value"), int):
+            fields["fear_greed_value"] = data["value"]
+        if data.get("classification"):
+            fields["fear_greed_classification"] = data["classification"]
+    elif name == "technical_signal":
+        breakdown = data.get("breakdown") or {}
+        if "rsi" in breakdown:
+            fields["rsi"] = breakdown["rsi"].get("value")
+        if "macd" in breakdown:
+            fields["macd_signal"] = "bullish" if breakdown["macd"].get("score", 0) > 0 else "bearish"
+        for sma in ("sma_20", "sma_50", "sma_200"):
+            if sma in breakdown:
+                fields[sma] = breakdown[sma].get("sma")
+    elif name == "patterns":
+        if data.get("ok"):
+            fields["patterns_found_count"] = data.get("found_count", 0)
+            fields["patterns_sample"] = [
+                {k: r.get(k) for k in ("padrao_tipo", "score_total", "timeframe", "strategy")}
+                for r in (data.get("sample") or [])
+            ]
+    return fields
+
+
+class AnalysisEventStream:
+    """
+    Thread-safe event channel from one analysis to its SSE response.
+
+    Args:
+        loop: Event loop of the streaming response (events are queued on it).
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._queue: "asyncio.Queue[Any]" = asyncio.Queue()
+
+    def emit(self, event: str, data: Any) -> None:
+        """Queue an event; callable from any thread, never raises into the analysis."""
+        self._put((event, data))
+
+    def close(self) -> None:
+        self._put(_CLOSED)
+
+    def _put(self, item: Any) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        except RuntimeError:
+            pass  # loop closed (server shutting down): the analysis keeps going unobserved
+
+    async def events(self, heartbeat: float = STREAM_HEARTBEAT_SECONDS) -> AsyncIterator[Optional[Tuple[str, Any]]]:
+        """Queued events until `close()`; yields None after `heartbeat` idle seconds."""
+        while True:
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if item is _CLOSED:
+                return
+            yield item
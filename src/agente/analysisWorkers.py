@@ -0,0 +1,455 @@
+"""
+Analysis worker pool
+====================
+
+Runs the synchronous `run_analysis` (LLM + tools, minutes long) off the uvicorn
+event loop, on a bounded thread pool with admission control: at most
+`max_workers` analyses run at once and at most `max_queue` wait for a worker.
+Anything beyond that is rejected immediately so the API can answer 429 instead
+of piling up requests.
+
+Configuration (env): ANALYSIS_MAX_WORKERS (default 4), ANALYSIS_MAX_QUEUE (default 8).
+
+The same pool backs the asynchronous job API (`JobManager`): a job is recorded
+in a bounded job store (memory or SQLite, with expiry) and executed by the pool.
+`AgentPool` keeps pre-built agents per term type so requests skip construction.
+"""
+
+import copy
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+
+class AnalysisPool:
+    """
+    Bounded thread pool with admission control.
+
+    Args:
+        max_workers (int): Analyses running concurrently.
+        max_queue (int): Admitted analyses allowed to wait for a free worker.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 8):
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="analysis")
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._stats = {"accepted": 0, "rejected": 0, "completed": 0, "failed": 0}
+        self._queue_wait_total = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def try_submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Optional[Future]:
+        """Schedule `fn` if there is room; returns None when the pool is saturated."""
+        with self._lock:
+            if self._admitted >= self.capacity:
+                self._stats["rejected"] += 1
+                return None
+            self._admitted += 1
+            self._stats["accepted"] += 1
+        submitted_at = time.monotonic()
+
+        def run() -> Any:
+            with self._lock:
+                self._running += 1
+                self._queue_wait_total += time.monotonic() - submitted_at
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                with self._lock:
+                    self._stats["failed"] += 1
+                raise
+            else:
+                with self._lock:
+                    self._stats["completed"] += 1
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._admitted -= 1
+
+        try:
+            return self._executor.submit(run)
+        except RuntimeError:
+            # Executor shut down: release the slot taken above
+            with self._lock:
+                self._admitted -= 1
+                self._stats["accepted"] -= 1
+                self._stats["rejected"] += 1
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            started = self._stats["completed"] + self._stats["failed"] + self._running
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                **self._stats,
+                "avg_queue_wait_seconds": round(self._queue_wait_total / started, 3) if started else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+def pool_from_env() -> AnalysisPool:
+    """AnalysisPool sized by ANALYSIS_MAX_WORKERS / ANALYSIS_MAX_QUEUE."""
+    return AnalysisPool(
+        max_workers=int(os.getenv("ANALYSIS_MAX_WORKERS", "4")),
+        max_queue=int(os.getenv("ANALYSIS_MAX_QUEUE", "8")),
+    )
+
+
+class AgentPool:
+    """
+    Pre-built, reusable objects (agents) grouped by key (term type).
+
+    `acquire` hands out an idle instance, building a new one while fewer than
+    `size_per_key` exist for that key, and otherwise blocks until one is
+    released. `release` runs `reset` (per-request state cleanup) before the
+    instance becomes available again; an instance whose reset fails is dropped.
+
+    Args:
+        factory (Callable): key -> new instance.
+        size_per_key (int): Maximum instances per key (match the worker count).
+        reset (Optional[Callable]): instance -> None, called on release.
+    """
+
+    def __init__(self, factory: Callable[[str], Any], size_per_key: int = 4,
+                 reset: Optional[Callable[[Any], None]] = None):
+        self.factory = factory
+        self.size_per_key = max(1, int(size_per_key))
+        self.reset = reset
+        self._lock = threading.Lock()
+        self._idle: Dict[str, "queue.LifoQueue[Any]"] = {}
+        self._created: Dict[str, int] = {}
+        self._stats = {"acquired": 0, "built_on_demand": 0, "waited": 0, "discarded": 0}
+
+    def _queue(self, key: str) -> "queue.LifoQueue[Any]":
+        with self._lock:
+            return self._idle.setdefault(key, queue.LifoQueue())
+
+    def warm(self, keys, per_key: Optional[int] = None) -> None:
+        """Build instances up front (server startup) so requests never pay construction."""
+        target = self.size_per_key if per_key is None else min(int(per_key), self.size_per_key)
+        for key in keys:
+            idle = self._queue(key)
+            while True:
+                with self._lock:
+                    if self._created.get(key, 0) >= target:
+                        break
+                    self._created[key] = self._created.get(key, 0) + 1
+                try:
+                    idle.put(self.factory(key))
+                except BaseException:
+                    with self._lock:
+                        self._created[key] -= 1
+                    raise
+
+    def acquire(self, key: str, timeout: Optional[float] = None) -> Any:
+        idle = self._queue(key)
+        try:
+            instance = idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                build = self._created.get(key, 0) < self.size_per_key
+                if build:
+                    self._created[key] = self._created.get(key, 0) + 1
+                    self._stats["built_on_demand"] += 1
+                else:
+                    self._stats["waited"] += 1
+            if build:
+                try:
+                    instance = self.factory(key)
+                except BaseException:
+                    with self._lock:
+                        self._created[key] -= 1
+                    raise
+            else:
+                instance = idle.get(timeout=timeout)
+        with self._lock:
+            self._stats["acquired"] += 1
+        return instance
+
+    def release(self, key: str, instance: Any) -> None:
+        try:
+            if self.reset is not None:
+                self.reset(instance)
+        except Exception:
+            with self._lock:
+                self._created[key] -= 1
+                self._stats["discarded"] += 1
+            return
+        self._queue(key).put(instance)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size_per_key": self.size_per_key,
+                "created": sum(self._created.values()),
+                "idle": {k: q.qsize() for k, q in self._idle.items()},
+                **self._stats,
+            }
+
+
+# ----------------------------- job API support -----------------------------
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_FINISHED = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+def _utc_iso() -> str:
+    return datetime.utcnow().isoformat()
+
+
+class InMemoryJobStore:
+    """
+    Bounded in-process job store.
+
+    Finished jobs are kept for `retention_seconds`; when more than `max_jobs`
+    records exist the oldest finished ones are dropped first.
+    """
+
+    def __init__(self, max_jobs: int = 500, retention_seconds: float = 3600.0):
+        self.max_jobs = max(1, int(max_jobs))
+        self.retention_seconds = float(retention_seconds)
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._expires: Dict[str, float] = {}
+
+    def create(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        job = {"job_id": str(uuid.uuid4()), "status": JOB_QUEUED, "request": dict(request),
+               "created_at": _utc_iso(), "started_at": None, "finished_at": None,
+               "progress": [], "result": None, "error": None}
+        with self._lock:
+            self._purge(time.time())
+            self._jobs[job["job_id"]] = job
+        return copy.deepcopy(job)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            if job["status"] in JOB_FINISHED:
+                self._expires[job_id] = time.time() + self.retention_seconds
+
+    def add_progress(self, job_id: str, event: Dict[str, Any]) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["progress"].append(dict(event, at=_utc_iso()))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._purge(time.time())
+            job = self._jobs.get(job_id)
+            return copy.deepcopy(job) if job is not None else None
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._expires.pop(job_id, None)
+
+    def _purge(self, now: float) -> None:
+        for job_id in [j for j, exp in self._expires.items() if exp <= now]:
+            self._jobs.pop(job_id, None)
+            self._expires.pop(job_id, None)
+        excess = len(self._jobs) - self.max_jobs
+        if excess > 0:
+            finished = [j for j in self._jobs if j in self._expires]
+            for job_id in finished[:excess]:
+                self._jobs.pop(job_id, None)
+                self._expires.pop(job_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return {"backend": "memory", "jobs": len(self._jobs), "by_status": counts}
+
+
+class SQLiteJobStore:
+    """
+    Job store persisted in SQLite (JSON payload per job), same API as InMemoryJobStore.
+
+    Jobs that were queued or running when the process stopped are marked failed
+    on startup, since their worker is gone.
+    """
+
+    def __init__(self, path: str, max_jobs: int = 500, retention_seconds: float = 3600.0):
+        self.path = path
+        self.max_jobs = max(1, int(max_jobs))
+        self.retention_seconds = float(retention_seconds)
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY, dados TEXT NOT NULL,"
+            " criado_em REAL NOT NULL, expira_em REAL)")
+        for job_id, dados in self._conn.execute(
+                "SELECT job_id, dados FROM jobs WHERE expira_em IS NULL").fetchall():
+            job = json.loads(dados)
+            job.update(status=JOB_FAILED, finished_at=_utc_iso(),
+                       error="Server restarted before the job finished")
+            self._write(job, time.time() + self.retention_seconds)
+
+    def _write(self, job: Dict[str, Any], expires_at: Optional[float]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs (job_id, dados, criado_em, expira_em) VALUES "
+            "(?, ?, COALESCE((SELECT criado_em FROM jobs WHERE job_id = ?), ?), ?)",
+            (job["job_id"], json.dumps(job, default=str), job["job_id"], time.time(), expires_at))
+
+    def _read(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT dados FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def create(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        job = {"job_id": str(uuid.uuid4()), "status": JOB_QUEUED, "request": dict(request),
+               "created_at": _utc_iso(), "started_at": None, "finished_at": None,
+               "progress": [], "result": None, "error": None}
+        with self._lock:
+            self._purge(time.time())
+            self._write(job, None)
+        return job
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            job = self._read(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            expires_at = time.time() + self.retention_seconds if job["status"] in JOB_FINISHED else None
+            self._write(job, expires_at)
+
+    def add_progress(self, job_id: str, event: Dict[str, Any]) -> None:
+        with self._lock:
+            job = self._read(job_id)
+            if job is not None:
+                job["progress"].append(dict(event, at=_utc_iso()))
+                self._write(job, None)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._purge(time.time())
+            return self._read(job_id)
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def _purge(self, now: float) -> None:
+        self._conn.execute("DELETE FROM jobs WHERE expira_em IS NOT NULL AND expira_em <= ?", (now,))
+        total = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        if total > self.max_jobs:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE job_id IN (SELECT job_id FROM jobs WHERE expira_em IS NOT NULL"
+                " ORDER BY criado_em LIMIT ?)", (total - self.max_jobs,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for (dados,) in self._conn.execute("SELECT dados FROM jobs").fetchall():
+                status = json.loads(dados)["status"]
+                counts[status] = counts.get(status, 0) + 1
+            return {"backend": "sqlite", "jobs": sum(counts.values()), "by_status": counts}
+
+
+class JobManager:
+    """
+    Asynchronous analysis jobs on top of an AnalysisPool.
+
+    `submit` records the job and hands it to the pool (whose worker threads pull
+    from its queue); it returns None when the pool is saturated. The job keeps
+    running if the client disconnects; its state is read back with `get`.
+
+    Args:
+        pool (AnalysisPool): Shared pool, so jobs and /analyze share one concurrency cap.
+        store: InMemoryJobStore or SQLiteJobStore.
+        runner (Callable): run_analysis-like callable returning {"ok": bool, ...}.
+        join (Optional[Callable]): AnalysisCache.join-like lookup (request fields -> Future
+            or None); a job whose analysis is already running follows it without a worker.
+    """
+
+    def __init__(self, pool: AnalysisPool, store, runner: Callable[..., Dict[str, Any]],
+                 join: Optional[Callable[..., Optional[Future]]] = None):
+        self.pool = pool
+        self.store = store
+        self.runner = runner
+        self.join = join
+
+    def submit(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        running = self.join(**request) if self.join is not None else None
+        job = self.store.create(request)
+        if running is not None:
+            self._start(job["job_id"])
+            running.add_done_callback(lambda future: self._finish_from(job["job_id"], future))
+            return job
+        if self.pool.try_submit(self._run, job["job_id"], request) is None:
+            self.store.delete(job["job_id"])
+            return None
+        return job
+
+    def _start(self, job_id: str) -> None:
+        self.store.update(job_id, status=JOB_RUNNING, started_at=_utc_iso())
+        self.store.add_progress(job_id, {"stage": "started"})
+
+    def _run(self, job_id: str, request: Dict[str, Any]) -> None:
+        self._start(job_id)
+        try:
+            result = self.runner(**request)
+        except Exception as e:
+            self.store.update(job_id, status=JOB_FAILED, finished_at=_utc_iso(), error=str(e))
+            return
+        self._finish(job_id, result)
+
+    def _finish_from(self, job_id: str, future: Future) -> None:
+        if future.exception() is not None:
+            self.store.update(job_id, status=JOB_FAILED, finished_at=_utc_iso(), error=str(future.exception()))
+        else:
+            self._finish(job_id, future.result())
+
+    def _finish(self, job_id: str, result: Any) -> None:
+        ok = bool(result.get("ok")) if isinstance(result, dict) else False
+        errors = result.get("errors") if isinstance(result, dict) else None
+        self.store.add_progress(job_id, {"stage": "finished", "ok": ok})
+        self.store.update(job_id, status=JOB_SUCCEEDED if ok else JOB_FAILED,
+                          finished_at=_utc_iso(), result=result,
+                          error=None if ok else "; ".join(errors or []) or "Analysis failed")
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+
+def job_store_from_env():
+    """Job store from JOB_STORE_BACKEND (memory | sqlite), JOB_STORE_PATH, JOB_MAX_ENTRIES, JOB_RETENTION_SECONDS."""
+    max_jobs = int(os.getenv("JOB_MAX_ENTRIES", "500"))
+    retention = float(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+    if os.getenv("JOB_STORE_BACKEND", "memory").lower() == "sqlite":
+        path = os.getenv("JOB_STORE_PATH", os.path.join("data", "cache", "jobs.sqlite"))
+        return SQLiteJobStore(path, max_jobs=max_jobs, retention_seconds=retention)
+    return InMemoryJobStore(max_jobs=max_jobs, retention_seconds=retention)
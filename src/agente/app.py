@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional, List
+from typing import Any, Callable, Dict, Optional, List
 from pydantic import BaseModel, Field
 from datetime import datetime
 from dotenv import load_dotenv
@@ -7,21 +7,28 @@ import uuid
 import json
 import argparse
 import time
-import re
-import sys
+import asyncio
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import uvicorn
 from agno.agent import Agent
 from agno.models.openrouter import OpenRouter
 from agno.tools.reasoning import ReasoningTools
 from agno.tools.thinking import ThinkingTools
 from agno.tools.googlesearch import GoogleSearchTools
+import _paths  # noqa: F401  (src/tools on the import path)
+from http_pool import connection_stats
+from response_cache import get_response_cache
+from tool_telemetry import collect as collect_tool_calls
 from coingeckoToolKit import CoinGeckoToolKit
 from coindeskToolKit import CoinDeskToolKit
 from fearGreedToolKit import FearGreedToolKit
 from patternsToolKit import PatternToolKit
+from analysisWorkers import AgentPool, JobManager, job_store_from_env, pool_from_env
+from analysisCache import analysis_cache_from_env
+from analysisPrefetch import prefetcher_from_env
+from analysisStream import AnalysisEventStream, obtainable_from_source, sse_event
 
 load_dotenv()
 
@@ -32,6 +39,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Analyses run on a bounded worker pool, never on the event loop (429 when saturated)
+ANALYSIS_POOL = pool_from_env()
+ANALYSIS_RETRY_AFTER_SECONDS = int(os.getenv("ANALYSIS_RETRY_AFTER_SECONDS", "30"))
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -144,28 +155,6 @@ def build_response(*, ok: bool, data: Dict[str, Any], errors: Optional[list] = N
 
 
 
-class OutputCapture:
-    """Captures stdout for tool call analysis"""
-    def __init__(self):
-        self.original_stdout = sys.stdout
-        self.captured_text = ""
-        
-    def __enter__(self):
-        sys.stdout = self
-        return self
-        
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        sys.stdout = self.original_stdout
-        
-    def write(self, text):
-        self.captured_text += text
-        self.original_stdout.write(text)
-        self.original_stdout.flush()
-        
-    def flush(self):
-        self.original_stdout.flush()
-
-
 def make_json_serializable(obj: Any) -> Any:
     """Convert objects to JSON-serializable format"""
     if obj is None:
@@ -214,45 +203,146 @@ def make_json_serializable(obj: Any) -> Any:
         return str(obj)
 
 
-def parse_tool_calls_from_output(output_text: str) -> Dict[str, Any]:
-    """Parse debug logs to count API/function calls"""
-    
-    patterns = {
-        "CoinGeckoToolKit": {
-            "get_market_data": r"🎯 \[DEBUG\] get_market_data CHAMADA!",
-            "get_coin_data": r"🎯 \[DEBUG\] get_coin_data CHAMADA!",
-            "perform_technical_analysis": r"🎯 \[DEBUG\] perform_technical_analysis CHAMADA!",
-            "get_coin_history": r"🎯 \[DEBUG\] get_coin_history CHAMADA!",
-            "get_coin_chart": r"🎯 \[DEBUG\] get_coin_chart CHAMADA!",
-        },
-        "CoinDeskToolKit": {
-            "get_latest_articles": r"🎯 \[DEBUG\] get_latest_articles CHAMADA!",
-        },
-        "FearGreedToolKit": {
-            "get_current_fear_greed": r"📊 \*\*Fear and Greed Index\*\*",
-        },
-        "PatternToolKit": {
-            "detect_patterns": r"🎯 \[DEBUG\] pattern_detect CHAMADA!",
-        }
-    }
-    
-    stats = {"total_calls": 0, "tools": {}}
-    
-    for tool_name, tool_patterns in patterns.items():
-        tool_calls = {}
-        total_tool_calls = 0
-        
-        for func_name, pattern in tool_patterns.items():
-            count = len(re.findall(pattern, output_text))
-            if count > 0:
-                tool_calls[func_name] = count
-                total_tool_calls += count
-                stats["total_calls"] += count
-        
-        if total_tool_calls > 0:
-            stats["tools"][tool_name] = {"functions": tool_calls, "total_calls": total_tool_calls}
-    
-    return stats
+def build_analysis_agent(term_classification: str) -> Agent:
+    """
+    Build the analysis agent for one term type (short/medium/long).
+
+    Instructions only depend on the term type; the coin and currency travel in
+    the per-request prompt, so agents can be pooled and reused across requests.
+    """
+    print(f"🛠️ Initializing {term_classification} agent: CoinGecko, Fear&Greed, CoinDesk, Google, Reasoning...")
+    return Agent(
+        model=OpenRouter(
+            id="openai/gpt-5-mini", 
+            api_key=os.getenv("OPENROUTER_API_KEY"),
+            max_tokens=12000  # Increased to prevent JSON truncation
+        ),
+        tools=[
+            ReasoningTools(add_instructions=True),
+            ThinkingTools(add_instructions=True), 
+            GoogleSearchTools(),
+            CoinGeckoToolKit(),
+            CoinDeskToolKit(timeout=30),
+            FearGreedToolKit(),
+            PatternToolKit(),
+        ],
+        response_model=CryptoAnalysis,
+        use_json_mode=True,  # Enabled to ensure consistent JSON output
+        description=(
+            "Expert crypto analyst agent that autonomously analyzes cryptocurrencies and returns structured data."
+        ),
+        instructions=[
+            f"LANGUAGE: Always write ALL outputs in ENGLISH only.",
+            f"CRITICAL: You MUST return a complete CryptoAnalysis object with ALL 3 sections properly filled.",
+            f"STRUCTURED OUTPUT: Follow the exact CryptoAnalysis schema with obtainable/thoughts/metadata sections.",
+            f"",
+            f"ANALYSIS STRATEGY FOR {term_classification.upper()} TERM:",
+            f"- SHORT TERM: Focus on immediate price action, momentum, volatility, day trading signals (typically 30 days)",
+            f"- MEDIUM TERM: Balance technical and fundamental analysis, swing trading opportunities (typically 90 days)",  
+            f"- LONG TERM: Emphasize fundamentals, macro trends, long-term investment thesis (typically 365 days)",
+            f"",
+            f"REQUIRED ANALYSIS WORKFLOW:",
+            f"0) If the request includes PREFETCHED TOOL RESULTS, use them as the tool outputs for those calls instead of calling the tools again",
+            f"1) Use CoinGeckoToolKit to get current market data for the coin_id given in the request",
+            f"2) Use FearGreedToolKit.get_current_fear_greed() for market sentiment",  
+            f"3) Use CoinGeckoToolKit for technical analysis and price levels",
+            f"3.5) Use PatternToolKit.detect_patterns(coin_id=<requested coin_id>, vs_currency=<requested vs_currency>, term_type='{term_classification}', save_csv=false) and map JSON to obtainable:",
+            f"    - obtainable.patterns_found_count = result.found_count",
+            f"    - obtainable.patterns_sample = a concise list from result.sample (e.g., padrao_tipo, score_total, timeframe, strategy)",
+            f"4) Use CoinDeskToolKit for news sentiment",
+            f"5) ADAPT your analysis focus based on the {term_classification} term strategy",
+            f"6) CHOOSE appropriate range (days) for your {term_classification} term analysis",
+            f"7) Synthesize ALL data into the CryptoAnalysis structure with 3 sections:",
+            f"   - obtainable: Raw data from APIs (prices, indicators, fear/greed)",
+            f"   - thoughts: Your AI interpretations and recommendations", 
+            f"   - metadata: Analysis context (coin_id, range, term_classification)",
+            f"8) **SELF-REVIEW**: Review your analysis for consistency and term appropriateness",
+            f"",
+            f"FIELD REQUIREMENTS BY SECTION:",
+            f"",
+            f"OBTAINABLE DATA (from APIs) - RAW FACTS ONLY:",
+            f"- price_current: Extract EXACT current price from CoinGeckoToolKit", 
+            f"- price_change_24h: Extract EXACT 24h percentage change from CoinGeckoToolKit",
+            f"- volume_24h: Extract EXACT 24h trading volume from CoinGeckoToolKit",
+            f"- market_cap: Extract EXACT market capitalization from CoinGeckoToolKit",
+            f"- rsi: RSI indicator calculated by CoinGeckoToolKit (number 0-100)",
+            f"- macd_signal: MACD signal calculated by CoinGeckoToolKit (string)",
+            f"- sma_20: SMA 20 calculated by CoinGeckoToolKit (number)",
+            f"- sma_50: SMA 50 calculated by CoinGeckoToolKit (number)", 
+            f"- sma_200: SMA 200 calculated by CoinGeckoToolKit (number)",
+            f"- fear_greed_value: Use EXACT value from FearGreedToolKit (0-100 integer)",
+            f"- fear_greed_classification: Use EXACT classification from FearGreedToolKit (string)",
+            f"- patterns_found_count: Use EXACT 'found_count' from PatternToolKit JSON",
+            f"- patterns_sample: Use concise items from PatternToolKit JSON",
+            f"",
+            f"THOUGHT ANALYSIS (your AI interpretations) - YOUR THINKING ONLY:",
+            f"- summary: YOUR executive summary; include a brief chart-pattern note: if any pattern was detected name the most relevant one and its typical implication; otherwise explicitly say 'No chart pattern detected'",
+            f"- price_trend: YOUR interpretation - classify as 'bullish', 'bearish', or 'neutral'",
+            f"- technical_signal: GET deterministic result BUT validate if makes sense - use exact value OR null if conflicts",
+            f"- resistance_levels: EXACTLY 2 most obvious resistance levels ABOVE current price (closest first, then next closest)",
+            f"- support_levels: EXACTLY 2 most obvious support levels BELOW current price (closest first, then next closest)", 
+            f"- news_sentiment: YOUR analysis of news - classify as 'positive', 'negative', or 'neutral'",
+            f"- market_sentiment: YOUR overall market assessment",
+            f"- investment_outlook: YOUR investment recommendation - 'bullish', 'bearish', or 'neutral'",
+            f"- risk_level: YOUR risk assessment - classify as 'low', 'medium', or 'high'",
+            f"- recommendation_confidence: YOUR confidence score (0.0 to 1.0)",
+            f"- key_factors: YOUR list of 3-5 main factors that influenced your analysis",
+            f"",
+            f"ANALYSIS METADATA (context and execution info):",
+            f"- coin_id: Set to the requested coin_id (the coin being analyzed)",
+            f"- range: Choose appropriate range for {term_classification} term (short~30d, medium~90d, long~365d)",
+            f"- term_classification: Set to '{term_classification}' (investment time horizon)",
+            f"- timestamp: Will be auto-generated",
+            f"",
+            f"CONSISTENCY VALIDATION RULES:",
+            f"- Ensure thoughts.price_trend aligns with thoughts.technical_signal and thoughts.investment_outlook",
+            f"- Verify obtainable.fear_greed_value matches obtainable.fear_greed_classification ranges",
+            f"- Check that thoughts.risk_level is consistent with market volatility and sentiment",
+            f"- Validate that thoughts.recommendation_confidence reflects the quality of available data",
+            f"- Ensure thoughts.resistance_levels/support_levels are EXACTLY 2 levels each, realistic and properly ordered",
+            f"- Confirm thoughts.news_sentiment aligns with thoughts.market_sentiment",
+            f"",
+            f"BEFORE FINALIZING: Review all fields for logical consistency and accuracy.",
+            f"Use the tools to gather real-time data and base your analysis on actual market conditions.",
+        ],
+        markdown=False,
+    )
+
+
+def _reset_agent_state(agent: Agent) -> None:
+    """Drop per-request conversation state before an agent goes back to the pool."""
+    if hasattr(agent, "new_session"):
+        # agno 1.x keeps the run messages on the agent itself
+        agent.new_session()
+    elif hasattr(agent, "session_id"):
+        agent.session_id = None
+
+
+# Pre-warmed agents per term type; at most one per analysis worker is ever in use
+AGENT_POOL = AgentPool(build_analysis_agent, size_per_key=ANALYSIS_POOL.max_workers,
+                       reset=_reset_agent_state)
+TERM_TYPES = ("short", "medium", "long")
+# Shared toolkit for the deterministic pattern enrichment (engine module loaded once)
+PATTERN_TOOLKIT = PatternToolKit()
+# Deterministic sources fetched concurrently before the LLM loop (None when PREFETCH_ENABLED=false)
+PREFETCHER = prefetcher_from_env(CoinGeckoToolKit(), FearGreedToolKit(), CoinDeskToolKit(timeout=30),
+                                 PATTERN_TOOLKIT, analysis_workers=ANALYSIS_POOL.max_workers)
+PREFETCH_TIMEOUT_SECONDS = float(os.getenv("PREFETCH_TIMEOUT_SECONDS", "60"))
+PREFETCH_MAX_CHARS = int(os.getenv("PREFETCH_MAX_CHARS", "8000"))
+
+
+def _apply_pattern_debug_env(mod: Any) -> None:
+    """Optional pattern engine debug controls via environment"""
+    if os.getenv('PATTERN_DEBUG_ALL', '').lower() == 'true':
+        mod.Config.HNS_DEBUG = True
+        mod.Config.DTB_DEBUG = True
+        mod.Config.TTB_DEBUG = True
+    lookback_env = os.getenv('PATTERN_LOOKBACK')
+    if lookback_env:
+        try:
+            mod.Config.RECENT_PATTERNS_LOOKBACK_COUNT = int(lookback_env)
+        except Exception:
+            pass
 
 
 def run_analysis(coin_id: str, **params: Any) -> Dict[str, Any]:
@@ -278,104 +368,40 @@ def run_analysis(coin_id: str, **params: Any) -> Dict[str, Any]:
     print(f"🔢 Request ID: {request_id[:8]}...")
     print("─" * 60)
     
+    # Progress listener of /analyze/stream (no-op for the other endpoints)
+    emit = params.get("on_event") or (lambda event, data: None)
+    emit("started", {"request_id": request_id, "coin_id": coin_id, "vs_currency": vs_currency,
+                     "term_type": term_classification})
+
+    def emit_prefetched(name: str, result: Any) -> None:
+        fields = obtainable_from_source(name, result.data)
+        if fields:
+            emit("obtainable", fields)
+
+    agent: Optional[Agent] = None
+    prefetch = None
     try:
-        print("🛠️ Initializing tools: CoinGecko, Fear&Greed, CoinDesk, Google, Reasoning...")
-        
-        agent = Agent(
-            model=OpenRouter(
-                id="openai/gpt-5-mini", 
-                api_key=os.getenv("OPENROUTER_API_KEY"),
-                max_tokens=12000  # Increased to prevent JSON truncation
-            ),
-            tools=[
-                ReasoningTools(add_instructions=True),
-                ThinkingTools(add_instructions=True), 
-                GoogleSearchTools(),
-                CoinGeckoToolKit(),
-                CoinDeskToolKit(timeout=30),
-                FearGreedToolKit(),
-                PatternToolKit(),
-            ],
-            response_model=CryptoAnalysis,
-            use_json_mode=True,  # Enabled to ensure consistent JSON output
-            description=(
-                "Expert crypto analyst agent that autonomously analyzes cryptocurrencies and returns structured data."
-            ),
-            instructions=[
-                f"LANGUAGE: Always write ALL outputs in ENGLISH only.",
-                f"CRITICAL: You MUST return a complete CryptoAnalysis object with ALL 3 sections properly filled.",
-                f"STRUCTURED OUTPUT: Follow the exact CryptoAnalysis schema with obtainable/thoughts/metadata sections.",
-                f"",
-                f"ANALYSIS STRATEGY FOR {term_classification.upper()} TERM:",
-                f"- SHORT TERM: Focus on immediate price action, momentum, volatility, day trading signals (typically 30 days)",
-                f"- MEDIUM TERM: Balance technical and fundamental analysis, swing trading opportunities (typically 90 days)",  
-                f"- LONG TERM: Emphasize fundamentals, macro trends, long-term investment thesis (typically 365 days)",
-                f"",
-                f"REQUIRED ANALYSIS WORKFLOW:",
-                f"1) Use CoinGeckoToolKit to get current market data for {coin_id}",
-                f"2) Use FearGreedToolKit.get_current_fear_greed() for market sentiment",  
-                f"3) Use CoinGeckoToolKit for technical analysis and price levels",
-                f"3.5) Use PatternToolKit.detect_patterns(coin_id='{coin_id}', vs_currency='{vs_currency}', term_type='{term_classification}', save_csv=false) and map JSON to obtainable:",
-                f"    - obtainable.patterns_found_count = result.found_count",
-                f"    - obtainable.patterns_sample = a concise list from result.sample (e.g., padrao_tipo, score_total, timeframe, strategy)",
-                f"4) Use CoinDeskToolKit for news sentiment",
-                f"5) ADAPT your analysis focus based on the {term_classification} term strategy",
-                f"6) CHOOSE appropriate range (days) for your {term_classification} term analysis",
-                f"7) Synthesize ALL data into the CryptoAnalysis structure with 3 sections:",
-                f"   - obtainable: Raw data from APIs (prices, indicators, fear/greed)",
-                f"   - thoughts: Your AI interpretations and recommendations", 
-                f"   - metadata: Analysis context (coin_id, range, term_classification)",
-                f"8) **SELF-REVIEW**: Review your analysis for consistency and term appropriateness",
-                f"",
-                f"FIELD REQUIREMENTS BY SECTION:",
-                f"",
-                f"OBTAINABLE DATA (from APIs) - RAW FACTS ONLY:",
-                f"- price_current: Extract EXACT current price from CoinGeckoToolKit", 
-                f"- price_change_24h: Extract EXACT 24h percentage change from CoinGeckoToolKit",
-                f"- volume_24h: Extract EXACT 24h trading volume from CoinGeckoToolKit",
-                f"- market_cap: Extract EXACT market capitalization from CoinGeckoToolKit",
-                f"- rsi: RSI indicator calculated by CoinGeckoToolKit (number 0-100)",
-                f"- macd_signal: MACD signal calculated by CoinGeckoToolKit (string)",
-                f"- sma_20: SMA 20 calculated by CoinGeckoToolKit (number)",
-                f"- sma_50: SMA 50 calculated by CoinGeckoToolKit (number)", 
-                f"- sma_200: SMA 200 calculated by CoinGeckoToolKit (number)",
-                f"- fear_greed_value: Use EXACT value from FearGreedToolKit (0-100 integer)",
-                f"- fear_greed_classification: Use EXACT classification from FearGreedToolKit (string)",
-                f"- patterns_found_count: Use EXACT 'found_count' from PatternToolKit JSON",
-                f"- patterns_sample: Use concise items from PatternToolKit JSON",
-                f"",
-                f"THOUGHT ANALYSIS (your AI interpretations) - YOUR THINKING ONLY:",
-                f"- summary: YOUR executive summary; include a brief chart-pattern note: if any pattern was detected name the most relevant one and its typical implication; otherwise explicitly say 'No chart pattern detected'",
-                f"- price_trend: YOUR interpretation - classify as 'bullish', 'bearish', or 'neutral'",
-                f"- technical_signal: GET deterministic result BUT validate if makes sense - use exact value OR null if conflicts",
-                f"- resistance_levels: EXACTLY 2 most obvious resistance levels ABOVE current price (closest first, then next closest)",
-                f"- support_levels: EXACTLY 2 most obvious support levels BELOW current price (closest first, then next closest)", 
-                f"- news_sentiment: YOUR analysis of news - classify as 'positive', 'negative', or 'neutral'",
-                f"- market_sentiment: YOUR overall market assessment",
-                f"- investment_outlook: YOUR investment recommendation - 'bullish', 'bearish', or 'neutral'",
-                f"- risk_level: YOUR risk assessment - classify as 'low', 'medium', or 'high'",
-                f"- recommendation_confidence: YOUR confidence score (0.0 to 1.0)",
-                f"- key_factors: YOUR list of 3-5 main factors that influenced your analysis",
-                f"",
-                f"ANALYSIS METADATA (context and execution info):",
-                f"- coin_id: Set to '{coin_id}' (the coin being analyzed)",
-                f"- range: Choose appropriate range for {term_classification} term (short~30d, medium~90d, long~365d)",
-                f"- term_classification: Set to '{term_classification}' (investment time horizon)",
-                f"- timestamp: Will be auto-generated",
-                f"",
-                f"CONSISTENCY VALIDATION RULES:",
-                f"- Ensure thoughts.price_trend aligns with thoughts.technical_signal and thoughts.investment_outlook",
-                f"- Verify obtainable.fear_greed_value matches obtainable.fear_greed_classification ranges",
-                f"- Check that thoughts.risk_level is consistent with market volatility and sentiment",
-                f"- Validate that thoughts.recommendation_confidence reflects the quality of available data",
-                f"- Ensure thoughts.resistance_levels/support_levels are EXACTLY 2 levels each, realistic and properly ordered",
-                f"- Confirm thoughts.news_sentiment aligns with thoughts.market_sentiment",
-                f"",
-                f"BEFORE FINALIZING: Review all fields for logical consistency and accuracy.",
-                f"Use the tools to gather real-time data and base your analysis on actual market conditions.",
-            ],
-            markdown=False,
-        )
+        # Kick off the deterministic sources right away; they run while the agent is checked out.
+        # Opened here so the prefetch tasks (run in copies of this context) report to this request.
+        with collect_tool_calls(request_id, on_call=lambda call: emit("tool", call)) as tool_calls:
+            if PREFETCHER is not None:
+                try:
+                    _apply_pattern_debug_env(PATTERN_TOOLKIT._ensure_module())
+                except Exception:
+                    pass
+                prefetch = PREFETCHER.start(coin_id, vs_currency, term_classification,
+                                            on_result=emit_prefetched)
+
+        # Checked out from the pool; returned (with its state reset) in the finally below
+        agent = AGENT_POOL.acquire(term_classification)
+
+        prefetch_context = ""
+        if prefetch is not None:
+            prefetch.wait(PREFETCH_TIMEOUT_SECONDS)
+            prefetch_context = prefetch.as_prompt_context(PREFETCH_MAX_CHARS)
+            stats = prefetch.stats()
+            print(f"⚡ Prefetched {stats['completed']}/{stats['tasks']} sources in {stats['elapsed_seconds']:.2f}s "
+                  f"(sequential sum {stats['sum_seconds']:.2f}s, failed {stats['failed']}, late {stats['late']})")
         
         print("🧠 Creating analysis prompt...")
         prompt = f"""
@@ -550,14 +576,18 @@ def run_analysis(coin_id: str, **params: Any) -> Dict[str, Any]:
         4. Base on actual technical data from your analysis tools
         5. If uncertain, use percentage-based estimates from current price
         """
+        if prefetch_context:
+            prompt = f"{prompt}\n\n{prefetch_context}\n"
 
         print("🤖 Agent starting analysis...")
         print("   📋 Monitoring tool calls...")
         print("   🔍 Agent will self-review analysis for consistency...")
         
-        with OutputCapture() as capture:
+        # Toolkit methods report each call to this request's collector (no stdout scraping)
+        with collect_tool_calls(collector=tool_calls):
             agent_start = time.time()
-            run_response = agent.run(prompt)
+            # Fresh session per request: pooled agents never share conversation state
+            run_response = agent.run(prompt, session_id=request_id)
             agent_time = time.time() - agent_start
         
         print(f"\n✅ Agent completed in {agent_time:.2f}s")
@@ -574,11 +604,13 @@ def run_analysis(coin_id: str, **params: Any) -> Dict[str, Any]:
         else:
             print(f"🔍 [DEBUG] No content attribute. Response: {str(run_response)[:200]}...")
         
-        # Parse tool usage
-        tool_stats = parse_tool_calls_from_output(capture.captured_text)
+        # Tool usage recorded during the agent run
+        tool_stats = tool_calls.summary()
+        if prefetch is not None:
+            tool_stats["prefetch"] = prefetch.stats()
         
         print(f"\n📊 ANALYSIS SUMMARY:")
-        print(f"📞 Total API Calls: {tool_stats['total_calls']}")
+        print(f"📞 Total API Calls: {tool_stats['total_calls']} ({tool_stats['upstream_http_requests']} upstream HTTP requests)")
         print(f"⏱️ Term Focus: {term_classification.upper()} term ({term_source})")
         print(f"🎯 Analysis Strategy: {'Day trading focused' if term_classification == 'short' else 'Swing trading balanced' if term_classification == 'medium' else 'Long-term investment focused'}")
         
@@ -588,7 +620,7 @@ def run_analysis(coin_id: str, **params: Any) -> Dict[str, Any]:
                 for func_name, count in tool_data["functions"].items():
                     print(f"   • {func_name}(): {count}x")
         else:
-            print("   ℹ️ No API calls detected in debug logs")
+            print("   ℹ️ No tool calls recorded")
         
         # Agent automatically fills all CryptoAnalysis fields after self-review
         total_time = time.time() - start_time
@@ -646,30 +678,21 @@ def run_analysis(coin_id: str, **params: Any) -> Dict[str, Any]:
         
         # Enrich with pattern detection (deterministic call, independent of agent)
         try:
-            print("🎯 [DEBUG] pattern_detect via API call...")
-            pattern_tool = PatternToolKit()
-            # Optional debug controls via environment
-            try:
-                mod = pattern_tool._ensure_module()
-                if os.getenv('PATTERN_DEBUG_ALL', '').lower() == 'true':
-                    mod.Config.HNS_DEBUG = True
-                    mod.Config.DTB_DEBUG = True
-                    mod.Config.TTB_DEBUG = True
-                lookback_env = os.getenv('PATTERN_LOOKBACK')
-                if lookback_env:
-                    try:
-                        mod.Config.RECENT_PATTERNS_LOOKBACK_COUNT = int(lookback_env)
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-
-            patt_json_str = pattern_tool.detect_patterns(
-                coin_id=coin_id,
-                vs_currency=vs_currency,
-                term_type=term_classification,
-                save_csv=False,
-            )
+            # The prefetch already ran the engine for this request; only fall back to a fresh run
+            patt_json_str = prefetch.get("patterns") if prefetch is not None else None
+            if patt_json_str is None:
+                print("🎯 [DEBUG] pattern_detect via API call...")
+                pattern_tool = PATTERN_TOOLKIT
+                try:
+                    _apply_pattern_debug_env(pattern_tool._ensure_module())
+                except Exception:
+                    pass
+                patt_json_str = pattern_tool.detect_patterns(
+                    coin_id=coin_id,
+                    vs_currency=vs_currency,
+                    term_type=term_classification,
+                    save_csv=False,
+                )
             patt = json.loads(patt_json_str)
             if patt.get('ok'):
                 if 'obtainable' not in analysis_data:
@@ -847,6 +870,9 @@ def run_analysis(coin_id: str, **params: Any) -> Dict[str, Any]:
             "session_metrics": session_metrics if session_metrics else None,
         })
 
+        for section in ("obtainable", "thoughts", "metadata"):
+            emit(section, analysis_data.get(section, {}))
+
         print(f"⏱️ Total time: {total_time:.2f}s")
         print("✅ Analysis completed!")
         print("─" * 60)
@@ -864,6 +890,51 @@ def run_analysis(coin_id: str, **params: Any) -> Dict[str, Any]:
         error_time = time.time() - start_time
         print(f"❌ Failed after {error_time:.2f}s: {str(exc)}")
         return build_response(ok=False, data={}, errors=[str(exc)], meta={"request_id": request_id})
+    finally:
+        if agent is not None:
+            AGENT_POOL.release(term_classification, agent)
+
+
+# Whole-analysis cache (stale-while-revalidate; refreshes run on the worker pool), None when disabled
+ANALYSIS_CACHE = analysis_cache_from_env(run_analysis, submit=ANALYSIS_POOL.try_submit)
+
+
+def cached_analysis(request: "CryptoAnalysisRequest") -> Optional[Dict[str, Any]]:
+    """Fresh or stale cached response for this request (a stale hit triggers a background refresh)"""
+    if ANALYSIS_CACHE is None:
+        return None
+    cached = ANALYSIS_CACHE.lookup(request.coin_id, request.vs_currency, request.term_type)
+    if cached is not None:
+        cache_meta = cached["meta"]["cache"]
+        print(f"♻️ [FastAPI] Cached analysis for {request.coin_id} ({cache_meta['status']}, "
+              f"{cache_meta['age_seconds']:.0f}s old{', refreshing' if cache_meta['refreshing'] else ''})")
+    return cached
+
+
+# Background analysis jobs share the worker pool (and its concurrency cap) with /analyze
+ANALYSIS_JOBS = JobManager(ANALYSIS_POOL, job_store_from_env(),
+                           ANALYSIS_CACHE.run if ANALYSIS_CACHE is not None else run_analysis,
+                           join=ANALYSIS_CACHE.join if ANALYSIS_CACHE is not None else None)
+ANALYSIS_RUNNER = ANALYSIS_CACHE.compute if ANALYSIS_CACHE is not None else run_analysis
+
+
+def running_analysis(request: "CryptoAnalysisRequest", on_event: Optional[Callable[[str, Any], None]] = None):
+    """Future of the same analysis already running (joined without taking a worker), or None"""
+    if ANALYSIS_CACHE is None:
+        return None
+    future = ANALYSIS_CACHE.join(request.coin_id, request.vs_currency, request.term_type, on_event=on_event)
+    if future is not None:
+        print(f"🔗 [FastAPI] Joined the running analysis of {request.coin_id}")
+    return future
+
+
+@app.on_event("startup")
+def warm_up_agents():
+    """Build the pooled agents and load the pattern engine before the first request"""
+    started = time.time()
+    PATTERN_TOOLKIT._ensure_module()
+    AGENT_POOL.warm(TERM_TYPES)
+    print(f"🔥 Warmed {AGENT_POOL.stats()['created']} agents and the pattern engine in {time.time() - started:.2f}s")
 
 
 # FastAPI endpoints
@@ -876,14 +947,35 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "analyze": "/analyze - POST - Perform cryptocurrency analysis",
-            "health": "/health - GET - Health check"
+            "jobs": "/jobs - POST - Start an analysis job; /jobs/{job_id} - GET - Poll its status/result",
+            "health": "/health - GET - Health check",
+            "http_stats": "/stats/http - GET - Per-host HTTP connection reuse"
         }
     }
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+    """Health check endpoint (includes analysis worker pool load)"""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow().isoformat(),
+        "analysis_pool": ANALYSIS_POOL.stats(),
+        "jobs": ANALYSIS_JOBS.store.stats(),
+        "agent_pool": AGENT_POOL.stats(),
+        "prefetch": PREFETCHER.stats() if PREFETCHER is not None else None,
+        "analysis_cache": ANALYSIS_CACHE.stats() if ANALYSIS_CACHE is not None else None,
+    }
+
+@app.get("/stats/http")
+async def http_pool_stats():
+    """Per-host connection reuse, CoinGecko upstream call counts and response-cache hit/miss counters"""
+    response_cache = get_response_cache()
+    return {
+        "hosts": connection_stats(),
+        "coingecko_requests": CoinGeckoToolKit.request_stats(),
+        "response_cache": response_cache.stats() if response_cache is not None else None,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
 
 @app.post("/analyze", response_model=ApiResponse)
 async def analyze_crypto(request: CryptoAnalysisRequest):
@@ -892,16 +984,30 @@ async def analyze_crypto(request: CryptoAnalysisRequest):
     
     Returns structured analysis with market data, technical indicators,
     sentiment analysis, and investment recommendations.
+
+    The analysis runs on the worker pool; when every worker is busy and the
+    queue is full the request is rejected with 429 and a Retry-After header.
     """
-    try:
-        print(f"\n🌐 [FastAPI] New analysis request: {request.coin_id}")
-        
-        # Call the existing analysis function
-        result = run_analysis(
-            coin_id=request.coin_id,
-            vs_currency=request.vs_currency,
-            term_type=request.term_type
+    print(f"\n🌐 [FastAPI] New analysis request: {request.coin_id}")
+    cached = cached_analysis(request)
+    if cached is not None:
+        return JSONResponse(content=cached)
+    future = running_analysis(request) or ANALYSIS_POOL.try_submit(
+        ANALYSIS_RUNNER,
+        coin_id=request.coin_id,
+        vs_currency=request.vs_currency,
+        term_type=request.term_type
+    )
+    if future is None:
+        print(f"⚠️ [FastAPI] Analysis pool saturated, rejecting {request.coin_id}")
+        raise HTTPException(
+            status_code=429,
+            detail="Analysis capacity exhausted, retry later",
+            headers={"Retry-After": str(ANALYSIS_RETRY_AFTER_SECONDS)},
         )
+    try:
+        # Wait without blocking the event loop
+        result = await asyncio.wrap_future(future)
         
         # Return the result directly (it's already in the correct format)
         return JSONResponse(content=result)
@@ -910,6 +1016,97 @@ async def analyze_crypto(request: CryptoAnalysisRequest):
         print(f"❌ [FastAPI] Analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/analyze/stream")
+async def analyze_crypto_stream(request: CryptoAnalysisRequest):
+    """
+    Same analysis as `/analyze`, streamed as Server-Sent Events.
+
+    Events: accepted, started, tool (one per finished tool call, with timing),
+    obtainable (fields as soon as they are known, then the full section),
+    thoughts, metadata and finally done (the `/analyze` response body).
+    Returns 429 when the worker pool is full.
+    """
+    print(f"\n🌐 [FastAPI] New streamed analysis request: {request.coin_id}")
+    cached = cached_analysis(request)
+    if cached is not None:
+        async def cached_source():
+            yield sse_event("accepted", {"coin_id": request.coin_id, "term_type": request.term_type,
+                                         "cache": cached["meta"]["cache"]})
+            for section in ("obtainable", "thoughts", "metadata"):
+                yield sse_event(section, cached["data"].get(section, {}))
+            yield sse_event("done", cached)
+
+        return StreamingResponse(cached_source(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    stream = AnalysisEventStream(asyncio.get_running_loop())
+    # A request joining a running analysis gets its events (earlier ones replayed) and its response
+    future = running_analysis(request, on_event=stream.emit) or ANALYSIS_POOL.try_submit(
+        ANALYSIS_RUNNER,
+        coin_id=request.coin_id,
+        vs_currency=request.vs_currency,
+        term_type=request.term_type,
+        on_event=stream.emit,
+    )
+    if future is None:
+        print(f"⚠️ [FastAPI] Analysis pool saturated, rejecting {request.coin_id}")
+        raise HTTPException(
+            status_code=429,
+            detail="Analysis capacity exhausted, retry later",
+            headers={"Retry-After": str(ANALYSIS_RETRY_AFTER_SECONDS)},
+        )
+    future.add_done_callback(lambda _: stream.close())
+
+    async def event_source():
+        yield sse_event("accepted", {"coin_id": request.coin_id, "term_type": request.term_type})
+        async for item in stream.events():
+            # SSE comment lines keep proxies from closing an idle connection
+            yield ": keep-alive\n\n" if item is None else sse_event(*item)
+        try:
+            result = await asyncio.wrap_future(future)
+        except Exception as e:
+            print(f"❌ [FastAPI] Streamed analysis failed: {str(e)}")
+            result = build_response(ok=False, data={}, errors=[str(e)])
+        yield sse_event("done", result)
+
+    return StreamingResponse(event_source(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/jobs", status_code=202)
+async def create_analysis_job(request: CryptoAnalysisRequest):
+    """
+    Start an analysis in the background and return its job id right away.
+
+    Poll `GET /jobs/{job_id}` for status, progress and the final result. The job
+    keeps running if the client disconnects. Returns 429 when the worker pool is full.
+    """
+    print(f"\n🌐 [FastAPI] New analysis job: {request.coin_id}")
+    job = ANALYSIS_JOBS.submit({
+        "coin_id": request.coin_id,
+        "vs_currency": request.vs_currency,
+        "term_type": request.term_type,
+    })
+    if job is None:
+        raise HTTPException(
+            status_code=429,
+            detail="Analysis capacity exhausted, retry later",
+            headers={"Retry-After": str(ANALYSIS_RETRY_AFTER_SECONDS)},
+        )
+    return JSONResponse(status_code=202, content={
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "poll_url": f"/jobs/{job['job_id']}",
+    })
+
+@app.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    """Status (queued/running/succeeded/failed), progress events and result of a job"""
+    job = ANALYSIS_JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired")
+    return JSONResponse(content=job)
+
 @app.get("/coins", response_model=Dict[str, Any])
 async def get_available_coins():
     """Get list of popular cryptocurrencies available for analysis"""
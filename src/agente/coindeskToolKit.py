@@ -5,6 +5,11 @@ from agno.tools import Toolkit
 from dotenv import load_dotenv
 load_dotenv()
 
+import _paths  # noqa: F401  (src/tools on the import path)
+from http_pool import get_session
+from response_cache import ResponseCache, get_response_cache
+from tool_telemetry import instrumented_tool
+
 
 class CoinDeskToolKit(Toolkit):
     """
@@ -14,11 +19,15 @@ class CoinDeskToolKit(Toolkit):
 
     Args:
         timeout (Optional[int]): Timeout for HTTP requests, default is 10 seconds.
+        cache (Optional[ResponseCache]): TTL response cache; defaults to the shared one.
     """
 
-    def __init__(self, timeout: Optional[int] = 10):
+    def __init__(self, timeout: Optional[int] = 10, cache: Optional[ResponseCache] = None):
         super().__init__(name="coindesk_tools")
         self.timeout: Optional[int] = timeout
+        # Pooled keep-alive session with 429/5xx retries
+        self.session = get_session()
+        self.cache = cache if cache is not None else get_response_cache()
         self.api_key = os.getenv("COINDESK_API_KEY")
         self.base_url = "https://data-api.coindesk.com"
 
@@ -27,7 +36,7 @@ class CoinDeskToolKit(Toolkit):
 
     def _make_request(self, endpoint_path: str, params: Optional[Dict] = None) -> Dict:
         """
-        Generic method to make requests to CoinDesk API.
+        Generic method to make requests to CoinDesk API (served from the TTL cache when fresh).
 
         Args:
             endpoint_path (str): The API endpoint path (e.g., "v1/articles/latest")
@@ -60,18 +69,25 @@ class CoinDeskToolKit(Toolkit):
             "Accept": "application/json"
         }
 
-        # Make the request
-        response = requests.get(
-            url, params=params, headers=headers, timeout=self.timeout)
+        def fetch() -> Dict:
+            # Make the request
+            response = self.session.get(
+                url, params=params, headers=headers, timeout=self.timeout)
+
+            print(f"📰 [DEBUG] Status Code: {response.status_code}")
 
-        print(f"📰 [DEBUG] Status Code: {response.status_code}")
+            if response.status_code != 200:
+                print(f"❌ [DEBUG] Resposta de erro: {response.text}")
 
-        if response.status_code != 200:
-            print(f"❌ [DEBUG] Resposta de erro: {response.text}")
+            response.raise_for_status()
+            return response.json()
 
-        response.raise_for_status()
-        return response.json()
+        if self.cache is None:
+            return fetch()
+        # The cache key drops `api_key`; failures raise and are never cached
+        return self.cache.get_or_fetch("coindesk", endpoint_path, params, fetch)
 
+    @instrumented_tool
     def get_latest_articles(self, limit: int = 15, category: Optional[str] = None) -> str:
         """
         Get the latest news articles from CoinDesk.
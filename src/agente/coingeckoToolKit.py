@@ -1,6 +1,9 @@
 import requests
 import os
 import json
+import threading
+import time
+from collections import Counter, OrderedDict
 import pandas as pd
 import pandas_ta as ta
 from datetime import datetime
@@ -9,6 +12,108 @@ from agno.tools import Toolkit
 from dotenv import load_dotenv
 load_dotenv()
 
+import _paths  # noqa: F401  (src/tools on the import path)
+from http_pool import get_session
+from response_cache import ResponseCache, get_response_cache
+from tool_telemetry import instrumented_tool
+
+# Identical requests share one upstream call; answers are reused for this long
+COALESCE_TTL_SECONDS = float(os.getenv("COINGECKO_COALESCE_TTL_SECONDS", "30"))
+COALESCE_MAX_ENTRIES = 256
+
+
+class NoMarketDataError(LookupError):
+    """CoinGecko returned no market entry for the requested coin."""
+
+
+class _InFlight:
+    """One upstream call that concurrent identical requests wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _RequestCoalescer:
+    """
+    Single-flight layer with a short TTL, shared by every CoinGeckoToolKit instance.
+
+    The first caller of a key runs the upstream fetch; callers arriving while it is
+    in flight wait and receive the same result (or exception). Successful results
+    stay reusable for `ttl_seconds`. Results are shared objects: treat them as read-only.
+    """
+
+    def __init__(self, ttl_seconds: float = COALESCE_TTL_SECONDS, max_entries: int = COALESCE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Any, _InFlight] = {}
+        self._recent: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._upstream_by_endpoint: Counter = Counter()
+        self._stats = {"requests": 0, "upstream_calls": 0,
+                       "coalesced": 0, "ttl_hits": 0, "errors": 0}
+
+    def call(self, key: Any, endpoint: str, fetch):
+        with self._lock:
+            self._stats["requests"] += 1
+            recent = self._recent.get(key)
+            if recent is not None:
+                expires_at, result = recent
+                if expires_at > time.monotonic():
+                    self._stats["ttl_hits"] += 1
+                    return result
+                del self._recent[key]
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _InFlight()
+                self._stats["upstream_calls"] += 1
+                self._upstream_by_endpoint[endpoint] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fetch()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                if flight.error is None and self.ttl_seconds > 0:
+                    self._recent[key] = (time.monotonic() + self.ttl_seconds, flight.result)
+                    self._recent.move_to_end(key)
+                    while len(self._recent) > self.max_entries:
+                        self._recent.popitem(last=False)
+            flight.done.set()
+        return flight.result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["saved_calls"] = out["requests"] - out["upstream_calls"]
+            out["upstream_by_endpoint"] = dict(self._upstream_by_endpoint)
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._upstream_by_endpoint.clear()
+            for k in self._stats:
+                self._stats[k] = 0
+
+
+_COALESCER = _RequestCoalescer()
+
 
 class CoinGeckoToolKit(Toolkit):
     """
@@ -24,11 +129,17 @@ class CoinGeckoToolKit(Toolkit):
         timeout (Optional[int]): Timeout for HTTP requests, default is 10 seconds.
         use_proxy (Optional[bool]): If True, uses proxy mode. If False, uses direct mode.
                                    If None, auto-detects based on environment variables.
+        cache (Optional[ResponseCache]): TTL response cache; defaults to the shared one
+                                         (`RESPONSE_CACHE_BACKEND=off` disables it).
     """
 
-    def __init__(self, timeout: Optional[int] = 10, use_proxy: Optional[bool] = None):
+    def __init__(self, timeout: Optional[int] = 10, use_proxy: Optional[bool] = None,
+                 cache: Optional[ResponseCache] = None):
         super().__init__(name="coingecko_tools")
         self.timeout: Optional[int] = timeout
+        # Pooled keep-alive session with 429/5xx retries
+        self.session = get_session()
+        self.cache = cache if cache is not None else get_response_cache()
         self.default_vs_currency: str = os.getenv(
             "DEFAULT_VS_CURRENCY", "usd").lower()
 
@@ -56,6 +167,7 @@ class CoinGeckoToolKit(Toolkit):
         self.register(self.perform_technical_analysis)
         self.register(self.get_coin_symbol)
 
+    @instrumented_tool
     def get_coin_symbol(self, coin_id: str) -> str:
         """
         Get the ticker symbol (uppercase) for a given CoinGecko coin_id.
@@ -141,10 +253,25 @@ class CoinGeckoToolKit(Toolkit):
             return f"{symbol}{formatted}" if symbol else f"{formatted} {vs_currency.upper()}"
         return str(value)
 
+    @staticmethod
+    def request_stats() -> Dict[str, Any]:
+        """
+        Upstream call counters of the request-coalescing layer (all instances).
+
+        Returns:
+            Dict: requests, upstream_calls, coalesced (joined an in-flight call),
+                  ttl_hits, errors, saved_calls and upstream_by_endpoint.
+        """
+        return _COALESCER.stats()
+
     def _make_request(self, endpoint_path: str, params: Optional[Dict] = None) -> Dict:
         """
         Generic method to make requests to CoinGecko API in both direct and proxy modes.
 
+        Fresh answers come from the TTL response cache (per-endpoint TTLs). On a miss,
+        identical concurrent requests (same URL and params) share one upstream call
+        and its result, which is then reused for `COALESCE_TTL_SECONDS`.
+
         Args:
             endpoint_path (str): The API endpoint path (e.g., "coins/markets", "coins/bitcoin")
             params (Optional[Dict]): Query parameters for the request
@@ -176,8 +303,23 @@ class CoinGeckoToolKit(Toolkit):
                 "Accept": "application/json"
             }
 
-        # Make the request
-        response = requests.get(
+        if self.cache is not None:
+            cached = self.cache.get("coingecko", endpoint_path, params)
+            if cached is not self.cache.MISS:
+                return cached
+
+        def fetch() -> Dict:
+            data = self._fetch_upstream(url, params, headers)
+            if self.cache is not None:
+                self.cache.store("coingecko", endpoint_path, params, data)
+            return data
+
+        key = (url, tuple(sorted((str(k), str(v)) for k, v in params.items())))
+        return _COALESCER.call(key, endpoint_path, fetch)
+
+    def _fetch_upstream(self, url: str, params: Dict, headers: Dict) -> Dict:
+        """Single HTTP GET over the pooled session; raises on non-2xx."""
+        response = self.session.get(
             url, params=params, headers=headers, timeout=self.timeout)
 
         print(f"📊 [DEBUG] Status Code: {response.status_code}")
@@ -188,6 +330,7 @@ class CoinGeckoToolKit(Toolkit):
         response.raise_for_status()
         return response.json()
 
+    @instrumented_tool
     def get_market_data(self, coin_id: str, vs_currency: str = "usd") -> str:
         """
         Get market data for a specific cryptocurrency including price, volume and market cap.
@@ -207,73 +350,98 @@ class CoinGeckoToolKit(Toolkit):
             f"🎯 [DEBUG] get_market_data CHAMADA! coin_id='{coin_id}', vs_currency='{vs_currency}'")
 
         try:
-            if not vs_currency:
-                vs_currency = self.default_vs_currency
-            # Parameters for the CoinGecko markets endpoint
-            params = {
-                "ids": coin_id,
-                "vs_currency": vs_currency,
-                "order": "market_cap_desc",
-                "per_page": 1,
-                "page": 1,
-                "sparkline": "false",
-                "price_change_percentage": "24h"
-            }
-
-            response_data = self._make_request("coins/markets", params)
-            return self._format_market_data_response(response_data, coin_id, vs_currency)
+            return self.format_market_data(self._market_data_values(coin_id, vs_currency))
 
         except requests.exceptions.RequestException as e:
             error_msg = f"Error fetching market data for {coin_id}: {str(e)}"
             print(f"❌ [DEBUG] Erro de requisição: {error_msg}")
             return error_msg
+        except NoMarketDataError as e:
+            print(f"❌ [DEBUG] {e}")
+            return str(e)
         except Exception as e:
             error_msg = f"Unexpected error getting market data for {coin_id}: {str(e)}"
             print(f"❌ [DEBUG] Erro inesperado: {error_msg}")
             return error_msg
 
-    def _format_market_data_response(self, market_data: List[Dict], coin_id: str, vs_currency: str) -> str:
+    @instrumented_tool
+    def fetch_market_data(self, coin_id: str, vs_currency: str = "usd") -> Dict[str, Any]:
         """
-        Format the market data response into a readable string.
+        Structured market data for `coin_id` (the values behind `get_market_data`).
+
+        Not registered as an agent tool; raises instead of returning error text.
+
+        Returns:
+            Dict: coin_id, vs_currency, name, symbol, price, price_change_24h,
+                  market_cap and volume_24h (None when CoinGecko has no value).
         """
-        if not market_data or len(market_data) == 0:
-            no_data_msg = f"No market data found for {coin_id}"
-            print(f"❌ [DEBUG] {no_data_msg}")
-            return no_data_msg
+        return self._market_data_values(coin_id, vs_currency)
+
+    def _market_data_values(self, coin_id: str, vs_currency: str) -> Dict[str, Any]:
+        """Query the markets endpoint and keep the fields `format_market_data` renders."""
+        if not vs_currency:
+            vs_currency = self.default_vs_currency
+        # Parameters for the CoinGecko markets endpoint
+        params = {
+            "ids": coin_id,
+            "vs_currency": vs_currency,
+            "order": "market_cap_desc",
+            "per_page": 1,
+            "page": 1,
+            "sparkline": "false",
+            "price_change_percentage": "24h"
+        }
+
+        market_data = self._make_request("coins/markets", params)
+        if not market_data:
+            raise NoMarketDataError(f"No market data found for {coin_id}")
 
         # Extract data from the first (and only) result
         coin_data = market_data[0]
+        return {
+            "coin_id": coin_id,
+            "vs_currency": vs_currency,
+            "name": coin_data.get('name', coin_id),
+            "symbol": (coin_data.get('symbol') or '').upper(),
+            "price": coin_data.get('current_price'),
+            "price_change_24h": coin_data.get('price_change_percentage_24h'),
+            "market_cap": coin_data.get('market_cap'),
+            "volume_24h": coin_data.get('total_volume'),
+        }
+
+    def format_market_data(self, values: Dict[str, Any]) -> str:
+        """
+        Format the values from `fetch_market_data` into a readable string.
+        """
+        vs_currency = values["vs_currency"]
 
-        # Format the response
-        price = coin_data.get('current_price', 'N/A')
-        market_cap = coin_data.get('market_cap', 'N/A')
-        volume_24h = coin_data.get('total_volume', 'N/A')
-        price_change_24h = coin_data.get('price_change_percentage_24h', 'N/A')
-        symbol = coin_data.get('symbol', '').upper()
-        name = coin_data.get('name', coin_id)
+        def _or_na(value: Any) -> Any:
+            return 'N/A' if value is None else value
 
         # Format numbers for better readability with proper currency handling
-        price_formatted = self._format_price_value(price, vs_currency)
+        price_formatted = self._format_price_value(_or_na(values["price"]), vs_currency)
         market_cap_formatted = self._format_amount_value(
-            market_cap, vs_currency)
-        volume_formatted = self._format_amount_value(volume_24h, vs_currency)
+            _or_na(values["market_cap"]), vs_currency)
+        volume_formatted = self._format_amount_value(_or_na(values["volume_24h"]), vs_currency)
 
+        price_change_24h = values["price_change_24h"]
         if isinstance(price_change_24h, (int, float)):
             change_formatted = f"{price_change_24h:+.2f}%"
         else:
-            change_formatted = str(price_change_24h)
+            change_formatted = str(_or_na(price_change_24h))
 
         result = f"""
-🪙 **{name} ({symbol})**
+🪙 **{values['name']} ({values['symbol']})**
 💰 **Price**: {price_formatted}
 📊 **24h Change**: {change_formatted}
 🏦 **Market Cap**: {market_cap_formatted}
 📈 **24h Volume**: {volume_formatted}
         """.strip()
 
-        print(f"✅ [DEBUG] Dados formatados com sucesso para {coin_id}")
+        print(f"✅ [DEBUG] Dados formatados com sucesso para {values['coin_id']}")
         return result
 
+    @instrumented_tool
     def get_coin_data(self, coin_id: str, localization: bool = True, tickers: bool = True,
                       market_data: bool = True, community_data: bool = True,
                       developer_data: bool = True, sparkline: bool = False, vs_currency: str = "usd") -> str:
@@ -383,6 +551,7 @@ class CoinGeckoToolKit(Toolkit):
             f"✅ [DEBUG] Dados completos formatados com sucesso para {coin_data.get('id', 'unknown')}")
         return result
 
+    @instrumented_tool
     def get_coin_history(self, coin_id: str, date: str, localization: bool = False, vs_currency: str = "usd") -> str:
         """
         Get historical market data for a specific cryptocurrency on a given date.
@@ -469,6 +638,7 @@ class CoinGeckoToolKit(Toolkit):
             f"✅ [DEBUG] Dados históricos formatados com sucesso para {history_data.get('id', 'unknown')} em {date}")
         return result
 
+    @instrumented_tool
     def get_coin_chart(self, coin_id: str, vs_currency: str = "usd", days: str = "1",
                        interval: Optional[str] = None, precision: Optional[str] = None) -> str:
         """
@@ -568,6 +738,7 @@ class CoinGeckoToolKit(Toolkit):
             f"✅ [DEBUG] Dados de gráfico formatados com sucesso para {coin_id}")
         return result
 
+    @instrumented_tool
     def get_coin_ohlc(self, coin_id: str, vs_currency: str = "usd", days: str = "1",
                       precision: Optional[str] = None) -> str:
         """
@@ -658,6 +829,7 @@ class CoinGeckoToolKit(Toolkit):
         print(f"✅ [DEBUG] Dados OHLC formatados com sucesso para {coin_id}")
         return result
 
+    @instrumented_tool
     def get_trending(self) -> str:
         """
         Get trending cryptocurrencies based on search activity.
@@ -710,6 +882,7 @@ class CoinGeckoToolKit(Toolkit):
         print(f"✅ [DEBUG] Dados de trending formatados com sucesso")
         return result
 
+    @instrumented_tool
     def get_coins_list(self, include_platform: bool = False) -> str:
         """
         Get list of all supported cryptocurrencies.
@@ -778,6 +951,7 @@ class CoinGeckoToolKit(Toolkit):
             f"✅ [DEBUG] Lista de moedas formatada com sucesso - {total_coins} moedas encontradas")
         return result
 
+    @instrumented_tool
     def perform_technical_analysis(self, coin_id: str, vs_currency: str = "usd", days: str = "90") -> str:
         """
         Perform comprehensive technical analysis for a cryptocurrency with intelligent multi-timeframe support.
@@ -1288,6 +1462,7 @@ class CoinGeckoToolKit(Toolkit):
             print(f"❌ [DEBUG] Erro nos cálculos técnicos: {error_msg}")
             return error_msg
 
+    @instrumented_tool
     def calculate_deterministic_technical_signal(self, coin_id: str, vs_currency: str = "usd", days: str = "90") -> str:
         """
         Calculate technical signal using deterministic rules for consistent results.
@@ -7,9 +7,18 @@ API gratuita que fornece índice de medo e ganância do mercado crypto.
 """
 
 import requests
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 from agno.tools import Toolkit
 
+import _paths  # noqa: F401  (src/tools on the import path)
+from http_pool import get_session
+from response_cache import ResponseCache, get_response_cache
+from tool_telemetry import instrumented_tool
+
+
+class FearGreedUnavailable(RuntimeError):
+    """The API answered with an error or without index data."""
+
 
 class FearGreedToolKit(Toolkit):
     """
@@ -19,9 +28,13 @@ class FearGreedToolKit(Toolkit):
     API Documentation: https://alternative.me/crypto/fear-and-greed-index/
     """
 
-    def __init__(self, timeout: Optional[int] = 10):
+    def __init__(self, timeout: Optional[int] = 10, cache: Optional[ResponseCache] = None):
         super().__init__(name="fear_greed_index")
         self.timeout = timeout
+        # Pooled keep-alive session with 429/5xx retries
+        self.session = get_session()
+        # TTL response cache (the index changes once a day)
+        self.cache = cache if cache is not None else get_response_cache()
         self.base_url = "https://api.alternative.me"
         
         # Register available tools
@@ -29,24 +42,30 @@ class FearGreedToolKit(Toolkit):
         self.register(self.get_fear_greed_history)
 
     def _make_request(self, endpoint_path: str, params: Optional[Dict] = None) -> Dict:
-        """Make HTTP request to Fear and Greed API"""
+        """Make HTTP request to Fear and Greed API (served from the TTL cache when fresh)"""
         try:
             url = f"{self.base_url}{endpoint_path}"
             headers = {
                 "User-Agent": "FearGreedToolKit/1.0 (Crypto Analysis Agent)",
                 "Accept": "application/json",
             }
-            
-            response = requests.get(url, params=params, headers=headers, timeout=self.timeout)
-            response.raise_for_status()
-            
-            return response.json()
+
+            def fetch() -> Dict:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                response.raise_for_status()
+                return response.json()
+
+            if self.cache is None:
+                return fetch()
+            # Only successful answers reach the cache; errors are returned below
+            return self.cache.get_or_fetch("fear_greed", endpoint_path, params, fetch)
             
         except requests.exceptions.RequestException as e:
             return {"error": f"Request failed: {str(e)}"}
         except ValueError as e:
             return {"error": f"JSON decode failed: {str(e)}"}
 
+    @instrumented_tool
     def get_current_fear_greed(self) -> str:
         """
         Get the current Fear and Greed Index value and classification.
@@ -55,41 +74,68 @@ class FearGreedToolKit(Toolkit):
             str: Formatted string with current fear/greed index data
         """
         try:
-            data = self._make_request("/fng/")
-            
-            if "error" in data:
-                return f"❌ Error fetching Fear and Greed Index: {data['error']}"
-            
-            if not data.get("data") or len(data["data"]) == 0:
-                return "❌ No Fear and Greed Index data available"
-            
-            current_data = data["data"][0]
-            value = current_data.get("value", "N/A")
-            classification = current_data.get("value_classification", "Unknown")
-            
-            result = f"📊 **Fear and Greed Index**\n"
-            result += f"Current Value: **{value}/100**\n"
-            result += f"Classification: **{classification}**\n"
-            
-            # Add interpretation
-            if classification.lower() == "extreme fear":
-                result += "🔴 Market shows extreme fear - potential buying opportunity\n"
-            elif classification.lower() == "fear":
-                result += "🟠 Market shows fear - cautious sentiment\n"
-            elif classification.lower() == "neutral":
-                result += "🟡 Market sentiment is neutral - balanced emotions\n"
-            elif classification.lower() == "greed":
-                result += "🟢 Market shows greed - optimistic sentiment\n"
-            elif classification.lower() == "extreme greed":
-                result += "🔴 Market shows extreme greed - potential selling opportunity\n"
-                
-            result += f"\n📈 **Market Sentiment**: {classification} indicates {'selling pressure' if 'fear' in classification.lower() else 'buying pressure' if 'greed' in classification.lower() else 'balanced market'}."
-            
-            return result
-            
+            return self.format_fear_greed(self._current_fear_greed_values())
+        except FearGreedUnavailable as e:
+            return f"❌ {e}"
         except Exception as e:
             return f"❌ Error processing Fear and Greed Index: {str(e)}"
 
+    @instrumented_tool
+    def fetch_fear_greed_data(self) -> Dict[str, Any]:
+        """
+        Current index as values (the data behind `get_current_fear_greed`).
+
+        Not registered as an agent tool; raises instead of returning error text.
+
+        Returns:
+            Dict: value (int, or the raw API value when not numeric) and classification
+        """
+        return self._current_fear_greed_values()
+
+    def _current_fear_greed_values(self) -> Dict[str, Any]:
+        data = self._make_request("/fng/")
+
+        if "error" in data:
+            raise FearGreedUnavailable(f"Error fetching Fear and Greed Index: {data['error']}")
+
+        if not data.get("data") or len(data["data"]) == 0:
+            raise FearGreedUnavailable("No Fear and Greed Index data available")
+
+        current_data = data["data"][0]
+        value = current_data.get("value", "N/A")
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            pass
+        return {"value": value,
+                "classification": current_data.get("value_classification", "Unknown")}
+
+    def format_fear_greed(self, values: Dict[str, Any]) -> str:
+        """Format the values from `fetch_fear_greed_data` into a readable string."""
+        value = values["value"]
+        classification = values["classification"]
+
+        result = f"📊 **Fear and Greed Index**\n"
+        result += f"Current Value: **{value}/100**\n"
+        result += f"Classification: **{classification}**\n"
+        
+        # Add interpretation
+        if classification.lower() == "extreme fear":
+            result += "🔴 Market shows extreme fear - potential buying opportunity\n"
+        elif classification.lower() == "fear":
+            result += "🟠 Market shows fear - cautious sentiment\n"
+        elif classification.lower() == "neutral":
+            result += "🟡 Market sentiment is neutral - balanced emotions\n"
+        elif classification.lower() == "greed":
+            result += "🟢 Market shows greed - optimistic sentiment\n"
+        elif classification.lower() == "extreme greed":
+            result += "🔴 Market shows extreme greed - potential selling opportunity\n"
+            
+        result += f"\n📈 **Market Sentiment**: {classification} indicates {'selling pressure' if 'fear' in classification.lower() else 'buying pressure' if 'greed' in classification.lower() else 'balanced market'}."
+        
+        return result
+
+    @instrumented_tool
     def get_fear_greed_history(self, limit: int = 30, date_format: str = "us") -> str:
         """
         Get historical Fear and Greed Index data.
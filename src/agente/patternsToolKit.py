@@ -1,16 +1,35 @@
 import os
 import json
 import sys
+import threading
 from typing import Any, Dict, List, Optional, Tuple
 from agno.tools import Toolkit
 
+import _paths  # noqa: F401  (src/tools on the import path)
+from tool_telemetry import instrumented_tool
+
+
+_PATTERN_MODULE = None
+_PATTERN_MODULE_LOCK = threading.Lock()
+
 
 def _load_pattern_module():
     """Dynamically load the pattern engine module without requiring package imports.
 
     This avoids modifying PYTHONPATH at app startup and keeps the original
-    file structure intact.
+    file structure intact. The module is executed once per process and shared
+    by every PatternToolKit instance.
     """
+    global _PATTERN_MODULE
+    if _PATTERN_MODULE is not None:
+        return _PATTERN_MODULE
+    with _PATTERN_MODULE_LOCK:
+        if _PATTERN_MODULE is None:
+            _PATTERN_MODULE = _exec_pattern_module()
+    return _PATTERN_MODULE
+
+
+def _exec_pattern_module():
     import importlib.util
 
     current_dir = os.path.dirname(__file__)  # .../src/agente
@@ -72,6 +91,7 @@ class PatternToolKit(Toolkit):
         return f"{(coin_id or '').upper()}-{(vs_currency or self.default_vs_currency).upper()}"
 
     # ------------------------- public tools -------------------------
+    @instrumented_tool
     def detect_patterns(
         self,
         coin_id: str,
@@ -110,15 +130,29 @@ class PatternToolKit(Toolkit):
         selected_intervals = [i.strip() for i in (intervals or ",".join(default_intervals)).split(",") if i.strip()]
         effective_period = (period or default_period)
 
-        # Configure the engine period (avoids scanning huge ranges unintentionally)
-        mod.Config.DATA_PERIOD = effective_period
+        # The engine module is shared across concurrent requests: pass the period
+        # explicitly instead of mutating mod.Config.DATA_PERIOD
 
         ticker = self._build_ticker(coin_id, vs_currency or self.default_vs_currency)
 
         all_found: List[Dict[str, Any]] = []
         errors: List[str] = []
+        # Enriched frames per interval: shared by every selected strategy
+        frames: Dict[str, Any] = {}
+        zigzag_cache: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
 
         try:
+            # Download every needed interval up front, concurrently and rate limited
+            needed_intervals = [
+                i for i in selected_intervals
+                if any(i in mod.Config.ZIGZAG_STRATEGIES.get(name, {}) for name in selected_strategies)
+            ]
+            raw_frames: Dict[str, Any] = {
+                interval: result
+                for (_, interval), result in mod.baixar_series_concorrentes(
+                    [(ticker, i) for i in needed_intervals], effective_period)
+            }
+
             for strategy_name in selected_strategies:
                 strategy_cfg = mod.Config.ZIGZAG_STRATEGIES.get(strategy_name)
                 if not strategy_cfg:
@@ -132,9 +166,26 @@ class PatternToolKit(Toolkit):
 
                     params = strategy_cfg[interval]
                     try:
-                        df = mod.buscar_dados(ticker, mod.Config.DATA_PERIOD, interval)
-                        df = mod.calcular_indicadores(df)
-                        pivots = mod.calcular_zigzag_oficial(df, params['depth'], params['deviation'])
+                        df = frames.get(interval)
+                        if df is None:
+                            df = raw_frames.get(interval)
+                            if isinstance(df, Exception):
+                                raise df
+                            if df is None:
+                                df = mod.buscar_dados(ticker, effective_period, interval)
+                            df = mod.calcular_indicadores(df)
+                            frames[interval] = df
+                            # Batched ZigZag for every selected strategy on this interval
+                            interval_runs = [
+                                (name, mod.Config.ZIGZAG_STRATEGIES[name][interval])
+                                for name in selected_strategies
+                                if interval in mod.Config.ZIGZAG_STRATEGIES.get(name, {})
+                            ]
+                            batch = mod.calcular_zigzag_multiplo(
+                                df, [(cfg['depth'], cfg['deviation']) for _, cfg in interval_runs])
+                            zigzag_cache[interval] = {
+                                name: piv for (name, _), piv in zip(interval_runs, batch)}
+                        pivots = zigzag_cache[interval][strategy_name]
 
                         found_now: List[Dict[str, Any]] = []
 
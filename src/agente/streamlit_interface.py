@@ -6,7 +6,7 @@ import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Tuple
 
 # Page configuration
 st.set_page_config(
@@ -51,6 +51,9 @@ st.markdown("""
 
 # Configuration
 API_BASE_URL = "http://127.0.0.1:8000"
+JOB_POLL_INTERVAL_SECONDS = 2
+JOB_POLL_TIMEOUT_SECONDS = 600
+STREAM_READ_TIMEOUT_SECONDS = 60  # the API sends a keep-alive comment every 15s
 
 def check_api_health() -> bool:
     """Check if the API server is running"""
@@ -71,7 +74,7 @@ def get_available_coins() -> Dict[str, Any]:
         return {"available_coins": []}
 
 def analyze_crypto(coin_id: str, vs_currency: str, term_type: str) -> Dict[str, Any]:
-    """Call the crypto analysis API"""
+    """Start an analysis job on the API and poll it until it finishes"""
     try:
         payload = {
             "coin_id": coin_id,
@@ -79,16 +82,115 @@ def analyze_crypto(coin_id: str, vs_currency: str, term_type: str) -> Dict[str,
             "term_type": term_type
         }
         
-        response = requests.post(f"{API_BASE_URL}/analyze", json=payload, timeout=300)
+        response = requests.post(f"{API_BASE_URL}/jobs", json=payload, timeout=10)
         
-        if response.status_code == 200:
-            return response.json()
-        else:
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "a few")
+            return {"ok": False, "errors": [f"API is busy with other analyses, retry in {retry_after} seconds"]}
+        if response.status_code != 202:
             return {"ok": False, "errors": [f"API returned status {response.status_code}"]}
+
+        job_url = f"{API_BASE_URL}/jobs/{response.json()['job_id']}"
+        deadline = time.time() + JOB_POLL_TIMEOUT_SECONDS
+        while time.time() < deadline:
+            time.sleep(JOB_POLL_INTERVAL_SECONDS)
+            job_response = requests.get(job_url, timeout=10)
+            if job_response.status_code != 200:
+                return {"ok": False, "errors": [f"API returned status {job_response.status_code} for job"]}
+            job = job_response.json()
+            if job.get("status") in ("succeeded", "failed"):
+                return job.get("result") or {"ok": False, "errors": [job.get("error") or "Analysis failed"]}
+        return {"ok": False, "errors": [f"Analysis still running after {JOB_POLL_TIMEOUT_SECONDS}s"]}
             
     except requests.exceptions.RequestException as e:
         return {"ok": False, "errors": [f"Connection error: {str(e)}"]}
 
+def stream_analysis(coin_id: str, vs_currency: str, term_type: str) -> Iterator[Tuple[str, Any]]:
+    """Yield (event, data) pairs from the API's Server-Sent Events stream"""
+    payload = {
+        "coin_id": coin_id,
+        "vs_currency": vs_currency,
+        "term_type": term_type
+    }
+    try:
+        with requests.post(f"{API_BASE_URL}/analyze/stream", json=payload, stream=True,
+                           timeout=(10, STREAM_READ_TIMEOUT_SECONDS)) as response:
+            if response.status_code == 429:
+                retry_after = response.headers.get("Retry-After", "a few")
+                yield "done", {"ok": False, "errors": [f"API is busy with other analyses, retry in {retry_after} seconds"]}
+                return
+            if response.status_code == 404:
+                # API without the streaming endpoint: fall back to the polled job API
+                yield "done", analyze_crypto(coin_id, vs_currency, term_type)
+                return
+            if response.status_code != 200:
+                yield "done", {"ok": False, "errors": [f"API returned status {response.status_code}"]}
+                return
+            event, data_lines = None, []
+            for line in response.iter_lines(decode_unicode=True):
+                if line is None:
+                    continue
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data_lines.append(line[len("data:"):].strip())
+                elif line == "" and event:
+                    yield event, json.loads("\n".join(data_lines)) if data_lines else None
+                    if event == "done":
+                        return
+                    event, data_lines = None, []
+        yield "done", {"ok": False, "errors": ["Stream ended before the analysis finished"]}
+    except requests.exceptions.RequestException as e:
+        yield "done", {"ok": False, "errors": [f"Connection error: {str(e)}"]}
+
+def run_streamed_analysis(coin_id: str, vs_currency: str, term_type: str) -> Dict[str, Any]:
+    """Render tool calls and data sections as they arrive; returns the final API response"""
+    status = st.status(f"🔍 Analyzing {coin_id.upper()}...", expanded=True)
+    obtainable_box = st.empty()
+    obtainable: Dict[str, Any] = {}
+    result: Dict[str, Any] = {"ok": False, "errors": ["No response from API"]}
+
+    for event, data in stream_analysis(coin_id, vs_currency, term_type):
+        if event == "accepted":
+            status.write("📨 Request accepted, waiting for a worker...")
+        elif event == "started":
+            status.write("🛠️ Gathering market data, sentiment, news and patterns...")
+        elif event == "tool":
+            mark = "❌" if data.get("error") else "✅"
+            status.write(f"{mark} {data['toolkit']}.{data['function']}() "
+                         f"in {data['duration_ms'] / 1000:.2f}s ({data['bytes_returned']:,} chars)")
+        elif event == "obtainable":
+            obtainable.update(data or {})
+            with obtainable_box.container():
+                display_obtainable_preview(obtainable)
+        elif event == "thoughts":
+            status.write("🧠 AI analysis received")
+        elif event == "metadata":
+            status.write("⚙️ Metadata received")
+        elif event == "done":
+            result = data or result
+
+    obtainable_box.empty()
+    status.update(label="✅ Analysis complete!" if result.get("ok") else "❌ Analysis failed",
+                  state="complete" if result.get("ok") else "error", expanded=False)
+    return result
+
+def display_obtainable_preview(obtainable: Dict[str, Any]):
+    """Market data known so far, shown while the AI analysis is still running"""
+    st.markdown("### 📊 Market Data (live)")
+    col1, col2, col3, col4 = st.columns(4)
+    price = obtainable.get('price_current')
+    change_24h = obtainable.get('price_change_24h')
+    col1.metric("Current Price", f"${price:,.2f}" if price else "…",
+                delta=f"{change_24h:+.2f}%" if change_24h else None)
+    rsi = obtainable.get('rsi')
+    col2.metric("RSI", f"{rsi:.1f}" if rsi is not None else "…")
+    fear_greed = obtainable.get('fear_greed_value')
+    col3.metric("Fear & Greed", f"{fear_greed}/100" if fear_greed is not None else "…",
+                delta=obtainable.get('fear_greed_classification'), delta_color="off")
+    patterns = obtainable.get('patterns_found_count')
+    col4.metric("Chart Patterns", patterns if patterns is not None else "…")
+
 def display_analysis_results(data: Dict[str, Any]):
     """Display the analysis results in a structured format"""
     
@@ -385,40 +487,18 @@ def main():
             st.error("Please select or enter a valid coin ID")
             return
             
-        # Show loading state
-        with st.spinner(f"🔍 Analyzing {coin_id.upper()}... This may take a moment."):
-            
-            # Progress bar simulation
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            status_text.text("🛠️ Initializing tools...")
-            progress_bar.progress(20)
-            time.sleep(1)
-            
-            status_text.text("📊 Gathering market data...")
-            progress_bar.progress(40)
-            
-            # Call the API
-            start_time = time.time()
-            result = analyze_crypto(coin_id, vs_currency, term_type)
-            analysis_time = time.time() - start_time
-            
-            status_text.text("🧠 Processing AI analysis...")
-            progress_bar.progress(80)
-            time.sleep(0.5)
-            
-            status_text.text("✅ Analysis complete!")
-            progress_bar.progress(100)
-            time.sleep(0.5)
-            
-            # Clear progress indicators
-            progress_bar.empty()
-            status_text.empty()
+        # Tool calls and data sections are rendered as the API streams them
+        start_time = time.time()
+        result = run_streamed_analysis(coin_id, vs_currency, term_type)
+        analysis_time = time.time() - start_time
         
         # Display results
         if result.get("ok"):
             st.success(f"✅ Analysis completed in {analysis_time:.2f} seconds")
+            cache_meta = result.get("meta", {}).get("cache") or {}
+            if cache_meta.get("status") in ("fresh", "stale"):
+                st.info(f"♻️ Cached analysis from {cache_meta['age_seconds']:.0f}s ago"
+                        + (" (a refreshed analysis is being prepared)" if cache_meta.get("refreshing") else ""))
             
             # Display the analysis
             analysis_data = result.get("data", {})
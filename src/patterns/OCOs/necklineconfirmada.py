@@ -9,17 +9,37 @@ import pandas as pd
 import numpy as np
 import requests
 import pandas_ta as ta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import os
 import time
 import re
+import json
+import threading
+import contextvars
+import random
+import multiprocessing
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from colorama import Fore, Style, init
 import argparse
 import logging  # Fix: implementar logging padrão
+import sys
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 load_dotenv()
 
+# Shared keep-alive HTTP sessions (src/tools/http_pool.py). Under the API and the tests
+# src/tools is already importable, so the flat import shares their session pool; a
+# standalone run imports the helpers as the src.tools package from the repo root.
+try:
+    from http_pool import get_session, log_connection_stats, reset_sessions
+except ImportError:
+    _RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+    if _RAIZ not in sys.path:
+        sys.path.insert(0, _RAIZ)
+    from src.tools.http_pool import get_session, log_connection_stats, reset_sessions
+
 # Initialize Colorama
 init(autoreset=True)
 
@@ -72,6 +92,16 @@ class Config:
     COINGECKO_API_BASE = 'https://pro-api.coingecko.com/api/v3'
     COINGECKO_API_KEY_ENV = 'COINGECKO_API_KEY'
     VS_CURRENCY_DEFAULT = 'usd'
+    # Request budget shared by every worker process (see `--workers`)
+    COINGECKO_REQUESTS_PER_MINUTE = 250
+    # Token-bucket burst: requests allowed back to back before spacing kicks in
+    COINGECKO_RATE_BURST = 5
+    # Concurrent downloads (threads) of `baixar_series_concorrentes`
+    COINGECKO_MAX_CONCURRENT_REQUESTS = 8
+    # Per-request retries on 429/5xx/network errors, with exponential backoff
+    COINGECKO_MAX_RETRIES = 4
+    COINGECKO_BACKOFF_BASE_SECONDS = 1.0
+    COINGECKO_BACKOFF_MAX_SECONDS = 60.0
 
     # Map project tickers (e.g., BTC-USD) to CoinGecko coin IDs
     COINGECKO_IDS: Dict[str, str] = {
@@ -281,11 +311,17 @@ class Config:
     HEAD_EXTREME_LOOKBACK_MIN_BARS = 8
 
     RECENT_PATTERNS_LOOKBACK_COUNT = 1
+    # Full-history scan: slide over every pivot window instead of only the last
+    # RECENT_PATTERNS_LOOKBACK_COUNT ones (dataset mining over long histories)
+    FULL_HISTORY_SCAN = False
     NECKLINE_RETEST_ATR_MULTIPLIER = 5.0
 
     ZIGZAG_EXTEND_TO_LAST_BAR = True
     # Fix: fator de desvio mínimo para pivô de extensão parametrizado
     ZIGZAG_EXTENSION_DEVIATION_FACTOR = 0.25
+    # Indicator engine for calcular_indicadores: 'numpy' (internal, same formulas
+    # as pandas_ta) or 'pandas_ta'
+    INDICATOR_ENGINE = 'numpy'
     # Debug toggles
     HNS_DEBUG = True
     DTB_DEBUG = True
@@ -293,9 +329,30 @@ class Config:
     TTB_DEBUG = True  # Fix: disable noisy debug by default
 
     MAX_DOWNLOAD_TENTATIVAS, RETRY_DELAY_SEGUNDOS = 3, 5
+
+    # --- Local OHLCV cache (Parquet) ---
+    # Frames returned by `buscar_dados` are persisted per (coin_id, vs_currency,
+    # interval, days) with a JSON sidecar holding freshness metadata.
+    OHLCV_CACHE_ENABLED = True
+    OHLCV_CACHE_DIR = os.path.join('data', 'cache', 'ohlcv')
+    # Max age (seconds) before a cached series is considered stale, per interval
+    OHLCV_CACHE_MAX_AGE_SECONDS = {
+        '5m': 5 * 60, '15m': 15 * 60,
+        '1h': 60 * 60, '4h': 4 * 60 * 60,
+        '1d': 24 * 60 * 60, '1wk': 7 * 24 * 60 * 60, '1mo': 30 * 24 * 60 * 60,
+    }
+    OHLCV_CACHE_MAX_AGE_DEFAULT_SECONDS = 60 * 60
     OUTPUT_DIR = 'data/datasets/patterns_by_strategy'
     FINAL_CSV_PATH = os.path.join(OUTPUT_DIR, 'dataset_patterns_final.csv')
 
+    # --- Live monitor (CLI --monitor) ---
+    MONITOR_POLL_SECONDS = 60
+    # Processing time per closed bar above which a warning is logged
+    MONITOR_MAX_LATENCY_MS = 1000
+    # Trailing bars kept per series (must cover the widest pattern the strategies can form)
+    MONITOR_MAX_BARS = 5000
+    MONITOR_OUTPUT_PATH = os.path.join('data', 'datasets', 'monitor', 'sinais.jsonl')
+
 # --- Helper functions ---
 
 
@@ -365,6 +422,27 @@ def calcular_indicadores(df: pd.DataFrame) -> pd.DataFrame:
     - OBV
     - ATR_14
     """
+    if getattr(Config, 'INDICATOR_ENGINE', 'numpy') == 'numpy':
+        try:
+            _calcular_indicadores_numpy(df)
+        except Exception as e:
+            logging.warning(
+                "NumPy indicator engine failed (%s); falling back to pandas_ta.", e)
+            _calcular_indicadores_pandas_ta(df)
+    else:
+        _calcular_indicadores_pandas_ta(df)
+
+    # Range max/min index used by the context/extreme rules
+    try:
+        obter_indice_extremos(df)
+    except Exception:
+        pass
+
+    return df
+
+
+def _calcular_indicadores_pandas_ta(df: pd.DataFrame) -> pd.DataFrame:
+    """pandas_ta path of `calcular_indicadores` (one accessor call per indicator)."""
     try:
         # RSI (close, high, low)
         rsi_len = getattr(Config, 'RSI_LENGTH', 14)
@@ -434,6 +512,937 @@ def calcular_indicadores(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+# --- NumPy indicator engine (same formulas as pandas_ta 0.3.x, non-TA-Lib path) ---
+
+def _recorrencia_linear(x: np.ndarray, c: float) -> np.ndarray:
+    """Solve y[t] = c * y[t-1] + x[t] (y[-1] = 0) along axis 0 without a per-bar loop.
+
+    Works in blocks: inside a block y[s+j] = c**j * (c*y[s-1] + sum_i x[s+i] * c**-i),
+    with the block short enough for c**-i to stay far from overflow. A 2-D `x`
+    solves one independent recurrence per column in the same pass.
+    """
+    n = len(x)
+    y = np.empty(x.shape, dtype=float)
+    if n == 0:
+        return y
+    if c <= 0.0:
+        y[:] = x
+        return y
+    bloco = int(min(512, max(1, 300.0 // -np.log(c)))) if c < 1.0 else 512
+    expoentes = np.arange(bloco).reshape((bloco,) + (1,) * (x.ndim - 1))
+    inv_pot, pot = c ** -expoentes, c ** expoentes
+    carry = 0.0
+    for s in range(0, n, bloco):
+        xs = x[s:s + bloco]
+        m = len(xs)
+        y[s:s + m] = (c * carry + np.cumsum(xs * inv_pot[:m], axis=0)) * pot[:m]
+        carry = y[s + m - 1]
+    return y
+
+
+def _ewm_media(x: np.ndarray, alpha: float, adjust: bool, min_periods: int = 0) -> np.ndarray:
+    """`pd.Series(x).ewm(alpha=alpha, adjust=adjust, min_periods=min_periods).mean()`.
+
+    With `adjust=True` a 2-D `x` is averaged column by column in one pass.
+    """
+    n = len(x)
+    validos = ~np.isnan(x)
+    if not validos.any():
+        return np.full(x.shape, np.nan)
+    c = 1.0 - alpha
+    contagem = None
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if adjust:
+            # Weighted mean = num/den, both linear recurrences (NaN bars only decay
+            # weights). Before the first value num = den = 0 -> NaN.
+            num = _recorrencia_linear(np.where(validos, x, 0.0), c)
+            primeiro = np.atleast_1d(validos.argmax(axis=0))
+            if (primeiro == primeiro[0]).all() and validos[primeiro[0]:].all():
+                # Common start and no gaps: the weight sum and the observation
+                # count have a closed form shared by every column
+                contagem = np.maximum(np.arange(1, n + 1) - primeiro[0], 0)
+                den = -np.expm1(np.log(c) * contagem) / alpha
+                if x.ndim > 1:
+                    contagem, den = contagem[:, None], den[:, None]
+            else:
+                den = _recorrencia_linear(validos.astype(float), c)
+            out = num / den
+        else:
+            primeiro = int(validos.argmax())
+            if not validos[primeiro:].all():
+                out = _ewm_sem_ajuste_loop(x, alpha)
+            else:
+                # y = (c*y + alpha*x) / (c + alpha), seeded with the first observation
+                soma = c + alpha
+                entrada = (alpha / soma) * x[primeiro:]
+                entrada[0] = x[primeiro]
+                out = np.full(n, np.nan)
+                out[primeiro:] = _recorrencia_linear(entrada, c / soma)
+    if min_periods > 1:
+        if contagem is None:
+            contagem = np.cumsum(validos, axis=0)
+        out[np.broadcast_to(contagem < min_periods, out.shape)] = np.nan
+    return out
+
+
+def _ewm_sem_ajuste_loop(x: np.ndarray, alpha: float) -> np.ndarray:
+    """Exact pandas `ewm(adjust=False)` recursion for series with NaN gaps (rare path)."""
+    out = np.full(len(x), np.nan)
+    media, peso = np.nan, 1.0
+    for i, valor in enumerate(x.tolist()):
+        if media == media:
+            peso *= 1.0 - alpha
+            if valor == valor:
+                if media != valor:
+                    media = (peso * media + alpha * valor) / (peso + alpha)
+                peso = 1.0
+        elif valor == valor:
+            media = valor
+        out[i] = media
+    return out
+
+
+def _rma_np(x: np.ndarray, length: int) -> np.ndarray:
+    """Wilder's moving average as pandas_ta `rma` (ewm alpha=1/length, adjusted)."""
+    return _ewm_media(x, 1.0 / length, adjust=True, min_periods=length)
+
+
+def _ema_np(x: np.ndarray, length: int) -> np.ndarray:
+    """pandas_ta `ema`: SMA-seeded, `ewm(span=length, adjust=False)`."""
+    x = np.array(x, dtype=float)
+    seed = x[:length]
+    seed = seed[~np.isnan(seed)]
+    x[:length - 1] = np.nan
+    x[length - 1] = seed.mean() if seed.size else np.nan
+    return _ewm_media(x, 2.0 / (length + 1.0), adjust=False)
+
+
+def _janela_np(x: np.ndarray, length: int, reducao) -> np.ndarray:
+    """Full-window rolling min/max (`rolling(length).min()/.max()`), NaN-propagating.
+
+    `reducao` is a binary ufunc (np.minimum / np.maximum) folded over the
+    `length` shifted views, which beats a per-window reduction for short windows.
+    """
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n >= length:
+        acumulado = x[length - 1:].copy()
+        for desloc in range(1, length):
+            reducao(acumulado, x[length - 1 - desloc:n - desloc], out=acumulado)
+        out[length - 1:] = acumulado
+    return out
+
+
+def _media_movel_np(x: np.ndarray, length: int) -> np.ndarray:
+    """`rolling(length).mean()`: NaN while the window holds fewer than `length` values."""
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n >= length:
+        invalidos = np.isnan(x)
+        soma = np.concatenate(([0.0], np.cumsum(np.where(invalidos, 0.0, x))))
+        faltas = np.concatenate(([0], np.cumsum(invalidos)))
+        janela = (soma[length:] - soma[:-length]) / length
+        janela[(faltas[length:] - faltas[:-length]) > 0] = np.nan
+        out[length - 1:] = janela
+    return out
+
+
+def _non_zero_range_np(high: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """pandas_ta `non_zero_range`: high - low, shifted by epsilon if any range is zero."""
+    faixa = high - low
+    if (faixa == 0).any():
+        faixa = faixa + np.finfo(float).eps
+    return faixa
+
+
+def _diff_np(x: np.ndarray) -> np.ndarray:
+    out = np.empty(x.shape)
+    out[:1] = np.nan
+    out[1:] = x[1:] - x[:-1]
+    return out
+
+
+def _rsi_np(x: np.ndarray, length: int) -> np.ndarray:
+    """pandas_ta `rsi`; a 2-D `x` gives one RSI column per input column."""
+    diff = _diff_np(x)
+    ganhos, perdas = diff.copy(), diff.copy()
+    ganhos[ganhos < 0] = 0
+    perdas[perdas > 0] = 0
+    medias = _rma_np(np.concatenate((ganhos, perdas), axis=-1) if x.ndim > 1
+                     else np.column_stack((ganhos, perdas)), length)
+    media_ganhos, media_perdas = np.split(medias, 2, axis=1)
+    if x.ndim == 1:
+        media_ganhos, media_perdas = media_ganhos[:, 0], media_perdas[:, 0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100 * media_ganhos / (media_ganhos + np.abs(media_perdas))
+
+
+def _macd_np(close: np.ndarray, fast: int, slow: int, signal: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(macd, histogram, signal); all NaN while the series is too short."""
+    vazio = np.full(len(close), np.nan)
+    if len(close) < max(fast, slow, signal):
+        return vazio, vazio.copy(), vazio.copy()
+    linha = _ema_np(close, fast) - _ema_np(close, slow)
+    validos = np.flatnonzero(~np.isnan(linha))
+    if len(validos) < signal:
+        return linha, vazio.copy(), vazio.copy()
+    sinal = vazio
+    sinal[validos[0]:] = _ema_np(linha[validos[0]:], signal)
+    return linha, linha - sinal, sinal
+
+
+def _stoch_np(high: np.ndarray, low: np.ndarray, close: np.ndarray, k: int, d: int,
+              smooth_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    menor, maior = _janela_np(low, k, np.minimum), _janela_np(high, k, np.maximum)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bruto = 100 * (close - menor) / _non_zero_range_np(maior, menor)
+    stoch_k = _media_movel_np(bruto, smooth_k)
+    return stoch_k, _media_movel_np(stoch_k, d)
+
+
+def _obv_np(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    sinal = np.sign(_diff_np(close))
+    sinal[:1] = 1
+    volume_com_sinal = sinal * volume
+    obv = np.nancumsum(volume_com_sinal)
+    obv[np.isnan(volume_com_sinal)] = np.nan
+    return obv
+
+
+def _atr_np(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int) -> np.ndarray:
+    fechamento_anterior = np.empty(len(close))
+    fechamento_anterior[:1] = np.nan
+    fechamento_anterior[1:] = close[:-1]
+    faixas = np.abs(np.vstack((_non_zero_range_np(high, low),
+                               high - fechamento_anterior, fechamento_anterior - low)))
+    true_range = np.fmax.reduce(faixas, axis=0)
+    true_range[:1] = np.nan
+    return _rma_np(true_range, length)
+
+
+def _calcular_indicadores_numpy(df: pd.DataFrame) -> pd.DataFrame:
+    """NumPy path of `calcular_indicadores`: same columns and formulas as pandas_ta.
+
+    Every indicator is computed from the contiguous float64 OHLCV arrays and
+    each result array is attached as its column as-is (no intermediate copy).
+    Frames too short for an indicator get an all-NaN column instead of a
+    missing one.
+    """
+    close = df['close'].to_numpy(dtype=float)
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    colunas: List[str] = []
+    series: List[np.ndarray] = []
+
+    rsi_len = getattr(Config, 'RSI_LENGTH', 14)
+    rsi = _rsi_np(np.column_stack((close, high, low)), rsi_len)
+    for j, sufixo in enumerate(('CLOSE', 'HIGH', 'LOW')):
+        colunas.append(f'RSI_{rsi_len}_{sufixo}')
+        series.append(rsi[:, j])
+
+    macd_fast = getattr(Config, 'MACD_FAST', 12)
+    macd_slow = getattr(Config, 'MACD_SLOW', 26)
+    macd_signal = getattr(Config, 'MACD_SIGNAL', 9)
+    sufixo = f'{macd_fast}_{macd_slow}_{macd_signal}'
+    colunas += [f'MACD_{sufixo}', f'MACDh_{sufixo}', f'MACDs_{sufixo}']
+    series += list(_macd_np(close, macd_fast, macd_slow, macd_signal))
+
+    k = getattr(Config, 'STOCH_K', 14)
+    d = getattr(Config, 'STOCH_D', 3)
+    smooth_k = getattr(Config, 'STOCH_SMOOTH_K', 3)
+    colunas += [f'STOCHk_{k}_{d}_{smooth_k}', f'STOCHd_{k}_{d}_{smooth_k}']
+    series += list(_stoch_np(high, low, close, k, d, smooth_k))
+
+    if 'volume' in df.columns:
+        colunas.append('OBV')
+        series.append(_obv_np(close, df['volume'].to_numpy(dtype=float)))
+
+    colunas.append('ATR_14')
+    series.append(_atr_np(high, low, close, 14))
+
+    for coluna, valores in zip(colunas, series):
+        df[coluna] = valores
+    return df
+
+
+# --- Incremental indicators (live bars) ---
+
+class _RMAIncremental:
+    """pandas_ta `rma` (ewm alpha=1/length, adjusted, min_periods=length), one value at a time."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self._c = 1.0 - 1.0 / length
+        self._num = 0.0
+        self._den = 0.0
+        self._validos = 0
+        self.valor = float('nan')
+
+    def semear(self, x: np.ndarray) -> float:
+        """State after the whole series `x` (vectorized)."""
+        validos = ~np.isnan(x)
+        if len(x):
+            self._num = float(_recorrencia_linear(np.where(validos, x, 0.0), self._c)[-1])
+            self._den = float(_recorrencia_linear(validos.astype(float), self._c)[-1])
+        self._validos = int(validos.sum())
+        self.valor = self._valor_atual()
+        return self.valor
+
+    def atualizar(self, x: float) -> float:
+        self._num *= self._c
+        self._den *= self._c
+        if x == x:
+            self._num += x
+            self._den += 1.0
+            self._validos += 1
+        self.valor = self._valor_atual()
+        return self.valor
+
+    def _valor_atual(self) -> float:
+        if self._validos < self.length or self._den <= 0.0:
+            return float('nan')
+        return self._num / self._den
+
+
+class _EMAIncremental:
+    """pandas_ta `ema` (SMA seed over the first `length` values, then ewm adjust=False)."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self._alpha = 2.0 / (length + 1.0)
+        self._semente: List[float] = []
+        # Weight of the running mean (< 1 only across NaN gaps, as in pandas)
+        self._peso = 1.0
+        self.valor = float('nan')
+
+    def semear(self, x: np.ndarray) -> float:
+        x = np.asarray(x, dtype=float)
+        if len(x) >= self.length:
+            self._semente = [float('nan')] * self.length
+            self.valor = float(_ema_np(x, self.length)[-1])
+            validos = np.flatnonzero(~np.isnan(x[self.length - 1:]))
+            lacuna = len(x) - self.length - int(validos[-1]) if len(validos) else 0
+            self._peso = (1.0 - self._alpha) ** lacuna
+        else:
+            self._semente = [float(v) for v in x]
+            self.valor = float('nan')
+        return self.valor
+
+    def atualizar(self, x: float) -> float:
+        if len(self._semente) < self.length:
+            self._semente.append(float(x))
+            if len(self._semente) == self.length:
+                validos = [v for v in self._semente if v == v]
+                self.valor = sum(validos) / len(validos) if validos else float('nan')
+            return self.valor
+        # Same recursion as `_ewm_sem_ajuste_loop`
+        if self.valor == self.valor:
+            self._peso *= 1.0 - self._alpha
+            if x == x:
+                if self.valor != x:
+                    self.valor = (self._peso * self.valor + self._alpha * x) / (self._peso + self._alpha)
+                self._peso = 1.0
+        elif x == x:
+            self.valor = x
+        return self.valor
+
+
+class RSIIncremental:
+    """Wilder RSI (pandas_ta `rsi`) updated in O(1) per bar."""
+
+    def __init__(self, length: int = 14):
+        self.length = length
+        self._ganhos = _RMAIncremental(length)
+        self._perdas = _RMAIncremental(length)
+        self._anterior = float('nan')
+        self.valor = float('nan')
+
+    def semear(self, x: np.ndarray) -> float:
+        diff = _diff_np(np.asarray(x, dtype=float))
+        self._ganhos.semear(np.where(diff < 0, 0.0, diff))
+        self._perdas.semear(np.where(diff > 0, 0.0, diff))
+        self._anterior = float(x[-1]) if len(x) else float('nan')
+        self.valor = self._valor_atual()
+        return self.valor
+
+    def atualizar(self, x: float) -> float:
+        diff = x - self._anterior
+        self._anterior = x
+        self._ganhos.atualizar(max(diff, 0.0) if diff == diff else diff)
+        self._perdas.atualizar(min(diff, 0.0) if diff == diff else diff)
+        self.valor = self._valor_atual()
+        return self.valor
+
+    def _valor_atual(self) -> float:
+        ganhos, perdas = self._ganhos.valor, abs(self._perdas.valor)
+        total = ganhos + perdas
+        if total != total or total == 0.0:
+            return float('nan')
+        return 100.0 * ganhos / total
+
+
+class MACDIncremental:
+    """MACD line, histogram and signal (pandas_ta `macd`) updated in O(1) per bar."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self._rapida = _EMAIncremental(fast)
+        self._lenta = _EMAIncremental(slow)
+        self._sinal = _EMAIncremental(signal)
+        self.linha = self.histograma = self.sinal = float('nan')
+
+    def semear(self, x: np.ndarray) -> Tuple[float, float, float]:
+        x = np.asarray(x, dtype=float)
+        self._rapida.semear(x)
+        self._lenta.semear(x)
+        # The signal EMA only sees the MACD line from its first valid value on
+        if len(x) >= max(self._rapida.length, self._lenta.length):
+            linha = _ema_np(x, self._rapida.length) - _ema_np(x, self._lenta.length)
+            validos = np.flatnonzero(~np.isnan(linha))
+            self._sinal.semear(linha[validos[0]:] if len(validos) else linha[:0])
+        else:
+            self._sinal.semear(x[:0])
+        self._atualizar_saida()
+        return self.linha, self.histograma, self.sinal
+
+    def atualizar(self, x: float) -> Tuple[float, float, float]:
+        linha = self._rapida.atualizar(x) - self._lenta.atualizar(x)
+        if linha == linha:
+            self._sinal.atualizar(linha)
+        self._atualizar_saida()
+        return self.linha, self.histograma, self.sinal
+
+    def _atualizar_saida(self):
+        self.linha = self._rapida.valor - self._lenta.valor
+        self.sinal = self._sinal.valor
+        self.histograma = self.linha - self.sinal
+
+
+class EstocasticoIncremental:
+    """%K/%D (pandas_ta `stoch`) over rolling windows of the last bars."""
+
+    def __init__(self, k: int = 14, d: int = 3, smooth_k: int = 3):
+        self.k, self.d, self.smooth_k = k, d, smooth_k
+        self._highs: deque = deque(maxlen=k)
+        self._lows: deque = deque(maxlen=k)
+        self._brutos: deque = deque(maxlen=smooth_k)
+        self._ks: deque = deque(maxlen=d)
+        # pandas_ta adds epsilon to every range once any range is zero
+        self._faixa_zero = False
+        self.valor_k = self.valor_d = float('nan')
+
+    def semear(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Tuple[float, float]:
+        n = len(close)
+        if n >= self.k:
+            maior = _janela_np(np.asarray(high, dtype=float), self.k, np.maximum)
+            menor = _janela_np(np.asarray(low, dtype=float), self.k, np.minimum)
+            self._faixa_zero = bool(((maior - menor) == 0).any())
+        # Only the last k + smooth_k + d bars influence the windows
+        inicio = max(0, n - (self.k + self.smooth_k + self.d))
+        for i in range(inicio, n):
+            self.atualizar(float(high[i]), float(low[i]), float(close[i]))
+        return self.valor_k, self.valor_d
+
+    def atualizar(self, high: float, low: float, close: float) -> Tuple[float, float]:
+        self._highs.append(high)
+        self._lows.append(low)
+        bruto = float('nan')
+        if len(self._highs) == self.k:
+            maior, menor = max(self._highs), min(self._lows)
+            if maior - menor == 0:
+                self._faixa_zero = True
+            faixa = (maior - menor) + (np.finfo(float).eps if self._faixa_zero else 0.0)
+            if faixa != 0:
+                bruto = 100.0 * (close - menor) / faixa
+        self._brutos.append(bruto)
+        self.valor_k = _media_janela_cheia(self._brutos, self.smooth_k)
+        self._ks.append(self.valor_k)
+        self.valor_d = _media_janela_cheia(self._ks, self.d)
+        return self.valor_k, self.valor_d
+
+
+def _media_janela_cheia(janela: deque, length: int) -> float:
+    """Mean of a full window (NaN if short or holding NaN), as `rolling(length).mean()`."""
+    if len(janela) < length:
+        return float('nan')
+    return sum(janela) / length
+
+
+class OBVIncremental:
+    """On-balance volume (pandas_ta `obv`) as a running sum.
+
+    The running total skips bars whose signed volume is NaN (like the batch
+    `nancumsum`); those bars report NaN without resetting the total.
+    """
+
+    def __init__(self):
+        self._anterior = float('nan')
+        self._iniciado = False
+        self._soma = 0.0
+        self.valor = float('nan')
+
+    def semear(self, close: np.ndarray, volume: np.ndarray) -> float:
+        if len(close):
+            close = np.asarray(close, dtype=float)
+            obv = _obv_np(close, np.asarray(volume, dtype=float))
+            finitos = obv[~np.isnan(obv)]
+            self._soma = float(finitos[-1]) if len(finitos) else 0.0
+            self.valor = float(obv[-1])
+            self._anterior = float(close[-1])
+            self._iniciado = True
+        return self.valor
+
+    def atualizar(self, close: float, volume: float) -> float:
+        sinal = 1.0 if not self._iniciado else float(np.sign(close - self._anterior))
+        self._iniciado = True
+        self._anterior = close
+        parcela = sinal * volume
+        if parcela != parcela:
+            self.valor = float('nan')
+        else:
+            self._soma += parcela
+            self.valor = self._soma
+        return self.valor
+
+
+class ATRIncremental:
+    """ATR (pandas_ta `atr`, RMA of the true range) updated in O(1) per bar."""
+
+    def __init__(self, length: int = 14):
+        self.length = length
+        self._rma = _RMAIncremental(length)
+        self._fechamento_anterior = float('nan')
+        self._iniciado = False
+        self._faixa_zero = False
+        self.valor = float('nan')
+
+    def semear(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> float:
+        high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+        if len(close):
+            self._faixa_zero = bool(((high - low) == 0).any())
+            fechamento_anterior = np.concatenate(([np.nan], close[:-1]))
+            faixas = np.abs(np.vstack((_non_zero_range_np(high, low),
+                                       high - fechamento_anterior, fechamento_anterior - low)))
+            true_range = np.fmax.reduce(faixas, axis=0)
+            true_range[:1] = np.nan
+            self._rma.semear(true_range)
+            self._fechamento_anterior = float(close[-1])
+            self._iniciado = True
+        self.valor = self._rma.valor
+        return self.valor
+
+    def atualizar(self, high: float, low: float, close: float) -> float:
+        if not self._iniciado:
+            true_range = float('nan')
+        else:
+            if high - low == 0:
+                self._faixa_zero = True
+            faixa = (high - low) + (np.finfo(float).eps if self._faixa_zero else 0.0)
+            candidatos = [abs(v) for v in (faixa, high - self._fechamento_anterior,
+                                           self._fechamento_anterior - low) if v == v]
+            true_range = max(candidatos) if candidatos else float('nan')
+        self._iniciado = True
+        self._fechamento_anterior = close
+        self.valor = self._rma.atualizar(true_range)
+        return self.valor
+
+
+class IndicadoresIncrementais:
+    """Live counterpart of `calcular_indicadores`: seed once from a frame, then
+    update per closed bar in O(1).
+
+    `atualizar` returns the new bar's values keyed by the same column names that
+    `calcular_indicadores` writes (RSI_*, MACD*, STOCH*, OBV, ATR_14).
+    """
+
+    def __init__(self):
+        self.rsi_len = getattr(Config, 'RSI_LENGTH', 14)
+        fast = getattr(Config, 'MACD_FAST', 12)
+        slow = getattr(Config, 'MACD_SLOW', 26)
+        signal = getattr(Config, 'MACD_SIGNAL', 9)
+        k = getattr(Config, 'STOCH_K', 14)
+        d = getattr(Config, 'STOCH_D', 3)
+        smooth_k = getattr(Config, 'STOCH_SMOOTH_K', 3)
+        self._sufixo_macd = f'{fast}_{slow}_{signal}'
+        self._sufixo_stoch = f'{k}_{d}_{smooth_k}'
+        self.rsi = {fonte: RSIIncremental(self.rsi_len) for fonte in ('close', 'high', 'low')}
+        self.macd = MACDIncremental(fast, slow, signal)
+        self.estocastico = EstocasticoIncremental(k, d, smooth_k)
+        self.obv = OBVIncremental()
+        self.atr = ATRIncremental(14)
+        self.barras = 0
+
+    @classmethod
+    def a_partir_do_frame(cls, df: pd.DataFrame) -> 'IndicadoresIncrementais':
+        """State after every bar of `df` (OHLC, optional volume)."""
+        estado = cls()
+        close = df['close'].to_numpy(dtype=float)
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        for fonte, valores in (('close', close), ('high', high), ('low', low)):
+            estado.rsi[fonte].semear(valores)
+        estado.macd.semear(close)
+        estado.estocastico.semear(high, low, close)
+        if 'volume' in df.columns:
+            estado.obv.semear(close, df['volume'].to_numpy(dtype=float))
+        estado.atr.semear(high, low, close)
+        estado.barras = len(df)
+        return estado
+
+    def atualizar(self, high: float, low: float, close: float,
+                  volume: float = float('nan')) -> Dict[str, float]:
+        """Append one closed bar and return its indicator values."""
+        high, low, close, volume = float(high), float(low), float(close), float(volume)
+        for fonte, valor in (('close', close), ('high', high), ('low', low)):
+            self.rsi[fonte].atualizar(valor)
+        self.macd.atualizar(close)
+        self.estocastico.atualizar(high, low, close)
+        self.obv.atualizar(close, volume)
+        self.atr.atualizar(high, low, close)
+        self.barras += 1
+        return self.valores()
+
+    def valores(self) -> Dict[str, float]:
+        """Indicator values of the last bar, keyed like the batch columns."""
+        return {
+            f'RSI_{self.rsi_len}_CLOSE': self.rsi['close'].valor,
+            f'RSI_{self.rsi_len}_HIGH': self.rsi['high'].valor,
+            f'RSI_{self.rsi_len}_LOW': self.rsi['low'].valor,
+            f'MACD_{self._sufixo_macd}': self.macd.linha,
+            f'MACDh_{self._sufixo_macd}': self.macd.histograma,
+            f'MACDs_{self._sufixo_macd}': self.macd.sinal,
+            f'STOCHk_{self._sufixo_stoch}': self.estocastico.valor_k,
+            f'STOCHd_{self._sufixo_stoch}': self.estocastico.valor_d,
+            'OBV': self.obv.valor,
+            'ATR_14': self.atr.valor,
+        }
+
+
+class _RangeExtremaIndex:
+    """Sparse tables over `high`/`low` answering range max/min in O(1).
+
+    Level k holds the extreme of every 2**k-bar block; a query over
+    [start, end) combines two overlapping blocks. NaN bars are skipped
+    (like pandas `max()`/`min()`); empty or all-NaN ranges yield NaN.
+    """
+
+    def __init__(self, high: np.ndarray, low: np.ndarray):
+        self.n = len(high)
+        self._high_levels = self._build(np.asarray(high, dtype=float), np.fmax)
+        self._low_levels = self._build(np.asarray(low, dtype=float), np.fmin)
+
+    def estender(self, high: np.ndarray, low: np.ndarray) -> None:
+        """Append bars in place (amortized O(log n) per bar instead of a rebuild)."""
+        n = self.n + len(high)
+        self._estender_niveis(self._high_levels, np.asarray(high, dtype=float), np.fmax, self.n, n)
+        self._estender_niveis(self._low_levels, np.asarray(low, dtype=float), np.fmin, self.n, n)
+        self.n = n
+
+    @staticmethod
+    def _estender_niveis(levels: List[np.ndarray], values: np.ndarray, op, n_antes: int, n: int) -> None:
+        # Level arrays grow by doubling, so only their first n - 2**k + 1 entries are valid
+        half, k = 1, 0
+        while half <= n:
+            tamanho = n - half + 1
+            inicio = max(0, n_antes - half + 1)
+            if k == len(levels):
+                levels.append(np.empty(0))
+            level = levels[k]
+            if len(level) < tamanho:
+                maior = np.empty(max(tamanho, 2 * len(level)))
+                maior[:inicio] = level[:inicio]
+                levels[k] = level = maior
+            if k == 0:
+                level[inicio:tamanho] = values
+            else:
+                prev, meio = levels[k - 1], half // 2
+                level[inicio:tamanho] = op(prev[inicio:tamanho], prev[inicio + meio:tamanho + meio])
+            half, k = half * 2, k + 1
+
+    @staticmethod
+    def _build(values: np.ndarray, op) -> List[np.ndarray]:
+        levels = [values]
+        half = 1
+        while 2 * half <= len(values):
+            prev = levels[-1]
+            levels.append(op(prev[:-half], prev[half:]))
+            half *= 2
+        return levels
+
+    @staticmethod
+    def _query(levels: List[np.ndarray], op, start: int, end: int) -> float:
+        if end <= start:
+            return float('nan')
+        k = int(end - start).bit_length() - 1
+        level = levels[k]
+        return float(op(level[start], level[end - (1 << k)]))
+
+    def max_high(self, start: int, end: int) -> float:
+        """Max of `high` over positions [start, end)."""
+        return self._query(self._high_levels, np.fmax, max(0, start), min(self.n, end))
+
+    def min_low(self, start: int, end: int) -> float:
+        """Min of `low` over positions [start, end)."""
+        return self._query(self._low_levels, np.fmin, max(0, start), min(self.n, end))
+
+
+class _TabelaPosicoes:
+    """Timestamp → integer position table for one DataFrame index."""
+
+    def __init__(self, index: pd.Index):
+        self.index = index
+        # Non-unique labels have no single position (label lookups used to fail too)
+        self._unico = index.is_unique
+        self._mapa: Dict[Any, int] = dict(zip(index, range(len(index)))) if self._unico else {}
+
+    def estender(self, index: pd.Index) -> None:
+        """Adopt `index`, the current index plus labels appended at the end."""
+        if self._unico:
+            for pos in range(len(self.index), len(index)):
+                label = index[pos]
+                if label in self._mapa:
+                    self._unico, self._mapa = False, {}
+                    break
+                self._mapa[label] = pos
+        self.index = index
+
+    def get(self, label) -> Optional[int]:
+        try:
+            return self._mapa.get(label)
+        except TypeError:  # unhashable label
+            return None
+
+
+# id(df) -> (weakref to df, {name: artifact}); entries are dropped when the frame is collected
+_ARTEFATOS_POR_FRAME: Dict[int, Tuple[Any, Dict[str, Any]]] = {}
+
+
+def _artefatos_do_frame(df: pd.DataFrame) -> Dict[str, Any]:
+    """Per-DataFrame storage for derived lookup structures (not copied with the frame)."""
+    key = id(df)
+    entry = _ARTEFATOS_POR_FRAME.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    artefatos: Dict[str, Any] = {}
+    _ARTEFATOS_POR_FRAME[key] = (weakref.ref(df), artefatos)
+    weakref.finalize(df, _ARTEFATOS_POR_FRAME.pop, key, None)
+    return artefatos
+
+
+def obter_indice_extremos(df: pd.DataFrame) -> _RangeExtremaIndex:
+    """Return the range max/min index of `df`, building it on first use.
+
+    `calcular_indicadores` builds it once per dataset; `high`/`low` are not
+    expected to change afterwards.
+    """
+    artefatos = _artefatos_do_frame(df)
+    indice = artefatos.get('extremos')
+    if indice is None or indice.n != len(df):
+        indice = _RangeExtremaIndex(df['high'].to_numpy(dtype=float), df['low'].to_numpy(dtype=float))
+        artefatos['extremos'] = indice
+    return indice
+
+
+def obter_posicoes(df: pd.DataFrame) -> _TabelaPosicoes:
+    """Return the shared timestamp → position table of `df` (rebuilt if the index changes)."""
+    artefatos = _artefatos_do_frame(df)
+    tabela = artefatos.get('posicoes')
+    if tabela is None or tabela.index is not df.index:
+        tabela = _TabelaPosicoes(df.index)
+        artefatos['posicoes'] = tabela
+    return tabela
+
+
+def _estender_artefatos(anterior: pd.DataFrame, novo: pd.DataFrame) -> None:
+    """Hand the lookup structures of `anterior` over to `novo`, the same bars
+    (same positions) plus bars appended at the end, extending them in place.
+
+    The range max/min index and the position table grow by the new bars only;
+    memoized breakouts are kept when found or when their search window was
+    already complete. `anterior` must not be queried afterwards.
+    """
+    entry = _ARTEFATOS_POR_FRAME.get(id(anterior))
+    if entry is None or entry[0]() is not anterior:
+        return
+    antigos, novos = entry[1], _artefatos_do_frame(novo)
+    n_antes = len(anterior)
+    indice = antigos.get('extremos')
+    if indice is not None and indice.n == n_antes:
+        indice.estender(novo['high'].to_numpy(dtype=float)[n_antes:], novo['low'].to_numpy(dtype=float)[n_antes:])
+        novos['extremos'] = indice
+    tabela = antigos.get('posicoes')
+    if tabela is not None and tabela.index is anterior.index:
+        tabela.estender(novo.index)
+        novos['posicoes'] = tabela
+    rompimentos = antigos.get('rompimentos')
+    if rompimentos:
+        # key: (start_pos, neckline, direction, limit)
+        novos['rompimentos'] = {chave: pos for chave, pos in rompimentos.items()
+                                if pos >= 0 or chave[0] + chave[3] <= n_antes - 1}
+
+
+def _posicao(df: pd.DataFrame, idx) -> Optional[int]:
+    """Integer position of label `idx` in `df`, or None if absent."""
+    return obter_posicoes(df).get(idx)
+
+
+def _posicao_pivo(df: pd.DataFrame, pivo: Dict[str, Any]) -> Optional[int]:
+    """Position of a pivot: the 'pos' set at ZigZag time, else a table lookup."""
+    pos = pivo.get('pos')
+    return pos if pos is not None else _posicao(df, pivo.get('idx'))
+
+
+def _valores_alinhados(series: pd.Series, df: pd.DataFrame) -> np.ndarray:
+    """Values of `series` as a float array aligned with `df` positions."""
+    if series.index is not df.index:
+        series = series.reindex(df.index)
+    return series.to_numpy(dtype=float)
+
+
+def _media_sem_nan(valores: np.ndarray) -> float:
+    """Mean skipping NaN (same reduction as pandas `Series.mean()`); NaN if empty."""
+    validos = ~np.isnan(valores)
+    count = int(validos.sum())
+    if count == 0:
+        return float('nan')
+    return float(np.where(validos, valores, 0.0).sum() / count)
+
+
+def _indicador_memorizado(df: pd.DataFrame, chave: Tuple, calcular: Callable[[], Any]) -> Any:
+    """Result of `calcular()` computed at most once per frame for `chave`.
+
+    `chave` names the computation, including the function that performs it, so
+    swapping that function (e.g. monkeypatching `ta.stoch`) is a different entry.
+    Failures are memoized as None.
+    """
+    memo = _artefatos_do_frame(df).setdefault('indicadores', {})
+    chave = chave + (len(df),)
+    if chave not in memo:
+        try:
+            memo[chave] = calcular()
+        except Exception:
+            memo[chave] = None
+    return memo[chave]
+
+
+def _serie_do_frame(series: pd.Series, df: pd.DataFrame) -> bool:
+    """True if `series` is (a view of) the `df` column with the same name."""
+    try:
+        nome = getattr(series, 'name', None)
+        if nome is None or nome not in df.columns:
+            return False
+        coluna = df[nome]
+        return series is coluna or (series.index is df.index and
+                                    np.shares_memory(series.to_numpy(), coluna.to_numpy()))
+    except Exception:
+        return False
+
+
+def obter_rsi(df: pd.DataFrame, source_series: pd.Series) -> Optional[np.ndarray]:
+    """RSI of `source_series` aligned with `df` positions.
+
+    Uses the `RSI_{len}_{CLOSE|HIGH|LOW}` column from `calcular_indicadores` when
+    present; otherwise computes it with `ta.rsi`, once per frame for frame columns.
+    Returns None if the RSI cannot be computed or is all NaN.
+    """
+    rsi_len = getattr(Config, 'RSI_LENGTH', 14)
+    src_name = getattr(source_series, 'name', 'close')
+    sufixo = {'high': 'HIGH', 'low': 'LOW'}.get(src_name, 'CLOSE')
+    rsi_col = f'RSI_{rsi_len}_{sufixo}'
+    if rsi_col in df.columns:
+        return _valores_alinhados(df[rsi_col], df)
+
+    funcao = ta.rsi
+
+    def calcular() -> Optional[np.ndarray]:
+        rsi_series = funcao(source_series, length=rsi_len)
+        if rsi_series is None or len(rsi_series.dropna()) == 0:
+            return None
+        return _valores_alinhados(rsi_series, df)
+
+    if not _serie_do_frame(source_series, df):
+        try:
+            return calcular()
+        except Exception:
+            return None
+    return _indicador_memorizado(df, ('rsi', src_name, rsi_len, funcao), calcular)
+
+
+def obter_macd(df: pd.DataFrame) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(MACD line, signal line) aligned with `df` positions.
+
+    Frame columns first; otherwise `df.ta.macd`, computed once per frame.
+    """
+    macd_fast = getattr(Config, 'MACD_FAST', 12)
+    macd_slow = getattr(Config, 'MACD_SLOW', 26)
+    macd_signal = getattr(Config, 'MACD_SIGNAL', 9)
+    macd_col = f'MACD_{macd_fast}_{macd_slow}_{macd_signal}'
+    sig_col = f'MACDs_{macd_fast}_{macd_slow}_{macd_signal}'
+    if macd_col in df.columns and sig_col in df.columns:
+        return _valores_alinhados(df[macd_col], df), _valores_alinhados(df[sig_col], df)
+
+    funcao = df.ta.macd
+
+    def calcular() -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        macd_df = funcao(fast=macd_fast, slow=macd_slow, signal=macd_signal, append=False)
+        if macd_df is None or macd_col not in macd_df.columns or sig_col not in macd_df.columns:
+            return None
+        return _valores_alinhados(macd_df[macd_col], df), _valores_alinhados(macd_df[sig_col], df)
+
+    return _indicador_memorizado(df, ('macd', macd_fast, macd_slow, macd_signal, funcao), calcular)
+
+
+def obter_estocastico(df: pd.DataFrame) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(%K, %D) aligned with `df` positions.
+
+    Frame columns first (configured names, then the pandas_ta defaults);
+    otherwise `ta.stoch` (falling back to `df.ta.stoch`), computed once per frame.
+    """
+    k = getattr(Config, 'STOCH_K', 14)
+    d = getattr(Config, 'STOCH_D', 3)
+    smooth_k = getattr(Config, 'STOCH_SMOOTH_K', 3)
+    # Some pandas_ta versions name columns with default params
+    nomes = ((f'STOCHk_{k}_{d}_{smooth_k}', f'STOCHd_{k}_{d}_{smooth_k}'),
+             ('STOCHk_14_3_3', 'STOCHd_14_3_3'))
+
+    def selecionar(origem: pd.DataFrame) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        for k_col, d_col in nomes:
+            if k_col in origem.columns and d_col in origem.columns:
+                return _valores_alinhados(origem[k_col], df), _valores_alinhados(origem[d_col], df)
+        return None
+
+    no_frame = selecionar(df)
+    if no_frame is not None:
+        return no_frame
+
+    funcao = ta.stoch
+
+    def calcular() -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        stoch_df = None
+        try:
+            stoch_df = funcao(high=df['high'], low=df['low'], close=df['close'],
+                              k=k, d=d, smooth_k=smooth_k)
+        except Exception:
+            pass
+        if stoch_df is None:
+            stoch_df = df.ta.stoch(high=df['high'], low=df['low'], close=df['close'],
+                                   k=k, d=d, smooth_k=smooth_k)
+        return selecionar(stoch_df) if stoch_df is not None else None
+
+    return _indicador_memorizado(df, ('stoch', k, d, smooth_k, funcao), calcular)
+
+
+def _atr_no_pivo(df: pd.DataFrame, pivo: Dict[str, Any]) -> float:
+    """ATR(14) at the pivot bar; last available ATR if missing there; 0.0 without ATR."""
+    if 'ATR_14' not in df.columns:
+        return 0.0
+    atr = df['ATR_14'].to_numpy(dtype=float)
+    pos = _posicao_pivo(df, pivo)
+    if pos is not None and not np.isnan(atr[pos]):
+        return float(atr[pos])
+    validos = np.flatnonzero(~np.isnan(atr))
+    return float(atr[validos[-1]]) if len(validos) else 0.0
+
+
 def _map_ticker_to_coingecko(ticker: str) -> Tuple[str, str]:
     """Map a project ticker like 'BTC-USD' to (coingecko_id, vs_currency).
 
@@ -488,8 +1497,62 @@ def _interval_to_pandas_freq(interval: str) -> str:
     return mapping.get(interval, '1D')
 
 
+class _RateLimiter:
+    """Token bucket of `requests_per_minute` with room for `burst` requests.
+
+    Implemented as virtual scheduling (GCRA): a single timestamp tracks when the
+    bucket is full again, so `burst=1` spaces calls exactly `60 / rpm` apart.
+    `lock` and `next_slot` may be multiprocessing primitives, in which case the
+    budget is shared by every process that received them (see `_init_worker`).
+    Thread-safe: slots are reserved under the lock.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float], lock=None, next_slot=None, burst: int = 1):
+        self.min_interval = 60.0 / \
+            requests_per_minute if requests_per_minute and requests_per_minute > 0 else 0.0
+        self.burst = max(1, int(burst or 1))
+        self._lock = lock if lock is not None else threading.Lock()
+        self._next_slot = next_slot
+        self._next_slot_local = 0.0
+
+    def acquire(self) -> None:
+        """Block until this caller's token is available."""
+        if self.min_interval <= 0:
+            return
+        with self._lock:
+            now = time.time()
+            shared = self._next_slot is not None
+            # Theoretical arrival time of the next request at the sustained rate
+            tat = max(now, self._next_slot.value if shared else self._next_slot_local)
+            slot = max(now, tat - (self.burst - 1) * self.min_interval)
+            if shared:
+                self._next_slot.value = tat + self.min_interval
+            else:
+                self._next_slot_local = tat + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+_RATE_LIMITER = _RateLimiter(getattr(Config, 'COINGECKO_REQUESTS_PER_MINUTE', 0),
+                             burst=getattr(Config, 'COINGECKO_RATE_BURST', 1))
+
+
+def _atraso_backoff(tentativa: int, base: float, maximo: Optional[float] = None) -> float:
+    """Exponential backoff with jitter: base * 2**tentativa (+0-25%), capped at `maximo`."""
+    if base <= 0:
+        return 0.0
+    atraso = base * (2 ** tentativa) * (1.0 + random.uniform(0.0, 0.25))
+    return min(atraso, maximo) if maximo is not None else atraso
+
+
 def _coingecko_request(endpoint_path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """HTTP GET to CoinGecko Pro with API key from env."""
+    """HTTP GET to CoinGecko Pro with API key from env, over the pooled session.
+
+    Every attempt takes a token from the shared rate limiter. 429/5xx answers
+    and network errors are retried `Config.COINGECKO_MAX_RETRIES` times with
+    exponential backoff (honouring `Retry-After` when present).
+    """
     if params is None:
         params = {}
     api_key = os.getenv(Config.COINGECKO_API_KEY_ENV)
@@ -502,11 +1565,41 @@ def _coingecko_request(endpoint_path: str, params: Optional[Dict[str, Any]] = No
         'Accept': 'application/json',
         'User-Agent': 'pattern-engine/1.0'
     }
-    resp = requests.get(url, headers=headers, params=params, timeout=30)
-    if resp.status_code != 200:
+    max_retries = max(0, int(getattr(Config, 'COINGECKO_MAX_RETRIES', 0)))
+    base = getattr(Config, 'COINGECKO_BACKOFF_BASE_SECONDS', 1.0)
+    maximo = getattr(Config, 'COINGECKO_BACKOFF_MAX_SECONDS', 60.0)
+    for tentativa in range(max_retries + 1):
+        _RATE_LIMITER.acquire()
+        try:
+            # Status retries stay in this loop so every attempt takes a rate-limit token
+            resp = get_session(retry_status=False).get(
+                url, headers=headers, params=params, timeout=30)
+        except requests.RequestException as e:
+            if tentativa >= max_retries:
+                raise ConnectionError(f"CoinGecko request failed: {e}") from e
+            atraso = _atraso_backoff(tentativa, base, maximo)
+            logging.warning("CoinGecko %s: %s; retrying in %.1fs.", endpoint_path, e, atraso)
+            time.sleep(atraso)
+            continue
+        if resp.status_code == 200:
+            return resp.json()
+        if (resp.status_code == 429 or resp.status_code >= 500) and tentativa < max_retries:
+            atraso = _atraso_backoff(tentativa, base, maximo)
+            retry_after = resp.headers.get('Retry-After') if resp.headers else None
+            if retry_after and str(retry_after).isdigit():
+                atraso = min(max(atraso, float(retry_after)), maximo)
+            logging.warning("CoinGecko %s answered %d; retrying in %.1fs.",
+                            endpoint_path, resp.status_code, atraso)
+            time.sleep(atraso)
+            continue
         raise ConnectionError(
             f"CoinGecko request failed {resp.status_code}: {resp.text[:200]}")
-    return resp.json()
+    raise ConnectionError(f"CoinGecko request failed: {endpoint_path}")
+
+
+# market_chart spans sampled at the API's automatic granularity (1 day: 5 minutes,
+# otherwise hourly); every other span is requested with interval=daily
+_DIAS_GRANULARIDADE_AUTOMATICA = ('1', '7', '14', '30')
 
 
 def _fetch_market_chart(coin_id: str, vs_currency: str, days: str, interval_hint: Optional[str]) -> Tuple[pd.DataFrame, pd.DataFrame]:
@@ -516,7 +1609,7 @@ def _fetch_market_chart(coin_id: str, vs_currency: str, days: str, interval_hint
     """
     params: Dict[str, Any] = {'vs_currency': vs_currency, 'days': days}
     # Provide interval hint only when beneficial (daily for large spans)
-    if days not in ('1', '7', '14', '30'):
+    if days not in _DIAS_GRANULARIDADE_AUTOMATICA:
         params['interval'] = 'daily'
     data = _coingecko_request(f"coins/{coin_id}/market_chart", params)
 
@@ -558,12 +1651,75 @@ def _build_ohlcv_from_market_chart(prices_df: pd.DataFrame, vols_df: pd.DataFram
     return df
 
 
-def buscar_dados(ticker: str, period: str, interval: str) -> pd.DataFrame:
-    """Download OHLCV from CoinGecko Pro and normalize columns to lowercase.
+def _ohlcv_cache_paths(coin_id: str, vs_currency: str, interval: str, days: str) -> Tuple[str, str]:
+    """Return (parquet_path, meta_path) for a cached OHLCV series."""
+    key = f"{coin_id}_{vs_currency}_{interval}_{days}"
+    key = re.sub(r'[^A-Za-z0-9_.-]', '_', key)
+    cache_dir = getattr(Config, 'OHLCV_CACHE_DIR',
+                        os.path.join('data', 'cache', 'ohlcv'))
+    return os.path.join(cache_dir, f"{key}.parquet"), os.path.join(cache_dir, f"{key}.json")
 
-    - Intraday intervals adjust the time span for higher granularity.
-    - OHLC is approximated from market_chart prices; volume from total_volumes.
+
+def _ohlcv_cache_max_age(interval: str) -> float:
+    """Freshness budget (seconds) for a cached series of the given interval."""
+    max_ages = getattr(Config, 'OHLCV_CACHE_MAX_AGE_SECONDS', {}) or {}
+    return float(max_ages.get(interval, getattr(Config, 'OHLCV_CACHE_MAX_AGE_DEFAULT_SECONDS', 3600)))
+
+
+def _ohlcv_cache_load(coin_id: str, vs_currency: str, interval: str, days: str,
+                      allow_stale: bool = False) -> Optional[pd.DataFrame]:
+    """Read a cached OHLCV frame if present and fresh (or any age with allow_stale).
+
+    Returns None on miss, stale entry, or unreadable files.
     """
+    data_path, meta_path = _ohlcv_cache_paths(
+        coin_id, vs_currency, interval, days)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        age = time.time() - float(meta.get('fetched_at', 0))
+        if not allow_stale and age >= _ohlcv_cache_max_age(interval):
+            return None
+        df = pd.read_parquet(data_path)
+        if df is None or df.empty:
+            return None
+        return df
+    except Exception as e:
+        logging.warning("Ignoring unreadable OHLCV cache %s: %s",
+                        data_path, str(e)[:180])
+        return None
+
+
+def _ohlcv_cache_store(df: pd.DataFrame, coin_id: str, vs_currency: str, interval: str, days: str) -> None:
+    """Persist an OHLCV frame and its freshness metadata (atomic replace)."""
+    data_path, meta_path = _ohlcv_cache_paths(
+        coin_id, vs_currency, interval, days)
+    try:
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        tmp_data, tmp_meta = data_path + '.tmp', meta_path + '.tmp'
+        df.to_parquet(tmp_data)
+        meta = {
+            'coin_id': coin_id, 'vs_currency': vs_currency,
+            'interval': interval, 'days': days,
+            'fetched_at': time.time(),
+            'first_bar': df.index[0].isoformat() if len(df) else None,
+            'last_bar': df.index[-1].isoformat() if len(df) else None,
+            'rows': int(len(df)),
+        }
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_data, data_path)
+        os.replace(tmp_meta, meta_path)
+    except Exception as e:
+        # Cache is best-effort (e.g., no Parquet engine installed)
+        logging.warning("Could not write OHLCV cache %s: %s",
+                        data_path, str(e)[:180])
+
+
+def _parametros_download(ticker: str, period: str, interval: str) -> Tuple[str, str, str]:
+    """(coin_id, vs_currency, days) of the market_chart request behind one series."""
     original_period = period
     # Adjust effective lookback similar to former yfinance behavior
     if 'mo' in interval:
@@ -580,43 +1736,494 @@ def buscar_dados(ticker: str, period: str, interval: str) -> pd.DataFrame:
         )
 
     coin_id, vs_currency = _map_ticker_to_coingecko(ticker)
-    days = _period_to_days(period)
+    return coin_id, vs_currency, _period_to_days(period)
+
+
+def _baixar_grupo(coin_id: str, vs_currency: str, days: str, itens: List[Tuple[str, str]],
+                  use_cache: bool) -> Dict[Tuple[str, str], Any]:
+    """Load every (ticker, interval) in `itens` that maps to one market_chart request.
+
+    Fresh cache entries are served from disk; the rest share a single download
+    (intervals only differ in the resampling). Returns a frame per item, or the
+    exception explaining why that item could not be loaded.
+    """
+    resultados: Dict[Tuple[str, str], Any] = {}
+    pendentes: List[Tuple[str, str]] = []
+    for ticker, interval in itens:
+        if use_cache:
+            cached = _ohlcv_cache_load(coin_id, vs_currency, interval, days)
+            if cached is not None:
+                logging.info("OHLCV cache hit for %s/%s (%s days, %d bars).",
+                             ticker, interval, days, len(cached))
+                resultados[(ticker, interval)] = cached
+                continue
+        pendentes.append((ticker, interval))
+    if not pendentes:
+        return resultados
 
+    rotulo = ",".join(f"{t}/{i}" for t, i in pendentes)
     last_err: Optional[Exception] = None
     for tentativa in range(Config.MAX_DOWNLOAD_TENTATIVAS):
         try:
             prices_df, vols_df = _fetch_market_chart(
-                coin_id, vs_currency, days, interval)
-            df = _build_ohlcv_from_market_chart(prices_df, vols_df, interval)
-            if df is None or df.empty:
-                raise ValueError(
-                    "CoinGecko returned empty data for prices/volumes")
-            # Ensure standard columns and tz-naive index
-            try:
-                df.index = df.index.tz_localize(None)
-            except Exception:
-                pass
-            return df
+                coin_id, vs_currency, days, pendentes[0][1])
+            frames = {}
+            for ticker, interval in pendentes:
+                df = _build_ohlcv_from_market_chart(prices_df, vols_df, interval)
+                if df is None or df.empty:
+                    raise ValueError(
+                        "CoinGecko returned empty data for prices/volumes")
+                # Ensure standard columns and tz-naive index
+                try:
+                    df.index = df.index.tz_localize(None)
+                except Exception:
+                    pass
+                frames[(ticker, interval)] = df
+            for (ticker, interval), df in frames.items():
+                if use_cache:
+                    _ohlcv_cache_store(df, coin_id, vs_currency, interval, days)
+                resultados[(ticker, interval)] = df
+            return resultados
         except Exception as e:
             last_err = e
             if tentativa < Config.MAX_DOWNLOAD_TENTATIVAS - 1:
+                atraso = _atraso_backoff(tentativa, Config.RETRY_DELAY_SEGUNDOS,
+                                         getattr(Config, 'COINGECKO_BACKOFF_MAX_SECONDS', None))
                 logging.warning(
-                    "Attempt %d failed for %s/%s. Retrying in %ds... (%s)",
-                    tentativa +
-                    1, ticker, interval, Config.RETRY_DELAY_SEGUNDOS, str(e)[
-                        :180],
+                    "Attempt %d failed for %s. Retrying in %.1fs... (%s)",
+                    tentativa + 1, rotulo, atraso, str(e)[:180],
                 )
-                time.sleep(Config.RETRY_DELAY_SEGUNDOS)
+                time.sleep(atraso)
             else:
                 break
 
-    raise ConnectionError(
-        f"Download failed for {ticker}/{interval} after {Config.MAX_DOWNLOAD_TENTATIVAS} attempts. Error: {last_err}")
+    for ticker, interval in pendentes:
+        if use_cache:
+            # Network unavailable: a stale series is better than no series
+            stale = _ohlcv_cache_load(
+                coin_id, vs_currency, interval, days, allow_stale=True)
+            if stale is not None:
+                logging.warning("Download failed for %s/%s; using stale OHLCV cache (%d bars).",
+                                ticker, interval, len(stale))
+                resultados[(ticker, interval)] = stale
+                continue
+        resultados[(ticker, interval)] = ConnectionError(
+            f"Download failed for {ticker}/{interval} after {Config.MAX_DOWNLOAD_TENTATIVAS} attempts. Error: {last_err}")
+    return resultados
+
+
+def buscar_dados(ticker: str, period: str, interval: str, usar_cache: Optional[bool] = None) -> pd.DataFrame:
+    """Download OHLCV from CoinGecko Pro and normalize columns to lowercase.
+
+    - Intraday intervals adjust the time span for higher granularity.
+    - OHLC is approximated from market_chart prices; volume from total_volumes.
+    - Served from the local Parquet cache while fresh (see `Config.OHLCV_CACHE_*`);
+      a stale cached series is used only when every download attempt fails.
+      `usar_cache` overrides `Config.OHLCV_CACHE_ENABLED` for this call.
+    """
+    coin_id, vs_currency, days = _parametros_download(ticker, period, interval)
+    use_cache = getattr(Config, 'OHLCV_CACHE_ENABLED', False) if usar_cache is None else usar_cache
+    resultado = _baixar_grupo(coin_id, vs_currency, days, [(ticker, interval)], use_cache)[(ticker, interval)]
+    if isinstance(resultado, Exception):
+        raise resultado
+    return resultado
+
+
+def _dias_cauda(days: str, desde: pd.Timestamp, agora: pd.Timestamp) -> Optional[str]:
+    """Shortest market_chart span reaching back past `desde` with the same sampling
+    as the full `days` download (None when no shorter span qualifies)."""
+    # One extra day so the span starts before `desde` and the bars after it are complete
+    necessarios = int(np.ceil((agora - desde) / pd.Timedelta(days=1))) + 1
+    if days in _DIAS_GRANULARIDADE_AUTOMATICA:
+        mesma_amostragem = [d for d in _DIAS_GRANULARIDADE_AUTOMATICA if (d == '1') == (days == '1')]
+        opcoes = [d for d in mesma_amostragem if necessarios <= int(d) < int(days)]
+        return opcoes[0] if opcoes else None
+    while str(necessarios) in _DIAS_GRANULARIDADE_AUTOMATICA:
+        necessarios += 1
+    if days != 'max' and necessarios >= int(days):
+        return None
+    return str(necessarios)
+
+
+def buscar_dados_desde(ticker: str, interval: str, desde: pd.Timestamp,
+                       agora: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """Bars from `desde` (inclusive) on, downloading only the recent tail.
+
+    The tail keeps the sampling of the full `Config.DATA_PERIOD` download, so
+    its bars match the ones `buscar_dados` builds. Falls back to the full
+    (uncached) series when no shorter span qualifies or the tail bars do not
+    line up with `desde`.
+    """
+    coin_id, vs_currency, days = _parametros_download(ticker, Config.DATA_PERIOD, interval)
+    agora = agora if agora is not None else pd.Timestamp.utcnow().tz_localize(None)
+    dias = _dias_cauda(days, desde, agora)
+    if dias is not None:
+        cauda = _baixar_grupo(coin_id, vs_currency, dias, [(ticker, interval)], False)[(ticker, interval)]
+        if isinstance(cauda, Exception):
+            raise cauda
+        if desde in cauda.index:
+            return cauda[cauda.index >= desde]
+        logging.warning("Tail of %s/%s (%s days) does not line up with %s; downloading the full series.",
+                        ticker, interval, dias, desde)
+    df = buscar_dados(ticker, Config.DATA_PERIOD, interval, usar_cache=False)
+    return df[df.index >= desde]
+
+
+def baixar_series_concorrentes(pares: List[Tuple[str, str]], period: Optional[str] = None,
+                               max_workers: Optional[int] = None, usar_cache: Optional[bool] = None):
+    """Load many (ticker, interval) series concurrently; yield them as they finish.
+
+    Pairs that map to the same market_chart request (same coin and day span)
+    share one download. Downloads run on a thread pool of
+    `Config.COINGECKO_MAX_CONCURRENT_REQUESTS` threads and all take tokens from
+    the shared rate limiter, so bulk loads are bound by the requests-per-minute
+    budget rather than by round-trip latency.
+
+    Yields ((ticker, interval), frame_or_exception) in completion order.
+    """
+    period = period if period is not None else Config.DATA_PERIOD
+    use_cache = getattr(Config, 'OHLCV_CACHE_ENABLED', False) if usar_cache is None else usar_cache
+    grupos: Dict[Tuple[str, str, str], List[Tuple[str, str]]] = {}
+    for ticker, interval in pares:
+        try:
+            chave = _parametros_download(ticker, period, interval)
+        except Exception as e:
+            yield (ticker, interval), e
+            continue
+        grupos.setdefault(chave, []).append((ticker, interval))
+    if not grupos:
+        return
+    workers = max_workers or getattr(Config, 'COINGECKO_MAX_CONCURRENT_REQUESTS', 8)
+    with ThreadPoolExecutor(max_workers=max(1, min(int(workers), len(grupos)))) as executor:
+        # Each download runs in a copy of the caller's context so tool telemetry sees its requests
+        futures = {executor.submit(contextvars.copy_context().run, _baixar_grupo, *chave, itens, use_cache): itens
+                   for chave, itens in grupos.items()}
+        for future in as_completed(futures):
+            try:
+                resultados = future.result()
+            except Exception as e:
+                resultados = {item: e for item in futures[future]}
+            for item in futures[future]:
+                yield item, resultados[item]
+
+
+def _estender_zigzag_ultima_barra(confirmed_pivots: List[Dict[str, Any]], df: pd.DataFrame,
+                                  deviation_percent: float) -> List[Dict[str, Any]]:
+    """Extend/update the last ZigZag pivot with the most recent bar (in place)."""
+    if Config.ZIGZAG_EXTEND_TO_LAST_BAR and confirmed_pivots:
+        last_bar = df.iloc[-1]
+        _estender_zigzag_com_barra(confirmed_pivots, df.index[-1], len(df) - 1,
+                                   last_bar['high'], last_bar['low'], deviation_percent)
+    return confirmed_pivots
+
+
+def _estender_zigzag_com_barra(confirmed_pivots: List[Dict[str, Any]], idx, pos: int, high: float,
+                               low: float, deviation_percent: float) -> List[Dict[str, Any]]:
+    """Last-bar extension given that bar's label, position, high and low (in place)."""
+    if Config.ZIGZAG_EXTEND_TO_LAST_BAR and confirmed_pivots:
+        last_confirmed_pivot = confirmed_pivots[-1]
+
+        # If the last candle continues the move in the SAME direction,
+        # only update the existing pivot. Otherwise, create a new pivot.
+        if last_confirmed_pivot['tipo'] == 'PICO':
+            # Up move continues: update last peak
+            if high > last_confirmed_pivot['preco']:
+                last_confirmed_pivot['preco'] = high
+                last_confirmed_pivot['idx'] = idx
+                last_confirmed_pivot['pos'] = pos
+            else:
+                # Reversal to downtrend → create a VALLEY
+                potential_pivot = {
+                    'idx': idx,
+                    'tipo': 'VALE',
+                    'preco': low,
+                    'pos': pos,
+                }
+                if potential_pivot['idx'] != last_confirmed_pivot['idx']:
+                    # Fix: fator de desvio da extensão parametrizado
+                    min_ext_dev = deviation_percent * getattr(
+                        Config, 'ZIGZAG_EXTENSION_DEVIATION_FACTOR', 0.25)
+                    if last_confirmed_pivot['preco'] != 0:
+                        ext_dev = abs(
+                            potential_pivot['preco'] - last_confirmed_pivot['preco']) / last_confirmed_pivot['preco'] * 100
+                        if ext_dev >= min_ext_dev:
+                            confirmed_pivots.append(potential_pivot)
+        else:  # last pivot is a VALLEY
+            # Down move continues: update last valley
+            if low < last_confirmed_pivot['preco']:
+                last_confirmed_pivot['preco'] = low
+                last_confirmed_pivot['idx'] = idx
+                last_confirmed_pivot['pos'] = pos
+            else:
+                # Reversal to uptrend → create a PEAK
+                potential_pivot = {
+                    'idx': idx,
+                    'tipo': 'PICO',
+                    'preco': high,
+                    'pos': pos,
+                }
+                if potential_pivot['idx'] != last_confirmed_pivot['idx']:
+                    # Fix: fator de desvio da extensão parametrizado
+                    min_ext_dev = deviation_percent * getattr(
+                        Config, 'ZIGZAG_EXTENSION_DEVIATION_FACTOR', 0.25)
+                    if last_confirmed_pivot['preco'] != 0:
+                        ext_dev = abs(
+                            potential_pivot['preco'] - last_confirmed_pivot['preco']) / last_confirmed_pivot['preco'] * 100
+                        if ext_dev >= min_ext_dev:
+                            confirmed_pivots.append(potential_pivot)
+
+    return confirmed_pivots
+
+
+def _zigzag_candidatos(high: np.ndarray, low: np.ndarray, depth: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (positions, prices, is_peak) of ZigZag candidates in iteration order.
+
+    Candidates are bars equal to the centered rolling max/min of `2*depth+1` bars
+    (edges truncated like `rolling(center=True, min_periods=1)`). Ties on the same
+    bar keep the peak before the valley, as the stable sort of the reference does.
+    """
+    n = len(high)
+    if n == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, np.empty(0, dtype=float), np.empty(0, dtype=bool)
+    depth = max(int(depth), 0)
+    window = 2 * depth + 1
+    # NaN bars never become candidates; padding with ±inf reproduces the truncated edges
+    high_pad = np.concatenate((np.full(depth, -np.inf), np.where(np.isnan(high), -np.inf, high),
+                               np.full(depth, -np.inf)))
+    low_pad = np.concatenate((np.full(depth, np.inf), np.where(np.isnan(low), np.inf, low),
+                              np.full(depth, np.inf)))
+    rolling_max = np.lib.stride_tricks.sliding_window_view(high_pad, window).max(axis=1)
+    rolling_min = np.lib.stride_tricks.sliding_window_view(low_pad, window).min(axis=1)
+    peak_pos = np.flatnonzero(high == rolling_max)
+    valley_pos = np.flatnonzero(low == rolling_min)
+    positions = np.concatenate((peak_pos, valley_pos))
+    order = np.argsort(positions, kind='stable')
+    prices = np.concatenate((high[peak_pos], low[valley_pos]))[order]
+    is_peak = np.concatenate((np.ones(len(peak_pos), dtype=bool),
+                              np.zeros(len(valley_pos), dtype=bool)))[order]
+    return positions[order], prices, is_peak
+
+
+def _zigzag_passo(confirmed: List[Tuple[Any, int, float, bool]], candidate: Tuple[Any, int, float, bool],
+                  deviation_percent: float) -> None:
+    """Feed the next candidate (key, pos, price, is_peak), in position order, to the walk.
+
+    Applies the tie-breaking, alternation and deviation rules to `confirmed` in
+    place; only its last entry can be replaced, earlier entries are final.
+    """
+    if not confirmed:
+        confirmed.append(candidate)
+        return
+    _, pos, price, peak = candidate
+    _, last_pos, last_price, last_peak = confirmed[-1]
+    if pos == last_pos:
+        if peak != last_peak:
+            if len(confirmed) >= 2:
+                prev_prev_peak = confirmed[-2][3]
+                if peak != prev_prev_peak and last_peak == prev_prev_peak:
+                    confirmed[-1] = candidate
+            else:
+                confirmed[-1] = candidate
+        elif (peak and price > last_price) or (not peak and price < last_price):
+            confirmed[-1] = candidate
+        return
+    if peak == last_peak:
+        if (peak and price > last_price) or (not peak and price < last_price):
+            confirmed[-1] = candidate
+        return
+    if last_price == 0:
+        return
+    if abs(price - last_price) / last_price * 100 >= deviation_percent:
+        confirmed.append(candidate)
+
+
+def _zigzag_filtrar(positions: np.ndarray, prices: np.ndarray, is_peak: np.ndarray,
+                    deviation_percent: float) -> List[int]:
+    """Apply tie-breaking, alternation and deviation rules; return candidate indices."""
+    if len(positions) < 2:
+        return []
+    confirmed: List[Tuple[Any, int, float, bool]] = []
+    for candidate in zip(range(len(positions)), positions.tolist(), prices.tolist(), is_peak.tolist()):
+        _zigzag_passo(confirmed, candidate, deviation_percent)
+    return [candidate[0] for candidate in confirmed]
+
+
+def _zigzag_montar_pivots(df: pd.DataFrame, positions: np.ndarray, prices: np.ndarray, is_peak: np.ndarray,
+                          selecionados: List[int], deviation_percent: float) -> List[Dict[str, Any]]:
+    """Materialize selected candidates as pivot dicts and apply the last-bar extension."""
+    index = df.index
+    confirmed_pivots = [
+        {'idx': index[positions[k]], 'preco': prices[k], 'tipo': 'PICO' if is_peak[k] else 'VALE',
+         'pos': int(positions[k])}
+        for k in selecionados
+    ]
+    return _estender_zigzag_ultima_barra(confirmed_pivots, df, deviation_percent)
 
 
 def calcular_zigzag_oficial(df: pd.DataFrame, depth: int, deviation_percent: float) -> List[Dict[str, Any]]:
     """Compute ZigZag pivots requiring alternation and minimum percentage deviation.
 
+    Array-based path: candidate detection runs on NumPy arrays and the
+    alternation/deviation walk only visits candidate bars. Returns exactly the
+    same pivots as `calcular_zigzag_referencia`, plus each pivot's integer
+    position in `df` under 'pos' (used by the validators instead of labels).
+    """
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    positions, prices, is_peak = _zigzag_candidatos(high, low, depth)
+    selecionados = _zigzag_filtrar(positions, prices, is_peak, deviation_percent)
+    return _zigzag_montar_pivots(df, positions, prices, is_peak, selecionados, deviation_percent)
+
+
+def calcular_zigzag_multiplo(df: pd.DataFrame, parametros: List[Tuple[int, float]]) -> List[List[Dict[str, Any]]]:
+    """Compute ZigZag pivots for several (depth, deviation) pairs in one call.
+
+    Rolling extrema/candidates are computed once per distinct depth and the
+    deviation walk once per distinct pair; each pair still gets its own pivot
+    dicts. Result `i` equals `calcular_zigzag_oficial(df, *parametros[i])`.
+    """
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    candidatos_por_depth: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+    selecao_por_par: Dict[Tuple[int, float], List[int]] = {}
+    resultados: List[List[Dict[str, Any]]] = []
+    for depth, deviation_percent in parametros:
+        candidatos = candidatos_por_depth.get(depth)
+        if candidatos is None:
+            candidatos = _zigzag_candidatos(high, low, depth)
+            candidatos_por_depth[depth] = candidatos
+        selecionados = selecao_por_par.get((depth, deviation_percent))
+        if selecionados is None:
+            selecionados = _zigzag_filtrar(*candidatos, deviation_percent)
+            selecao_por_par[(depth, deviation_percent)] = selecionados
+        resultados.append(_zigzag_montar_pivots(
+            df, *candidatos, selecionados, deviation_percent))
+    return resultados
+
+
+class ZigZagIncremental:
+    """Online ZigZag: feed one bar at a time, read pivots after any bar.
+
+    A bar becomes a final candidate once `depth` bars follow it (its centered
+    window is complete); final candidates go through the same walk as the batch
+    function. The last `depth` bars are re-evaluated with truncated windows on
+    every read, together with the last-bar extension, so `pivots()` equals
+    `calcular_zigzag_oficial` over the bars seen so far.
+    """
+
+    def __init__(self, depth: int, deviation_percent: float):
+        self.depth = max(int(depth), 0)
+        self.deviation_percent = deviation_percent
+        # (label, pos, high, low) of the last 2*depth+1 bars
+        self._janela: deque = deque(maxlen=2 * self.depth + 1)
+        self._selecionados: List[Tuple[Any, int, float, bool]] = []
+        # Pivot dicts of `_selecionados`, built once per selected candidate
+        self._pivos: List[Dict[str, Any]] = []
+        self._n_candidatos = 0
+        self.barras = 0
+
+    @classmethod
+    def a_partir_do_frame(cls, df: pd.DataFrame, depth: int, deviation_percent: float) -> 'ZigZagIncremental':
+        """State after every bar of `df` (candidate detection vectorized)."""
+        zigzag = cls(depth, deviation_percent)
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        n = len(df)
+        positions, prices, is_peak = _zigzag_candidatos(high, low, zigzag.depth)
+        finais = positions <= n - 1 - zigzag.depth
+        index = df.index
+        for pos, price, peak in zip(positions[finais].tolist(), prices[finais].tolist(),
+                                    is_peak[finais].tolist()):
+            zigzag._incluir((index[pos], pos, price, peak))
+        for pos in range(max(0, n - zigzag._janela.maxlen), n):
+            zigzag._janela.append((index[pos], pos, float(high[pos]), float(low[pos])))
+        zigzag.barras = n
+        return zigzag
+
+    def atualizar(self, idx, high: float, low: float) -> None:
+        """Append one bar (label, high, low)."""
+        pos = self.barras
+        self.barras += 1
+        self._janela.append((idx, pos, float(high), float(low)))
+        if pos - self.depth >= 0:
+            for candidate in self._candidatos_da_barra(pos - self.depth):
+                self._incluir(candidate)
+
+    def pivots(self) -> List[Dict[str, Any]]:
+        """Pivots over all bars seen so far.
+
+        The last leg is returned as fresh dicts; final pivots are shared between
+        calls and must be treated as read-only.
+        """
+        if not self.barras:
+            return []
+        tentativos = [candidate for pos in range(max(0, self.barras - self.depth), self.barras)
+                      for candidate in self._candidatos_da_barra(pos)]
+        if self._n_candidatos + len(tentativos) < 2:
+            return []
+        # The walk only touches its last two entries
+        cauda = self._selecionados[-2:]
+        for candidate in tentativos:
+            _zigzag_passo(cauda, candidate, self.deviation_percent)
+        pivots = self._pivos[:-2] + [self._como_pivo(c) for c in cauda]
+        idx, pos, high, low = self._janela[-1]
+        return _estender_zigzag_com_barra(pivots, idx, pos, high, low, self.deviation_percent)
+
+    def pivos_confirmados(self) -> List[Dict[str, Any]]:
+        """Pivots that no future bar can change (everything but the last leg)."""
+        return self._pivos[:-1]
+
+    def rebasear(self, deslocamento: int) -> None:
+        """Shift every position back by `deslocamento` bars (dropped by the caller).
+
+        Pivots before the new first bar are forgotten, except the last two
+        selected ones the walk still needs (they keep a negative 'pos').
+        """
+        if deslocamento <= 0:
+            return
+        antigos = sum(1 for _, pos, _, _ in self._selecionados if pos < deslocamento)
+        antigos = min(antigos, max(0, len(self._selecionados) - 2))
+        self._selecionados = [(idx, pos - deslocamento, price, peak)
+                              for idx, pos, price, peak in self._selecionados[antigos:]]
+        self._pivos = [self._como_pivo(c) for c in self._selecionados]
+        self._janela = deque(((idx, pos - deslocamento, high, low) for idx, pos, high, low in self._janela),
+                             maxlen=self._janela.maxlen)
+        self.barras -= deslocamento
+
+    def _incluir(self, candidate: Tuple[Any, int, float, bool]) -> None:
+        self._n_candidatos += 1
+        selecionados = self._selecionados
+        tamanho, ultimo = len(selecionados), selecionados[-1] if selecionados else None
+        _zigzag_passo(selecionados, candidate, self.deviation_percent)
+        if len(selecionados) > tamanho:
+            self._pivos.append(self._como_pivo(candidate))
+        elif selecionados[-1] is not ultimo:
+            self._pivos[-1] = self._como_pivo(candidate)
+
+    def _candidatos_da_barra(self, pos: int) -> List[Tuple[Any, int, float, bool]]:
+        """Peak/valley candidates at `pos`, with its window truncated at the last bar."""
+        janela = [barra for barra in self._janela if abs(barra[1] - pos) <= self.depth]
+        alvo = next(barra for barra in janela if barra[1] == pos)
+        # NaN bars never qualify, as in `_zigzag_candidatos`
+        maior = max((h for _, _, h, _ in janela if h == h), default=-np.inf)
+        menor = min((l for _, _, _, l in janela if l == l), default=np.inf)
+        candidatos = []
+        if alvo[2] == maior:
+            candidatos.append((alvo[0], pos, alvo[2], True))
+        if alvo[3] == menor:
+            candidatos.append((alvo[0], pos, alvo[3], False))
+        return candidatos
+
+    @staticmethod
+    def _como_pivo(candidate: Tuple[Any, int, float, bool]) -> Dict[str, Any]:
+        idx, pos, price, peak = candidate
+        return {'idx': idx, 'preco': price, 'tipo': 'PICO' if peak else 'VALE', 'pos': pos}
+
+
+def calcular_zigzag_referencia(df: pd.DataFrame, depth: int, deviation_percent: float) -> List[Dict[str, Any]]:
+    """Row-by-row ZigZag kept as the reference for `calcular_zigzag_oficial`.
+
     Fixes:
     - Lógica de desempate para candidatos no mesmo índice priorizando alternância
     - Fator de desvio mínimo para pivô de extensão parametrizado
@@ -675,56 +2282,7 @@ def calcular_zigzag_oficial(df: pd.DataFrame, depth: int, deviation_percent: flo
         if price_dev >= deviation_percent:
             confirmed_pivots.append(candidate)
             last_pivot = candidate
-    if Config.ZIGZAG_EXTEND_TO_LAST_BAR and confirmed_pivots:
-        last_confirmed_pivot = confirmed_pivots[-1]
-        last_bar = df.iloc[-1]
-
-        # If the last candle continues the move in the SAME direction,
-        # only update the existing pivot. Otherwise, create a new pivot.
-        if last_confirmed_pivot['tipo'] == 'PICO':
-            # Up move continues: update last peak
-            if last_bar['high'] > last_confirmed_pivot['preco']:
-                last_confirmed_pivot['preco'] = last_bar['high']
-                last_confirmed_pivot['idx'] = df.index[-1]
-            else:
-                # Reversal to downtrend → create a VALLEY
-                potential_pivot = {
-                    'idx': df.index[-1],
-                    'tipo': 'VALE',
-                    'preco': last_bar['low']
-                }
-                if potential_pivot['idx'] != last_confirmed_pivot['idx']:
-                    # Fix: fator de desvio da extensão parametrizado
-                    min_ext_dev = deviation_percent * getattr(
-                        Config, 'ZIGZAG_EXTENSION_DEVIATION_FACTOR', 0.25)
-                    if last_confirmed_pivot['preco'] != 0:
-                        ext_dev = abs(
-                            potential_pivot['preco'] - last_confirmed_pivot['preco']) / last_confirmed_pivot['preco'] * 100
-                        if ext_dev >= min_ext_dev:
-                            confirmed_pivots.append(potential_pivot)
-        else:  # last pivot is a VALLEY
-            # Down move continues: update last valley
-            if last_bar['low'] < last_confirmed_pivot['preco']:
-                last_confirmed_pivot['preco'] = last_bar['low']
-                last_confirmed_pivot['idx'] = df.index[-1]
-            else:
-                # Reversal to uptrend → create a PEAK
-                potential_pivot = {
-                    'idx': df.index[-1],
-                    'tipo': 'PICO',
-                    'preco': last_bar['high']
-                }
-                if potential_pivot['idx'] != last_confirmed_pivot['idx']:
-                    # Fix: fator de desvio da extensão parametrizado
-                    min_ext_dev = deviation_percent * getattr(
-                        Config, 'ZIGZAG_EXTENSION_DEVIATION_FACTOR', 0.25)
-                    if last_confirmed_pivot['preco'] != 0:
-                        ext_dev = abs(
-                            potential_pivot['preco'] - last_confirmed_pivot['preco']) / last_confirmed_pivot['preco'] * 100
-                        if ext_dev >= min_ext_dev:
-                            confirmed_pivots.append(potential_pivot)
-
-    return confirmed_pivots
+    return _estender_zigzag_ultima_barra(confirmed_pivots, df, deviation_percent)
 
 
 def is_head_extreme(df: pd.DataFrame, head_pivot: Dict, avg_pivot_dist_bars: int) -> bool:
@@ -737,32 +2295,29 @@ def is_head_extreme(df: pd.DataFrame, head_pivot: Dict, avg_pivot_dist_bars: int
         return True
 
     try:
-        # Find numeric position (iloc) of the head pivot
-        head_loc = df.index.get_loc(head_pivot['idx'])
+        # Numeric position (iloc) of the head pivot
+        head_loc = _posicao_pivo(df, head_pivot)
+        if head_loc is None:
+            return False
 
         # Define start and end of the search window in numeric positions
         start_loc = max(0, head_loc - lookback_bars)
         end_loc = min(len(df), head_loc + lookback_bars + 1)
 
-        # Slice the DataFrame by positions to create the context window
-        context_df = df.iloc[start_loc:end_loc]
-
-        # Exclude the pivot's own bar to ensure strict unique extreme check
-        try:
-            context_wo_head = context_df.drop(index=head_pivot['idx'])
-        except Exception:
-            context_wo_head = context_df
-
-        if context_wo_head.empty:
+        # Context excludes the pivot's own bar to ensure strict unique extreme check
+        if end_loc - start_loc <= 1:
             # Fix: closed-fail. Without a valid context window, do not assume an extreme
             return False
+        indice = obter_indice_extremos(df)
 
         if head_pivot['tipo'] == 'PICO':
             # Strict comparator vs. other bars (pivot bar excluded)
-            return head_pivot['preco'] > context_wo_head['high'].max()
+            return head_pivot['preco'] > np.fmax(indice.max_high(start_loc, head_loc),
+                                                 indice.max_high(head_loc + 1, end_loc))
         else:  # VALE
             # Strict comparator vs. other bars (pivot bar excluded)
-            return head_pivot['preco'] < context_wo_head['low'].min()
+            return head_pivot['preco'] < np.fmin(indice.min_low(start_loc, head_loc),
+                                                 indice.min_low(head_loc + 1, end_loc))
 
     except KeyError:
         # Pivot date not found in the DataFrame index
@@ -785,17 +2340,19 @@ def is_head_extreme_past_only(df: pd.DataFrame, head_pivot: Dict, avg_pivot_dist
             Config, 'HEAD_EXTREME_LOOKBACK_MIN_BARS', 30))
         if lookback_bars <= 0:
             return True
-        head_loc = df.index.get_loc(head_pivot['idx'])
+        head_loc = _posicao_pivo(df, head_pivot)
+        if head_loc is None:
+            return False
         start_loc = max(0, head_loc - lookback_bars)
         end_loc = head_loc  # past-only: exclude the pivot bar itself
-        context_df = df.iloc[start_loc:end_loc]
-        if context_df.empty:
+        if end_loc <= start_loc:
             # Closed-fail to avoid false positives with no context
             return False
+        indice = obter_indice_extremos(df)
         if head_pivot['tipo'] == 'PICO':
-            return head_pivot['preco'] > context_df['high'].max()
+            return head_pivot['preco'] > indice.max_high(start_loc, end_loc)
         else:  # VALE
-            return head_pivot['preco'] < context_df['low'].min()
+            return head_pivot['preco'] < indice.min_low(start_loc, end_loc)
     except Exception:
         return False
 
@@ -833,9 +2390,11 @@ def check_macd_divergence(df: pd.DataFrame, p1_idx, p3_idx, p1_price, p3_price,
         hist_col = f'MACDh_{macd_fast}_{macd_slow}_{macd_signal}'
         if hist_col not in df.columns:
             return False
-        if p1_idx not in df.index or p3_idx not in df.index:
+        pos1, pos3 = _posicao(df, p1_idx), _posicao(df, p3_idx)
+        if pos1 is None or pos3 is None:
             return False
-        hist_p1, hist_p3 = df.loc[p1_idx, hist_col], df.loc[p3_idx, hist_col]
+        hist = df[hist_col].to_numpy(dtype=float)
+        hist_p1, hist_p3 = hist[pos1], hist[pos3]
         bearish_types = ('OCO', 'DT', 'TT')
         bullish_types = ('OCOI', 'DB', 'TB')
         if tipo_padrao in bearish_types:
@@ -867,28 +2426,14 @@ def assess_rsi_divergence_strength(
     Strong divergence requires deeper zone levels or a minimum delta in RSI.
     """
     try:
-        rsi_len = getattr(Config, 'RSI_LENGTH', 14)
-        src_name = getattr(source_series, 'name', 'close')
-        if src_name == 'high':
-            rsi_col = f'RSI_{rsi_len}_HIGH'
-        elif src_name == 'low':
-            rsi_col = f'RSI_{rsi_len}_LOW'
-        else:
-            rsi_col = f'RSI_{rsi_len}_CLOSE'
-        if rsi_col not in df.columns:
-            try:
-                # Fallback: compute on the fly using the provided source series
-                rsi_series = ta.rsi(source_series, length=rsi_len)
-            except Exception:
-                rsi_series = None
-            if rsi_series is None or len(rsi_series.dropna()) == 0:
-                return False, False
-        else:
-            rsi_series = df[rsi_col]
-        if p1_idx not in rsi_series.index or p3_idx not in rsi_series.index:
+        # Cached column, else computed once per frame from the source series
+        rsi_vals = obter_rsi(df, source_series)
+        if rsi_vals is None:
+            return False, False
+        pos1, pos3 = _posicao(df, p1_idx), _posicao(df, p3_idx)
+        if pos1 is None or pos3 is None:
             return False, False
-        rsi1, rsi3 = float(rsi_series.loc[p1_idx]), float(
-            rsi_series.loc[p3_idx])
+        rsi1, rsi3 = float(rsi_vals[pos1]), float(rsi_vals[pos3])
         if np.isnan(rsi1) or np.isnan(rsi3):
             return False, False
 
@@ -929,38 +2474,27 @@ def detect_macd_signal_cross(
         lookback = lookback_bars if lookback_bars is not None else getattr(
             Config, 'MACD_SIGNAL_CROSS_LOOKBACK_BARS', 7
         )
-        macd_fast = getattr(Config, 'MACD_FAST', 12)
-        macd_slow = getattr(Config, 'MACD_SLOW', 26)
-        macd_signal = getattr(Config, 'MACD_SIGNAL', 9)
-        macd_col = f'MACD_{macd_fast}_{macd_slow}_{macd_signal}'
-        sig_col = f'MACDs_{macd_fast}_{macd_slow}_{macd_signal}'
-
-        # Get series from df if present, otherwise compute on the fly
-        macd_line = df[macd_col] if macd_col in df.columns else None
-        signal_line = df[sig_col] if sig_col in df.columns else None
-        if macd_line is None or signal_line is None:
-            macd_df = df.ta.macd(fast=macd_fast, slow=macd_slow,
-                                 signal=macd_signal, append=False)
-            if macd_df is None or macd_col not in macd_df.columns or sig_col not in macd_df.columns:
-                return False
-            macd_line = macd_df[macd_col]
-            signal_line = macd_df[sig_col]
+        # Get lines from df if present, otherwise computed once per frame
+        linhas = obter_macd(df)
+        if linhas is None:
+            return False
+        macd_line, signal_line = linhas
 
-        if idx_ref not in df.index:
+        ref_pos = _posicao(df, idx_ref)
+        if ref_pos is None:
             return False
-        ref_pos = df.index.get_loc(idx_ref)
         start_pos = max(0, ref_pos - lookback)
-        # Use df index to slice consistent window
-        window = df.index[start_pos:ref_pos + 1]
-        diff = (macd_line.loc[window] - signal_line.loc[window]).dropna()
+        # Same position window on both lines, NaNs dropped
+        diff = macd_line[start_pos:ref_pos + 1] - signal_line[start_pos:ref_pos + 1]
+        diff = diff[~np.isnan(diff)]
         if len(diff) < 2:
             return False
         # Fix: flexibilizar regra — aceitar cruzamento dentro dos últimos N candles
         max_age = getattr(Config, 'MACD_CROSS_MAX_AGE_BARS', 3)
         # Consider only the most recent transition at idx_ref
         if len(diff) >= 2:
-            prev_val = diff.iloc[-2]
-            curr_val = diff.iloc[-1]
+            prev_val = diff[-2]
+            curr_val = diff[-1]
             if direction == 'bearish' and (prev_val >= 0 and curr_val < 0):
                 return True
             if direction == 'bullish' and (prev_val <= 0 and curr_val > 0):
@@ -983,26 +2517,105 @@ def find_breakout_index(
     - Returns the index label of the breakout bar or None.
     """
     try:
-        limit = max_bars if max_bars is not None else getattr(
+        limit = int(max_bars if max_bars is not None else getattr(
             Config, 'BREAKOUT_SEARCH_MAX_BARS', 60
-        )
-        if start_idx not in df.index:
+        ))
+        start_pos = _posicao(df, start_idx)
+        if start_pos is None:
             return None
-        start_pos = df.index.get_loc(start_idx)
+        # Results pre-resolved by a batched call (full-history scans)
+        memo = _artefatos_do_frame(df).get('rompimentos')
+        if memo is not None:
+            pos = memo.get((start_pos, float(neckline_price), direction, limit))
+            if pos is not None:
+                return df.index[pos] if pos >= 0 else None
         end_pos = min(len(df) - 1, start_pos + limit)
-        for pos in range(start_pos + 1, end_pos + 1):
-            idx = df.index[pos]
-            close_val = float(df.loc[idx, 'close'])
-            # Fix: strict breakout criteria to avoid counting line touches
-            if direction == 'bearish' and close_val < neckline_price:
-                return idx
-            if direction == 'bullish' and close_val > neckline_price:
-                return idx
-        return None
+        window = df['close'].to_numpy(dtype=float)[start_pos + 1:end_pos + 1]
+        # Fix: strict breakout criteria to avoid counting line touches
+        if direction == 'bearish':
+            hit = window < neckline_price
+        elif direction == 'bullish':
+            hit = window > neckline_price
+        else:
+            return None
+        first = int(hit.argmax()) if hit.size else 0
+        return df.index[start_pos + 1 + first] if hit.size and hit[first] else None
     except Exception:
         return None
 
 
+def _primeiros_rompimentos(closes: np.ndarray, start_pos: np.ndarray, necklines: np.ndarray,
+                           bearish: np.ndarray, bullish: np.ndarray, limit: int) -> np.ndarray:
+    """First breakout position after each start within `limit` bars (-1 when none).
+
+    Row r scans closes[start_pos[r]+1 .. start_pos[r]+limit] (clipped to the
+    last bar) for close < neckline (bearish) or close > neckline (bullish).
+    """
+    n_rows, n = len(start_pos), len(closes)
+    if n_rows == 0 or limit <= 0 or n == 0:
+        return np.full(n_rows, -1, dtype=np.int64)
+    pos = start_pos[:, None] + np.arange(1, limit + 1)[None, :]
+    dentro = pos <= n - 1
+    vals = closes[np.minimum(pos, n - 1)]
+    neck = necklines[:, None]
+    hit = ((bearish[:, None] & (vals < neck)) | (bullish[:, None] & (vals > neck))) & dentro
+    first = hit.argmax(axis=1)
+    rows = np.arange(n_rows)
+    return np.where(hit[rows, first], pos[rows, first], -1)
+
+
+def find_breakout_indices(
+    df: pd.DataFrame,
+    neckline_prices,
+    start_idxs,
+    directions,
+    max_bars: Optional[int] = None,
+) -> List[Optional[Any]]:
+    """Batched `find_breakout_index`: resolve many (neckline, start, direction) at once.
+
+    `directions` may be a single direction or one per candidate. Returns one
+    index label (or None) per candidate, in input order.
+    """
+    limit = int(max_bars if max_bars is not None else getattr(
+        Config, 'BREAKOUT_SEARCH_MAX_BARS', 60))
+    posicoes = _posicoes_rompimento(df, neckline_prices, start_idxs, directions, limit)
+    return [df.index[pos] if pos >= 0 else None for pos in posicoes.tolist()]
+
+
+def _posicoes_rompimento(df: pd.DataFrame, neckline_prices, start_idxs, directions, limit: int) -> np.ndarray:
+    """Breakout positions for `find_breakout_indices` (-1: none or unknown start)."""
+    start_list = list(start_idxs)
+    if isinstance(directions, str):
+        directions = [directions] * len(start_list)
+    tabela = obter_posicoes(df)
+    starts = np.array([-1 if pos is None else pos for pos in map(tabela.get, start_list)],
+                      dtype=np.int64)
+    direcoes = np.asarray(list(directions), dtype=object)
+    conhecidos = starts >= 0
+    resultado = np.full(len(start_list), -1, dtype=np.int64)
+    resultado[conhecidos] = _primeiros_rompimentos(
+        df['close'].to_numpy(dtype=float), starts[conhecidos],
+        np.asarray(neckline_prices, dtype=float).reshape(-1)[conhecidos],
+        direcoes[conhecidos] == 'bearish', direcoes[conhecidos] == 'bullish', limit)
+    return resultado
+
+
+def _memorizar_rompimentos(df: pd.DataFrame, neckline_prices: List[float], start_idxs: List[Any],
+                           directions: List[str]) -> None:
+    """Resolve breakouts for many candidates in one vectorized call and memoize them
+    per frame, so `find_breakout_index` inside the validators becomes a lookup."""
+    if not start_idxs:
+        return
+    limit = int(getattr(Config, 'BREAKOUT_SEARCH_MAX_BARS', 60))
+    posicoes = _posicoes_rompimento(df, neckline_prices, start_idxs, directions, limit)
+    tabela = obter_posicoes(df)
+    memo = _artefatos_do_frame(df).setdefault('rompimentos', {})
+    for idx, neck, direction, pos in zip(start_idxs, neckline_prices, directions, posicoes.tolist()):
+        start_pos = tabela.get(idx)
+        if start_pos is not None:
+            memo[(start_pos, float(neck), direction, limit)] = pos
+
+
 def check_breakout_volume(
     df: pd.DataFrame,
     breakout_idx,
@@ -1014,7 +2627,8 @@ def check_breakout_volume(
     Compares breakout volume vs. average volume of previous N bars.
     """
     try:
-        if breakout_idx not in df.index:
+        pos = _posicao(df, breakout_idx)
+        if pos is None:
             return False
         lookback = lookback_bars if lookback_bars is not None else getattr(
             Config, 'VOLUME_BREAKOUT_LOOKBACK_BARS', 20
@@ -1022,13 +2636,13 @@ def check_breakout_volume(
         mult = multiplier if multiplier is not None else getattr(
             Config, 'VOLUME_BREAKOUT_MULTIPLIER', 1.8
         )
-        pos = df.index.get_loc(breakout_idx)
+        volume = df['volume'].to_numpy(dtype=float)
         start = max(0, pos - lookback)
-        base = df.iloc[start:pos]['volume']
-        if base.empty:
+        base = volume[start:pos]
+        if base.size == 0:
             return False
-        base_mean = float(base.mean())
-        breakout_vol = float(df.loc[breakout_idx, 'volume'])
+        base_mean = _media_sem_nan(base)
+        breakout_vol = float(volume[pos])
         return base_mean > 0 and breakout_vol >= (mult * base_mean)
     except Exception:
         return False
@@ -1054,48 +2668,16 @@ def check_stochastic_confirmation(
         'valid_estocastico_cross': False,
     }
     try:
-        k_col = f"STOCHk_{getattr(Config, 'STOCH_K', 14)}_{getattr(Config, 'STOCH_D', 3)}_{getattr(Config, 'STOCH_SMOOTH_K', 3)}"
-        d_col = f"STOCHd_{getattr(Config, 'STOCH_K', 14)}_{getattr(Config, 'STOCH_D', 3)}_{getattr(Config, 'STOCH_SMOOTH_K', 3)}"
-        # Some pandas_ta versions name columns with default params
-        if k_col not in df.columns or d_col not in df.columns:
-            k_alt, d_alt = 'STOCHk_14_3_3', 'STOCHd_14_3_3'
-        else:
-            k_alt, d_alt = k_col, d_col
-
-        # Prefer module-level ta (easily monkeypatched in tests). Fallback to df.ta
-        stoch_df = None
-        try:
-            stoch_df = ta.stoch(high=df['high'], low=df['low'], close=df['close'], k=getattr(
-                Config, 'STOCH_K', 14), d=getattr(Config, 'STOCH_D', 3), smooth_k=getattr(Config, 'STOCH_SMOOTH_K', 3))
-        except Exception:
-            pass
-        if stoch_df is None:
-            try:
-                stoch_df = df.ta.stoch(high=df['high'], low=df['low'], close=df['close'], k=getattr(
-                    Config, 'STOCH_K', 14), d=getattr(Config, 'STOCH_D', 3), smooth_k=getattr(Config, 'STOCH_SMOOTH_K', 3))
-            except Exception:
-                pass
-
-        # Select series
-        k_series = None
-        d_series = None
-        if stoch_df is not None:
-            if k_col in stoch_df.columns and d_col in stoch_df.columns:
-                k_series, d_series = stoch_df[k_col], stoch_df[d_col]
-            elif 'STOCHk_14_3_3' in stoch_df.columns and 'STOCHd_14_3_3' in stoch_df.columns:
-                k_series, d_series = stoch_df['STOCHk_14_3_3'], stoch_df['STOCHd_14_3_3']
-        if k_series is None or d_series is None:
-            # Fallback to df columns if available
-            if k_col in df.columns and d_col in df.columns:
-                k_series, d_series = df[k_col], df[d_col]
-            elif 'STOCHk_14_3_3' in df.columns and 'STOCHd_14_3_3' in df.columns:
-                k_series, d_series = df['STOCHk_14_3_3'], df['STOCHd_14_3_3']
-        if k_series is None or d_series is None:
+        # Frame columns when present, otherwise computed once per frame
+        estocastico = obter_estocastico(df)
+        if estocastico is None:
             return result
-        if p1_idx not in k_series.index or p3_idx not in k_series.index:
+        pos1, pos3 = _posicao(df, p1_idx), _posicao(df, p3_idx)
+        if pos1 is None or pos3 is None:
             return result
-        k1 = float(k_series.loc[p1_idx])
-        k3 = float(k_series.loc[p3_idx])
+        k_vals, d_vals = estocastico
+        k1 = float(k_vals[pos1])
+        k3 = float(k_vals[pos3])
         if np.isnan(k1) or np.isnan(k3):
             return result
 
@@ -1118,20 +2700,18 @@ def check_stochastic_confirmation(
                 result['valid_estocastico_divergencia'] = bool(div)
 
         # Directional %K/%D cross within recent window
-        if p3_idx in df.index:
+        if pos3 is not None:
             lookback = getattr(Config, 'STOCH_CROSS_LOOKBACK_BARS', 7)
-            ref_pos = df.index.get_loc(p3_idx) if p3_idx in df.index else None
+            ref_pos = pos3
             if ref_pos is not None:
                 start_pos = max(0, ref_pos - lookback)
-                window = df.index[start_pos:ref_pos + 1]
                 # Use the same source series as for divergence
-                k = k_series.loc[window].dropna()
-                d = d_series.loc[window].dropna()
-                diff = (k - d).dropna()
+                diff = k_vals[start_pos:ref_pos + 1] - d_vals[start_pos:ref_pos + 1]
+                diff = diff[~np.isnan(diff)]
                 if len(diff) >= 2:
                     # Consider only the most recent transition at p3
-                    prev_val = diff.iloc[-2]
-                    curr_val = diff.iloc[-1]
+                    prev_val = diff[-2]
+                    curr_val = diff[-1]
                     if direction == 'bearish' and k1 >= ob and (prev_val >= 0 and curr_val < 0):
                         result['valid_estocastico_cross'] = True
                     if direction == 'bullish' and k1 <= os_ and (prev_val <= 0 and curr_val > 0):
@@ -1149,10 +2729,13 @@ def check_volume_profile(df: pd.DataFrame, pivots: List[Dict[str, Any]], p1_idx,
             p1_idx), indices.get(p3_idx), indices.get(p5_idx)
         if any(i is None for i in [idx_p1, idx_p3, idx_p5]) or any(i < 1 for i in [idx_p1, idx_p3, idx_p5]):
             return False
-        p0_idx, p2_idx, p4_idx = pivots[idx_p1 -
-                                        1]['idx'], pivots[idx_p3-1]['idx'], pivots[idx_p5-1]['idx']
-        vol_cabeca = df.loc[p2_idx:p3_idx]['volume'].mean()
-        vol_od = df.loc[p4_idx:p5_idx]['volume'].mean()
+        pos_p2, pos_p3 = _posicao_pivo(df, pivots[idx_p3 - 1]), _posicao_pivo(df, pivots[idx_p3])
+        pos_p4, pos_p5 = _posicao_pivo(df, pivots[idx_p5 - 1]), _posicao_pivo(df, pivots[idx_p5])
+        if any(pos is None for pos in (pos_p2, pos_p3, pos_p4, pos_p5)):
+            return False
+        volume = df['volume'].to_numpy(dtype=float)
+        vol_cabeca = _media_sem_nan(volume[pos_p2:pos_p3 + 1])
+        vol_od = _media_sem_nan(volume[pos_p4:pos_p5 + 1])
         return vol_cabeca > vol_od
     except Exception:
         return False
@@ -1211,14 +2794,8 @@ def validate_and_score_hns_pattern(p0, p1, p2, p3, p4, p5, p6, tipo_padrao, df_h
     # reteste de neckline (p6) deve ocorrer próximo à neckline com tolerância por ATR
     neckline_price = np.mean([neckline1['preco'], neckline2['preco']])
     # Tolerância adaptativa baseada no ATR(14) pré-calculado
-    atr_series = df_historico['ATR_14'] if 'ATR_14' in df_historico.columns else pd.Series(
-        dtype=float)
     # Procura o ATR no índice do p6; se não houver valor, usa o último ATR disponível
-    if p6['idx'] in atr_series.index and not np.isnan(atr_series.loc[p6['idx']]):
-        atr_val = float(atr_series.loc[p6['idx']])
-    else:
-        atr_val = float(
-            atr_series.dropna().iloc[-1]) if not atr_series.dropna().empty else 0.0
+    atr_val = _atr_no_pivo(df_historico, p6)
 
     # Fallback: if ATR unavailable/zero, use 0.5% of neckline price
     if atr_val > 0:
@@ -1307,17 +2884,17 @@ def validate_and_score_hns_pattern(p0, p1, p2, p3, p4, p5, p6, tipo_padrao, df_h
 
 def check_volume_profile_dtb(df, p0, p1, p2, p3):
     try:
-        idx0, idx1, idx2, idx3 = p0.get('idx'), p1.get(
-            'idx'), p2.get('idx'), p3.get('idx')
-        if any(idx not in df.index for idx in [idx0, idx1, idx2, idx3]):
+        pos0, pos1, pos2, pos3 = (_posicao_pivo(df, p) for p in (p0, p1, p2, p3))
+        if any(pos is None for pos in (pos0, pos1, pos2, pos3)):
             return False
 
         # Ensure ascending intervals
-        start1, end1 = (idx0, idx1) if idx0 <= idx1 else (idx1, idx0)
-        start2, end2 = (idx2, idx3) if idx2 <= idx3 else (idx3, idx2)
+        start1, end1 = (pos0, pos1) if pos0 <= pos1 else (pos1, pos0)
+        start2, end2 = (pos2, pos3) if pos2 <= pos3 else (pos3, pos2)
 
-        vol_extremo_1 = df.loc[start1:end1]['volume'].mean()
-        vol_extremo_2 = df.loc[start2:end2]['volume'].mean()
+        volume = df['volume'].to_numpy(dtype=float)
+        vol_extremo_1 = _media_sem_nan(volume[start1:end1 + 1])
+        vol_extremo_2 = _media_sem_nan(volume[start2:end2 + 1])
 
         if np.isnan(vol_extremo_1) or np.isnan(vol_extremo_2):
             return False
@@ -1334,12 +2911,13 @@ def check_obv_divergence_dtb(df, p1, p3, tipo_padrao):
         if 'OBV' not in df.columns:
             return False
 
-        idx1, idx3 = p1.get('idx'), p3.get('idx')
-        if idx1 not in df.index or idx3 not in df.index:
+        pos1, pos3 = _posicao_pivo(df, p1), _posicao_pivo(df, p3)
+        if pos1 is None or pos3 is None:
             return False
 
-        obv_p1 = df.loc[idx1, 'OBV']
-        obv_p3 = df.loc[idx3, 'OBV']
+        obv = df['OBV'].to_numpy(dtype=float)
+        obv_p1 = obv[pos1]
+        obv_p3 = obv[pos3]
         if np.isnan(obv_p1) or np.isnan(obv_p3):
             return False
 
@@ -1352,6 +2930,44 @@ def check_obv_divergence_dtb(df, p1, p3, tipo_padrao):
     return False
 
 
+def _distancia_media_pivos(pivots: List[Dict[str, Any]], df_historico: pd.DataFrame) -> float:
+    """Mean distance in bars between consecutive pivots found in `df_historico`."""
+    posicoes = [_posicao_pivo(df_historico, p) for p in pivots]
+    distancias_em_barras = [
+        posicoes[i] - posicoes[i-1]
+        for i in range(1, len(posicoes))
+        if posicoes[i] is not None and posicoes[i-1] is not None
+    ]
+    return np.mean(distancias_em_barras) if distancias_em_barras else 0
+
+
+def _inicio_janelas(n_pivots: int, tamanho: int) -> int:
+    """First window start to scan: 0 in full-history mode, else only recent windows."""
+    if getattr(Config, 'FULL_HISTORY_SCAN', False):
+        return 0
+    return max(0, n_pivots - (tamanho - 1) - Config.RECENT_PATTERNS_LOOKBACK_COUNT)
+
+
+def _janelas_alternadas(pivots: List[Dict[str, Any]], tamanho: int, start_index: int) -> List[Tuple[int, bool]]:
+    """Return (start, starts_with_peak) for every strictly alternating PICO/VALE window.
+
+    The type-alternation mask is computed once with NumPy, so only windows whose
+    types can match a pattern reach the (expensive) validators.
+    """
+    n = len(pivots)
+    if n < tamanho or start_index > n - tamanho:
+        return []
+    tipos = np.array([{'PICO': 1, 'VALE': 0}.get(p.get('tipo'), -1) for p in pivots], dtype=np.int8)
+    alterna = (tipos[1:] != tipos[:-1]) & (tipos[1:] >= 0) & (tipos[:-1] >= 0)
+    # run[i]: number of consecutive alternating steps starting at pivot i
+    quebras = np.append(np.flatnonzero(~alterna), n - 1)
+    posicoes = np.arange(n - 1)
+    run = quebras[np.searchsorted(quebras, posicoes)] - posicoes
+    starts = np.flatnonzero(run[:n - tamanho + 1] >= tamanho - 1)
+    starts = starts[starts >= start_index]
+    return list(zip(starts.tolist(), (tipos[starts] == 1).tolist()))
+
+
 def identificar_padroes_hns(pivots: List[Dict[str, Any]], df_historico: pd.DataFrame) -> List[Dict[str, Any]]:
     """Generate 7-pivot windows, identify H&S/Inverse H&S and validate with p6 (retest)."""
     padroes_encontrados = []
@@ -1359,47 +2975,43 @@ def identificar_padroes_hns(pivots: List[Dict[str, Any]], df_historico: pd.DataF
     if n < 7:
         return []
     try:
-        # Cria um mapeador de timestamp para posição numérica para eficiência
-        locs = pd.Series(range(len(df_historico)), index=df_historico.index)
-        distancias_em_barras = [
-            locs[pivots[i]['idx']] - locs[pivots[i-1]['idx']]
-            for i in range(1, n)
-            if pivots[i]['idx'] in locs and pivots[i-1]['idx'] in locs
-        ]
-        avg_pivot_dist_bars = np.mean(
-            distancias_em_barras) if distancias_em_barras else 0
+        avg_pivot_dist_bars = _distancia_media_pivos(pivots, df_historico)
     except Exception as e:
         # Fix: substituir print por logging
         logging.warning(
             "Aviso: Não foi possível calcular a distância média dos pivôs. Erro: %s", e)
         avg_pivot_dist_bars = 0  # Fallback
-    start_index = max(0, n - 6 - Config.RECENT_PATTERNS_LOOKBACK_COUNT)
+    start_index = _inicio_janelas(n, 7)
+    janelas = _janelas_alternadas(pivots, 7, start_index)
 
     # Fix: substituir print por logging
-    logging.info(
-        "Analyzing only the last %d possible final pivots (from index %d).",
-        Config.RECENT_PATTERNS_LOOKBACK_COUNT,
-        start_index,
-    )
+    if getattr(Config, 'FULL_HISTORY_SCAN', False):
+        logging.info("Full-history H&S scan: %d windows, %d with matching pivot types.",
+                     n - 6, len(janelas))
+        # Neckline breakouts (from p5) for every candidate in one vectorized call
+        _memorizar_rompimentos(
+            df_historico,
+            [np.mean([pivots[i + 2]['preco'], pivots[i + 4]['preco']]) for i, _ in janelas],
+            [pivots[i + 5]['idx'] for i, _ in janelas],
+            ['bullish' if comeca_em_pico else 'bearish' for _, comeca_em_pico in janelas])
+    else:
+        logging.info(
+            "Analyzing only the last %d possible final pivots (from index %d).",
+            Config.RECENT_PATTERNS_LOOKBACK_COUNT,
+            start_index,
+        )
 
-    for i in range(start_index, n - 6):
+    for i, comeca_em_pico in janelas:
         janela = pivots[i:i+7]
         p0, p1, p2, p3, p4, p5 = janela[0], janela[1], janela[2], janela[3], janela[4], janela[5]
         p6 = janela[6]
 
-        tipo_padrao = None
-        # Check H&S (p6 is the retest)
-        if all(p['tipo'] == t for p, t in zip(janela, ['VALE', 'PICO', 'VALE', 'PICO', 'VALE', 'PICO', 'VALE'])):
-            tipo_padrao = 'OCO'
-        # Check Inverse H&S
-        elif all(p['tipo'] == t for p, t in zip(janela, ['PICO', 'VALE', 'PICO', 'VALE', 'PICO', 'VALE', 'PICO'])):
-            tipo_padrao = 'OCOI'
-
-        if tipo_padrao:
-            dados_padrao = validate_and_score_hns_pattern(
-                p0, p1, p2, p3, p4, p5, p6, tipo_padrao, df_historico, pivots, avg_pivot_dist_bars)
-            if dados_padrao:
-                padroes_encontrados.append(dados_padrao)
+        # VALE-first window → H&S (p6 is the retest); PICO-first → Inverse H&S
+        tipo_padrao = 'OCOI' if comeca_em_pico else 'OCO'
+        dados_padrao = validate_and_score_hns_pattern(
+            p0, p1, p2, p3, p4, p5, p6, tipo_padrao, df_historico, pivots, avg_pivot_dist_bars)
+        if dados_padrao:
+            padroes_encontrados.append(dados_padrao)
 
     return padroes_encontrados
 
@@ -1459,14 +3071,12 @@ def validate_and_score_double_pattern(p0, p1, p2, p3, p4, tipo_padrao, df_histor
                                     Config.HEAD_EXTREME_LOOKBACK_FACTOR)
                 lookback_bars = max(base_lookback, getattr(
                     Config, 'HEAD_EXTREME_LOOKBACK_MIN_BARS', 30))
-                head_loc = df_historico.index.get_loc(p1['idx'])
+                head_loc = _posicao_pivo(df_historico, p1)
                 start_loc = max(0, head_loc - lookback_bars)
                 end_loc = min(len(df_historico), head_loc + lookback_bars + 1)
-                context_df = df_historico.iloc[start_loc:end_loc]
-                ctx_high = context_df['high'].max(
-                ) if not context_df.empty else float('nan')
-                ctx_low = context_df['low'].min(
-                ) if not context_df.empty else float('nan')
+                indice = obter_indice_extremos(df_historico)
+                ctx_high = indice.max_high(start_loc, end_loc)
+                ctx_low = indice.min_low(start_loc, end_loc)
                 _pattern_debug(tipo_padrao,
                                f"{Fore.YELLOW}DTB debug: fail at valid_contexto_extremos ({tipo_padrao}). "
                                f"lookback_bars={lookback_bars} p1_preco={preco_p1:.6f} ctx_high={ctx_high:.6f} ctx_low={ctx_low:.6f}{Style.RESET_ALL}")
@@ -1530,13 +3140,7 @@ def validate_and_score_double_pattern(p0, p1, p2, p3, p4, tipo_padrao, df_histor
 
     # Mandatory: p4 must be a valid retest of the neckline (defined by p2)
     neckline_price = preco_p2
-    atr_series = df_historico['ATR_14'] if 'ATR_14' in df_historico.columns else pd.Series(
-        dtype=float)
-    if p4.get('idx') in atr_series.index and not np.isnan(atr_series.loc[p4.get('idx')]):
-        atr_val = float(atr_series.loc[p4.get('idx')])
-    else:
-        atr_val = float(
-            atr_series.dropna().iloc[-1]) if not atr_series.dropna().empty else 0.0
+    atr_val = _atr_no_pivo(df_historico, p4)
 
     # Fallback: if ATR unavailable/zero, use 0.5% of neckline price
     if atr_val > 0:
@@ -1656,45 +3260,43 @@ def identificar_padroes_double_top_bottom(pivots: List[Dict[str, Any]], df_histo
 
     # Calcula distância média entre pivôs (em barras) para definir janela de contexto
     try:
-        locs = pd.Series(range(len(df_historico)), index=df_historico.index)
-        distancias_em_barras = [
-            locs[pivots[i]['idx']] - locs[pivots[i-1]['idx']]
-            for i in range(1, n)
-            if pivots[i]['idx'] in locs and pivots[i-1]['idx'] in locs
-        ]
-        avg_pivot_dist_bars = np.mean(
-            distancias_em_barras) if distancias_em_barras else 0
+        avg_pivot_dist_bars = _distancia_media_pivos(pivots, df_historico)
     except Exception as e:
         # Fix: substituir print por logging
         logging.warning(
             "Aviso: Não foi possível calcular a distância média dos pivôs (DTB). Erro: %s", e)
         avg_pivot_dist_bars = 0
 
-    start_index = max(0, n - 4 - Config.RECENT_PATTERNS_LOOKBACK_COUNT)
+    start_index = _inicio_janelas(n, 5)
+    janelas = _janelas_alternadas(pivots, 5, start_index)
     # Fix: substituir print por logging
-    logging.info(
-        "Analyzing only the last %d DT/DB candidates (from index %d).",
-        Config.RECENT_PATTERNS_LOOKBACK_COUNT,
-        start_index,
-    )
+    if getattr(Config, 'FULL_HISTORY_SCAN', False):
+        logging.info("Full-history DT/DB scan: %d windows, %d with matching pivot types.",
+                     n - 4, len(janelas))
+        # Neckline (p2) breakouts from p3 for every candidate in one vectorized call
+        _memorizar_rompimentos(
+            df_historico,
+            [float(pivots[i + 2]['preco']) for i, _ in janelas],
+            [pivots[i + 3]['idx'] for i, _ in janelas],
+            ['bullish' if comeca_em_pico else 'bearish' for _, comeca_em_pico in janelas])
+    else:
+        logging.info(
+            "Analyzing only the last %d DT/DB candidates (from index %d).",
+            Config.RECENT_PATTERNS_LOOKBACK_COUNT,
+            start_index,
+        )
 
-    for i in range(start_index, n - 4):
+    for i, comeca_em_pico in janelas:
         janela = pivots[i:i+5]
         p0, p1, p2, p3 = janela[0], janela[1], janela[2], janela[3]
         p4 = janela[4]
 
-        tipo_padrao = None
-        # Verificação base: usa os 4 primeiros pivôs (p0..p3)
-        if all(p.get('tipo') == t for p, t in zip(janela, ['VALE', 'PICO', 'VALE', 'PICO', 'VALE'])):
-            tipo_padrao = 'DT'
-        elif all(p.get('tipo') == t for p, t in zip(janela, ['PICO', 'VALE', 'PICO', 'VALE', 'PICO'])):
-            tipo_padrao = 'DB'
-
-        if tipo_padrao:
-            dados_padrao = validate_and_score_double_pattern(
-                p0, p1, p2, p3, p4, tipo_padrao, df_historico, avg_pivot_dist_bars)
-            if dados_padrao:
-                padroes_encontrados.append(dados_padrao)
+        # Verificação base: VALE-first alternating window → DT; PICO-first → DB
+        tipo_padrao = 'DB' if comeca_em_pico else 'DT'
+        dados_padrao = validate_and_score_double_pattern(
+            p0, p1, p2, p3, p4, tipo_padrao, df_historico, avg_pivot_dist_bars)
+        if dados_padrao:
+            padroes_encontrados.append(dados_padrao)
 
     return padroes_encontrados
 
@@ -1715,18 +3317,13 @@ def identificar_padroes_ttb(pivots: List[Dict[str, Any]]) -> List[Dict[str, Any]
     if n < 7:
         return resultados
 
-    # Harmonize with other detectors: restrict to recent candidates
-    start_index = max(0, n - 6 - Config.RECENT_PATTERNS_LOOKBACK_COUNT)
+    # Harmonize with other detectors: restrict to recent candidates (unless full scan)
+    start_index = _inicio_janelas(n, 7)
 
-    for i in range(start_index, n - 6):
+    for i, comeca_em_pico in _janelas_alternadas(pivots, 7, start_index):
         janela = pivots[i:i + 7]
-        tipos = [p.get('tipo') for p in janela]
-        if tipos == ['VALE', 'PICO', 'VALE', 'PICO', 'VALE', 'PICO', 'VALE']:
-            resultados.append(
-                {'padrao_tipo': 'TT', **{f'p{k}_obj': janela[k] for k in range(7)}})
-        elif tipos == ['PICO', 'VALE', 'PICO', 'VALE', 'PICO', 'VALE', 'PICO']:
-            resultados.append(
-                {'padrao_tipo': 'TB', **{f'p{k}_obj': janela[k] for k in range(7)}})
+        resultados.append(
+            {'padrao_tipo': 'TB' if comeca_em_pico else 'TT', **{f'p{k}_obj': janela[k] for k in range(7)}})
     return resultados
 
 
@@ -1759,11 +3356,9 @@ def validate_and_score_triple_pattern(pattern: Dict[str, Any], df_historico: pd.
 
     # Avg pivot distance (bars) for context
     try:
-        locs = pd.Series(range(len(df_historico)), index=df_historico.index)
-        dist_barras = [locs[pivs[i]['idx']] - locs[pivs[i-1]['idx']]
-                       for i in range(1, 7)]
-        avg_pivot_dist_bars = float(
-            np.mean(dist_barras)) if dist_barras else 0.0
+        posicoes = [_posicao_pivo(df_historico, p) for p in pivs]
+        avg_pivot_dist_bars = float(np.mean(np.diff(posicoes))) \
+            if all(pos is not None for pos in posicoes) else 0.0
     except Exception:
         avg_pivot_dist_bars = 0.0
 
@@ -1817,14 +3412,12 @@ def validate_and_score_triple_pattern(pattern: Dict[str, Any], df_historico: pd.
                                     Config.HEAD_EXTREME_LOOKBACK_FACTOR)
                 lookback_bars = max(base_lookback, getattr(
                     Config, 'HEAD_EXTREME_LOOKBACK_MIN_BARS', 30))
-                head_loc = df_historico.index.get_loc(p1['idx'])
+                head_loc = _posicao_pivo(df_historico, p1)
                 start_loc = max(0, head_loc - lookback_bars)
                 end_loc = head_loc  # past-only
-                context_df = df_historico.iloc[start_loc:end_loc]
-                ctx_high = context_df['high'].max(
-                ) if not context_df.empty else float('nan')
-                ctx_low = context_df['low'].min(
-                ) if not context_df.empty else float('nan')
+                indice = obter_indice_extremos(df_historico)
+                ctx_high = indice.max_high(start_loc, end_loc)
+                ctx_low = indice.min_low(start_loc, end_loc)
                 _pattern_debug(
                     tipo,
                     f"{Fore.YELLOW}TTB debug: fail at valid_contexto_extremos ({tipo}). "
@@ -1910,14 +3503,8 @@ def validate_and_score_triple_pattern(pattern: Dict[str, Any], df_historico: pd.
     # reteste de neckline (p6) deve ocorrer próximo à neckline com tolerância por ATR
     neckline_price = np.mean([preco_p2, preco_p4])
     # Tolerância adaptativa baseada no ATR(14) pré-calculado
-    atr_series = df_historico['ATR_14'] if 'ATR_14' in df_historico.columns else pd.Series(
-        dtype=float)
     # Procura o ATR no índice do p6; se não houver valor, usa o último ATR disponível
-    if p6['idx'] in atr_series.index and not np.isnan(atr_series.loc[p6['idx']]):
-        atr_val = float(atr_series.loc[p6['idx']])
-    else:
-        atr_val = float(
-            atr_series.dropna().iloc[-1]) if not atr_series.dropna().empty else 0.0
+    atr_val = _atr_no_pivo(df_historico, p6)
 
     # Fallback: if ATR unavailable/zero, use 1.0% of neckline price
     if atr_val > 0:
@@ -2069,9 +3656,478 @@ def _parse_cli_args() -> argparse.Namespace:
         default="ALL",
         help="Tipos de padrões a serem detectados, separados por vírgula (ex: HNS,DTB,TTB). Default: ALL",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Número de processos para os jobs (ticker, intervalo). Default: 1 (sequencial)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Diretório do cache local de OHLCV (Parquet). Default: Config.OHLCV_CACHE_DIR",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Desativa o cache local de OHLCV (sempre baixa da API)",
+    )
+    parser.add_argument(
+        "--full-history",
+        action="store_true",
+        help="Varre todas as janelas de pivôs do histórico (não só as mais recentes)",
+    )
+    parser.add_argument(
+        "--monitor",
+        action="store_true",
+        help="Modo monitor: reavalia os padrões a cada candle fechado e grava sinais novos em JSONL",
+    )
+    parser.add_argument(
+        "--monitor-output",
+        type=str,
+        default=None,
+        help="Arquivo JSONL dos sinais do monitor. Default: Config.MONITOR_OUTPUT_PATH",
+    )
+    parser.add_argument(
+        "--poll-seconds",
+        type=float,
+        default=None,
+        help="Intervalo de polling do monitor em segundos. Default: Config.MONITOR_POLL_SECONDS",
+    )
     return parser.parse_args()
 
 
+def _agrupar_jobs_por_ticker_intervalo(
+    strategies_dict: Dict[str, Dict[str, Dict[str, Any]]],
+    tickers: List[str],
+    intervals_filter: Optional[set] = None,
+) -> Dict[Tuple[str, str], List[Tuple[Tuple[int, int, int], str, Dict[str, Any]]]]:
+    """Group strategy runs by (ticker, interval) so each series is loaded once.
+
+    Returns an insertion-ordered dict mapping (ticker, interval) to a list of
+    (order_key, strategy_name, zigzag_params). `order_key` is the position of
+    the run in the original strategy → interval → ticker loop.
+    """
+    jobs: Dict[Tuple[str, str], List[Tuple[Tuple[int, int, int], str, Dict[str, Any]]]] = {}
+    for t_pos, ticker in enumerate(tickers):
+        for s_pos, (strategy_name, intervals_config) in enumerate(strategies_dict.items()):
+            for i_pos, (interval, params) in enumerate(intervals_config.items()):
+                if intervals_filter and interval not in intervals_filter:
+                    continue
+                jobs.setdefault((ticker, interval), []).append(
+                    ((s_pos, i_pos, t_pos), strategy_name, params))
+    return jobs
+
+
+def _log_scan_throughput(detector: str, janelas: int, inicio: float) -> None:
+    """Log full-history scan throughput (windows/second) for one detector run."""
+    if not getattr(Config, 'FULL_HISTORY_SCAN', False) or janelas <= 0:
+        return
+    elapsed = time.perf_counter() - inicio
+    logging.info("%s full-history scan: %d windows in %.3fs (%.0f windows/s).",
+                 detector, janelas, elapsed, janelas / elapsed if elapsed > 0 else float('inf'))
+
+
+def _detectar_padroes(pivots: List[Dict[str, Any]], df_historico: pd.DataFrame,
+                      wanted_patterns: set) -> List[Dict[str, Any]]:
+    """Run the selected detectors (HNS, DTB, TTB) on one pivot sequence."""
+    encontrados: List[Dict[str, Any]] = []
+    n = len(pivots)
+
+    if ('ALL' in wanted_patterns or 'HNS' in wanted_patterns) and n >= 7:
+        logging.info("Identifying H&S patterns with hard rules...")
+        inicio = time.perf_counter()
+        encontrados.extend(identificar_padroes_hns(pivots, df_historico))
+        _log_scan_throughput('HNS', n - 6, inicio)
+
+    if 'ALL' in wanted_patterns or 'DTB' in wanted_patterns:
+        inicio = time.perf_counter()
+        encontrados.extend(
+            identificar_padroes_double_top_bottom(pivots, df_historico))
+        _log_scan_throughput('DTB', n - 4, inicio)
+
+    # Triple Top/Bottom integration (TT/TB)
+    if 'ALL' in wanted_patterns or 'TTB' in wanted_patterns:
+        logging.info("Identifying Triple Top/Bottom (TT/TB) candidates...")
+        inicio = time.perf_counter()
+        candidatos_ttb = identificar_padroes_ttb(pivots)
+        if candidatos_ttb:
+            logging.info("Found %d TT/TB raw candidates. Validating...",
+                         len(candidatos_ttb))
+        if candidatos_ttb and getattr(Config, 'FULL_HISTORY_SCAN', False):
+            # Neckline breakouts (from p6) for every candidate in one vectorized call
+            _memorizar_rompimentos(
+                df_historico,
+                [np.mean([float(c['p2_obj']['preco']), float(c['p4_obj']['preco'])]) for c in candidatos_ttb],
+                [c['p6_obj']['idx'] for c in candidatos_ttb],
+                ['bearish' if c['padrao_tipo'] == 'TT' else 'bullish' for c in candidatos_ttb])
+        for cand in candidatos_ttb:
+            dados_ttb = validate_and_score_triple_pattern(cand, df_historico)
+            if dados_ttb:
+                logging.info("TTB accepted %s with score=%s",
+                             dados_ttb['padrao_tipo'], dados_ttb['score_total'])
+                encontrados.append(dados_ttb)
+        _log_scan_throughput('TTB', n - 6, inicio)
+
+    return encontrados
+
+
+def _processar_ticker_intervalo(
+    ticker: str,
+    interval: str,
+    strategy_runs: List[Tuple[Tuple[int, int, int], str, Dict[str, Any]]],
+    wanted_patterns: set,
+    dados: Any = None,
+) -> List[Tuple[Tuple[int, int, int], Dict[str, Any]]]:
+    """Load and enrich one (ticker, interval) series, then fan out to every strategy.
+
+    Download, indicators and the batched ZigZag run once; only pattern
+    validation runs per strategy. `dados` is an already downloaded frame (or
+    the download error) from `baixar_series_concorrentes`; None downloads here.
+    Returns (order_key, pattern) pairs tagged with metadata.
+    """
+    resultados: List[Tuple[Tuple[int, int, int], Dict[str, Any]]] = []
+    logging.info("--- Processing: %s | Interval: %s (%d strategies) ---",
+                 ticker, interval, len(strategy_runs))
+    try:
+        if isinstance(dados, Exception):
+            raise dados
+        df_historico = dados if dados is not None else buscar_dados(ticker, Config.DATA_PERIOD, interval)
+        # Precompute indicators once per dataset
+        df_historico = calcular_indicadores(df_historico)
+    except Exception as e:
+        logging.error("Error loading %s/%s: %s", ticker, interval, e)
+        return resultados
+
+    try:
+        # One batched ZigZag for every strategy of this interval
+        pivots_por_estrategia = calcular_zigzag_multiplo(
+            df_historico, [(params['depth'], params['deviation']) for _, _, params in strategy_runs])
+    except Exception as e:
+        logging.error("Error computing ZigZag for %s/%s: %s", ticker, interval, e)
+        return resultados
+
+    for (order_key, strategy_name, params), pivots_detectados in zip(strategy_runs, pivots_por_estrategia):
+        try:
+            logging.info("[%s] ZigZag depth=%s, deviation=%s%%: %d pivots",
+                         strategy_name, params['depth'], params['deviation'], len(pivots_detectados))
+
+            if len(pivots_detectados) < 4:
+                logging.info("Not enough pivots to form a pattern.")
+                continue
+
+            padroes = _detectar_padroes(
+                pivots_detectados, df_historico, wanted_patterns)
+            if not padroes:
+                logging.info(
+                    "No H&S or DT/DB patterns met the criteria or minimum score.")
+                continue
+
+            logging.info("Found %d H&S/DT/DB patterns passing rules and score.",
+                         len(padroes))
+            for padrao in padroes:
+                padrao['strategy'] = strategy_name
+                padrao['timeframe'] = interval
+                padrao['ticker'] = ticker
+                resultados.append((order_key, padrao))
+        except Exception as e:
+            logging.error("Error processing %s/%s on strategy %s: %s",
+                          ticker, interval, strategy_name, e)
+    return resultados
+
+
+# Config attributes that `main()` may override from the CLI and that worker
+# processes must mirror (spawned workers re-import the module with defaults)
+_WORKER_CONFIG_KEYS = ('DATA_PERIOD', 'OHLCV_CACHE_ENABLED', 'OHLCV_CACHE_DIR',
+                       'COINGECKO_REQUESTS_PER_MINUTE', 'FULL_HISTORY_SCAN')
+
+
+def _init_worker(rate_lock, rate_next_slot, config_overrides: Dict[str, Any]) -> None:
+    """Process-pool initializer: share the rate limit and mirror CLI config."""
+    global _RATE_LIMITER
+    for key, value in config_overrides.items():
+        setattr(Config, key, value)
+    # Never share sockets inherited from the parent process
+    reset_sessions()
+    _RATE_LIMITER = _RateLimiter(
+        getattr(Config, 'COINGECKO_REQUESTS_PER_MINUTE', 0), rate_lock, rate_next_slot,
+        burst=getattr(Config, 'COINGECKO_RATE_BURST', 1))
+    if not logging.getLogger().handlers:
+        logging.basicConfig(
+            level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def _executar_jobs_em_paralelo(
+    jobs: Dict[Tuple[str, str], List[Tuple[Tuple[int, int, int], str, Dict[str, Any]]]],
+    wanted_patterns: set,
+    workers: int,
+) -> List[Tuple[Tuple[int, int, int], Dict[str, Any]]]:
+    """Spread (ticker, interval) jobs over a process pool.
+
+    Network fetches stay under `Config.COINGECKO_REQUESTS_PER_MINUTE` across all
+    workers. Results come back in completion order; callers sort by order_key.
+    """
+    rate_lock = multiprocessing.Lock()
+    rate_next_slot = multiprocessing.Value('d', 0.0, lock=False)
+    config_overrides = {key: getattr(Config, key)
+                        for key in _WORKER_CONFIG_KEYS if hasattr(Config, key)}
+
+    resultados: List[Tuple[Tuple[int, int, int], Dict[str, Any]]] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(rate_lock, rate_next_slot, config_overrides)) as executor:
+        futures = {
+            executor.submit(_processar_ticker_intervalo, ticker, interval,
+                            strategy_runs, wanted_patterns): (ticker, interval)
+            for (ticker, interval), strategy_runs in jobs.items()
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            ticker, interval = futures[future]
+            try:
+                resultados.extend(future.result())
+            except Exception as e:
+                logging.error("Worker failed on %s/%s: %s", ticker, interval, e)
+            logging.info("Progress: %d/%d jobs done (%s/%s).",
+                         done, len(futures), ticker, interval)
+    return resultados
+
+
+# --- Live monitor (one closed candle at a time) ---
+
+def _chave_padrao(padrao: Dict[str, Any]) -> Tuple[Any, Any]:
+    """Dedup key of a pattern, as in `main()`: head for H&S, p5 for TT/TB, else p3."""
+    tipo = padrao.get('padrao_tipo')
+    if tipo in ('OCO', 'OCOI'):
+        return tipo, padrao.get('cabeca_idx')
+    if tipo in ('TT', 'TB'):
+        return tipo, padrao.get('p5_idx')
+    return tipo, padrao.get('p3_idx')
+
+
+def _valor_json(valor: Any) -> Any:
+    """JSON-friendly scalar (timestamps as ISO strings, NumPy scalars unwrapped)."""
+    if isinstance(valor, (pd.Timestamp, datetime)):
+        return valor.isoformat()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+def _barras_fechadas(df: pd.DataFrame, interval: str, agora: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """Drop the bars still forming at `agora` (UTC, tz-naive like `buscar_dados`)."""
+    if df.empty:
+        return df
+    agora = agora if agora is not None else pd.Timestamp.utcnow().tz_localize(None)
+    duracao = pd.tseries.frequencies.to_offset(_interval_to_pandas_freq(interval))
+    return df[df.index + duracao <= agora]
+
+
+class _EstadoMonitor:
+    """Live state of one (ticker, interval): enriched frame, incremental
+    indicators, and per strategy a ZigZag plus the keys already emitted.
+
+    Bars live in a preallocated buffer of `2 * janela` rows; `df` is a view of
+    its filled rows, so appending a bar copies one row and the frame's lookup
+    structures are extended rather than rebuilt. When the buffer fills up, the
+    last `janela` bars move to the front (amortized O(1) per bar), the ZigZags
+    are rebased and keys of patterns that left the window are forgotten.
+    """
+
+    def __init__(self, df: pd.DataFrame, params_por_estrategia: Dict[str, Dict[str, Any]],
+                 janela: Optional[int] = None):
+        enriquecido = calcular_indicadores(df.copy())
+        self.indicadores = IndicadoresIncrementais.a_partir_do_frame(enriquecido)
+        self.zigzags = {nome: ZigZagIncremental.a_partir_do_frame(enriquecido, p['depth'], p['deviation'])
+                        for nome, p in params_por_estrategia.items()}
+        self.emitidos: Dict[str, set] = {nome: set() for nome in params_por_estrategia}
+        self.janela = max(1, int(janela if janela is not None else getattr(Config, 'MONITOR_MAX_BARS', 5000)))
+        self._colunas = list(enriquecido.columns)
+        self._nome_indice = enriquecido.index.name
+        self._valores = np.empty((2 * self.janela, len(self._colunas)))
+        self._indice = np.empty(2 * self.janela, dtype=enriquecido.index.dtype)
+        inicio = max(0, len(enriquecido) - self.janela)
+        self._n = len(enriquecido) - inicio
+        self._valores[:self._n] = enriquecido.to_numpy(dtype=float)[inicio:]
+        self._indice[:self._n] = enriquecido.index.to_numpy()[inicio:]
+        for zigzag in self.zigzags.values():
+            zigzag.rebasear(inicio)
+        self.df = self._frame()
+
+    def anexar_barra(self, idx, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        """Append one closed bar to the frame, indicators and every ZigZag."""
+        if self._n == len(self._valores):
+            self._compactar()
+        linha = {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+        linha.update(self.indicadores.atualizar(high, low, close, volume))
+        self._valores[self._n] = [linha.get(coluna, float('nan')) for coluna in self._colunas]
+        self._indice[self._n] = idx
+        self._n += 1
+        anterior, self.df = self.df, self._frame()
+        if len(anterior) == self._n - 1:
+            _estender_artefatos(anterior, self.df)
+        for zigzag in self.zigzags.values():
+            zigzag.atualizar(idx, high, low)
+
+    def _frame(self) -> pd.DataFrame:
+        # Views of the buffer, no copy
+        index = pd.Index(self._indice[:self._n], name=self._nome_indice, copy=False)
+        return pd.DataFrame(self._valores[:self._n], index=index, columns=self._colunas, copy=False)
+
+    def _compactar(self) -> None:
+        """Keep the last `janela` bars at the front of the buffer."""
+        deslocamento = self._n - self.janela
+        self._valores[:self.janela] = self._valores[deslocamento:self._n]
+        self._indice[:self.janela] = self._indice[deslocamento:self._n]
+        self._n = self.janela
+        self.df = self._frame()
+        for zigzag in self.zigzags.values():
+            zigzag.rebasear(deslocamento)
+        primeiro = self.df.index[0]
+        for nome, chaves in self.emitidos.items():
+            self.emitidos[nome] = {chave for chave in chaves if chave[1] is None or chave[1] >= primeiro}
+
+
+class MonitorPadroes:
+    """Long-running pattern monitor on top of the batch validators.
+
+    Keeps per (ticker, interval) the enriched frame and incremental indicators,
+    and per strategy an incremental ZigZag and the patterns already emitted.
+    Each closed bar updates that state and re-runs the detectors on the recent
+    pivot windows; newly validated patterns (with `score_total` and `valid_*`
+    flags) go to a JSONL file and/or a callback, tagged with the processing
+    latency (`latencia_ms`) and the delay since the bar closed.
+    """
+
+    def __init__(self, strategies: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None,
+                 wanted_patterns: Optional[set] = None, sink_path: Optional[str] = None,
+                 callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 emitir_historico: bool = False):
+        self.strategies = strategies if strategies is not None else Config.ZIGZAG_STRATEGIES
+        self.wanted_patterns = wanted_patterns or {'ALL'}
+        self.sink_path = sink_path
+        self.callback = callback
+        self.emitir_historico = emitir_historico
+        self.estados: Dict[Tuple[str, str], _EstadoMonitor] = {}
+        # Processing latency (ms) of the last bars, bar received → signals emitted
+        self.latencias_ms: deque = deque(maxlen=1000)
+
+    def inicializar(self, ticker: str, interval: str, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Seed (ticker, interval) from closed historical bars.
+
+        Patterns already valid in the history are recorded as seen and only
+        emitted when `emitir_historico` is set.
+        """
+        params = {nome: cfg[interval] for nome, cfg in self.strategies.items() if interval in cfg}
+        estado = _EstadoMonitor(df, params)
+        self.estados[(ticker, interval)] = estado
+        padroes = self._avaliar(ticker, interval, estado)
+        if self.emitir_historico:
+            for padrao in padroes:
+                self._emitir(padrao)
+        return padroes
+
+    def processar_barra(self, ticker: str, interval: str, idx, open_: float, high: float, low: float,
+                        close: float, volume: float = float('nan')) -> List[Dict[str, Any]]:
+        """Feed one closed bar; return (and emit) the newly validated patterns."""
+        inicio = time.perf_counter()
+        estado = self.estados[(ticker, interval)]
+        if len(estado.df) and idx <= estado.df.index[-1]:
+            return []  # bar already seen
+        estado.anexar_barra(idx, float(open_), float(high), float(low), float(close), float(volume))
+        novos = self._avaliar(ticker, interval, estado)
+
+        latencia_ms = (time.perf_counter() - inicio) * 1000.0
+        self.latencias_ms.append(latencia_ms)
+        limite = getattr(Config, 'MONITOR_MAX_LATENCY_MS', 1000)
+        if latencia_ms > limite:
+            logging.warning("Monitor %s/%s: bar %s took %.1f ms (budget %d ms).",
+                            ticker, interval, idx, latencia_ms, limite)
+        fechamento = pd.Timestamp(idx) + pd.tseries.frequencies.to_offset(_interval_to_pandas_freq(interval))
+        atraso_s = (pd.Timestamp.utcnow().tz_localize(None) - fechamento).total_seconds()
+        for padrao in novos:
+            padrao['barra_idx'] = idx
+            padrao['latencia_ms'] = round(latencia_ms, 3)
+            padrao['atraso_desde_fechamento_s'] = round(atraso_s, 3)
+            self._emitir(padrao)
+        return novos
+
+    def _avaliar(self, ticker: str, interval: str, estado: _EstadoMonitor) -> List[Dict[str, Any]]:
+        """Run the detectors per strategy and keep only patterns not seen before."""
+        novos: List[Dict[str, Any]] = []
+        for nome, zigzag in estado.zigzags.items():
+            # Pivots kept from before the window (negative 'pos') are not in the frame
+            pivots = [pivo for pivo in zigzag.pivots() if pivo['pos'] >= 0]
+            if len(pivots) < 4:
+                continue
+            try:
+                padroes = _detectar_padroes(pivots, estado.df, self.wanted_patterns)
+            except Exception as e:
+                logging.error("Monitor %s/%s on strategy %s: %s", ticker, interval, nome, e)
+                continue
+            for padrao in padroes:
+                chave = _chave_padrao(padrao)
+                if chave in estado.emitidos[nome]:
+                    continue
+                estado.emitidos[nome].add(chave)
+                padrao['strategy'] = nome
+                padrao['timeframe'] = interval
+                padrao['ticker'] = ticker
+                novos.append(padrao)
+        return novos
+
+    def _emitir(self, padrao: Dict[str, Any]) -> None:
+        if self.sink_path:
+            os.makedirs(os.path.dirname(self.sink_path) or '.', exist_ok=True)
+            registro = {chave: _valor_json(valor) for chave, valor in padrao.items()
+                        if not chave.endswith('_obj')}
+            with open(self.sink_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+        if self.callback is not None:
+            try:
+                self.callback(padrao)
+            except Exception as e:
+                logging.error("Monitor callback failed: %s", e)
+        logging.info("Monitor signal: %s %s %s [%s] score=%s",
+                     padrao.get('ticker'), padrao.get('timeframe'), padrao.get('padrao_tipo'),
+                     padrao.get('strategy'), padrao.get('score_total'))
+
+    def executar(self, tickers: List[str], intervals_filter: Optional[set] = None,
+                 poll_seconds: Optional[float] = None, ciclos: Optional[int] = None) -> None:
+        """Poll CoinGecko and feed every newly closed bar (`ciclos=None` runs forever).
+
+        The detection delay is bounded by `poll_seconds` plus the processing
+        latency. The first poll downloads the full (uncached) history to seed
+        each series; later polls only download the tail since the last seen bar.
+        """
+        poll = poll_seconds if poll_seconds is not None else getattr(Config, 'MONITOR_POLL_SECONDS', 60)
+        series = list(_agrupar_jobs_por_ticker_intervalo(self.strategies, tickers, intervals_filter))
+        ciclo = 0
+        while ciclos is None or ciclo < ciclos:
+            inicio = time.monotonic()
+            for ticker, interval in series:
+                estado = self.estados.get((ticker, interval))
+                try:
+                    if estado is None:
+                        df = buscar_dados(ticker, Config.DATA_PERIOD, interval, usar_cache=False)
+                    else:
+                        df = buscar_dados_desde(ticker, interval, estado.df.index[-1])
+                    df = _barras_fechadas(df, interval)
+                except Exception as e:
+                    logging.error("Monitor download failed for %s/%s: %s", ticker, interval, e)
+                    continue
+                if estado is None:
+                    self.inicializar(ticker, interval, df)
+                    continue
+                ultimo = estado.df.index[-1]
+                for row in df[df.index > ultimo].itertuples():
+                    self.processar_barra(ticker, interval, row.Index, row.open, row.high, row.low,
+                                         row.close, getattr(row, 'volume', float('nan')))
+            ciclo += 1
+            if ciclos is not None and ciclo >= ciclos:
+                break
+            time.sleep(max(0.0, poll - (time.monotonic() - inicio)))
+
+
 def main():
     """Pipeline de geração: baixar dados, detectar padrões, salvar CSV final."""
     # Fix: configurar logging padrão (arquivo + console)
@@ -2099,6 +4155,13 @@ def main():
     if args.period:
         Config.DATA_PERIOD = args.period
 
+    if args.cache_dir:
+        Config.OHLCV_CACHE_DIR = args.cache_dir
+    if args.no_cache:
+        Config.OHLCV_CACHE_ENABLED = False
+    if args.full_history:
+        Config.FULL_HISTORY_SCAN = True
+
     intervals_filter = (
         {i.strip() for i in args.intervals.split(",") if i.strip()}
         if args.intervals
@@ -2117,88 +4180,41 @@ def main():
 
     wanted_patterns = {s.strip().upper() for s in args.patterns.split(",")}
 
+    if args.monitor:
+        sink_path = args.monitor_output or Config.MONITOR_OUTPUT_PATH
+        logging.info("--- STARTING LIVE MONITOR (signals → %s) ---", sink_path)
+        monitor = MonitorPadroes(strategies_dict, wanted_patterns, sink_path=sink_path)
+        monitor.executar(selected_tickers, intervals_filter, poll_seconds=args.poll_seconds)
+        return
+
     logging.info("--- STARTING GENERATION ENGINE (v20 - Strategies) ---")
     os.makedirs(os.path.dirname(final_csv_path)
                 or Config.OUTPUT_DIR, exist_ok=True)
 
-    todos_os_padroes_finais = []
-
-    for strategy_name, intervals_config in strategies_dict.items():
-        logging.info("===== STRATEGY: %s =====", strategy_name.upper())
-        for interval, params in intervals_config.items():
-            if intervals_filter and interval not in intervals_filter:
-                continue
-            for ticker in selected_tickers:
-                logging.info("--- Processing: %s | Interval: %s (Strategy: %s) ---",
-                             ticker, interval, strategy_name)
-                try:
-                    df_historico = buscar_dados(
-                        ticker, Config.DATA_PERIOD, interval)
-                    # Precompute indicators once per dataset
-                    df_historico = calcular_indicadores(df_historico)
-
-                    logging.info("Calculando ZigZag com depth=%s, deviation=%s%%...",
-                                 params['depth'], params['deviation'])
-                    pivots_detectados = calcular_zigzag_oficial(
-                        df_historico, params['depth'], params['deviation'])
-
-                    if len(pivots_detectados) < 4:
-                        logging.info("Not enough pivots to form a pattern.")
-                        continue
-
-                    todos_os_padroes_nesta_execucao: List[Dict[str, Any]] = []
-
-                    if ('ALL' in wanted_patterns or 'HNS' in wanted_patterns) and len(pivots_detectados) >= 7:
-                        logging.info(
-                            "Identifying H&S patterns with hard rules...")
-                        padroes_hns_encontrados = identificar_padroes_hns(
-                            pivots_detectados, df_historico)
-                        todos_os_padroes_nesta_execucao.extend(
-                            padroes_hns_encontrados)
-
-                    if 'ALL' in wanted_patterns or 'DTB' in wanted_patterns:
-                        padroes_dtb_encontrados = identificar_padroes_double_top_bottom(
-                            pivots_detectados, df_historico)
-                        todos_os_padroes_nesta_execucao.extend(
-                            padroes_dtb_encontrados)
-
-                    # Triple Top/Bottom integration (TT/TB)
-                    if 'ALL' in wanted_patterns or 'TTB' in wanted_patterns:
-                        logging.info(
-                            "Identifying Triple Top/Bottom (TT/TB) candidates...")
-                        candidatos_ttb = identificar_padroes_ttb(
-                            pivots_detectados)
-                        if candidatos_ttb:
-                            logging.info("Found %d TT/TB raw candidates. Validating...",
-                                         len(candidatos_ttb))
-                        for cand in candidatos_ttb:
-                            dados_ttb = validate_and_score_triple_pattern(
-                                cand, df_historico)
-                            if dados_ttb:
-                                # Enrich with metadata
-                                dados_ttb['strategy'] = strategy_name
-                                dados_ttb['timeframe'] = interval
-                                dados_ttb['ticker'] = ticker
-                                logging.info("TTB accepted %s with score=%s",
-                                             dados_ttb['padrao_tipo'], dados_ttb['score_total'])
-                                todos_os_padroes_nesta_execucao.append(
-                                    dados_ttb)
-
-                    if todos_os_padroes_nesta_execucao:
-                        logging.info("Found %d H&S/DT/DB patterns passing rules and score.",
-                                     len(todos_os_padroes_nesta_execucao))
-                        for padrao in todos_os_padroes_nesta_execucao:
-                            padrao['strategy'] = strategy_name
-                            padrao['timeframe'] = interval
-                            padrao['ticker'] = ticker
-                            todos_os_padroes_finais.append(padrao)
-                    else:
-                        logging.info(
-                            "No H&S or DT/DB patterns met the criteria or minimum score.")
-                except Exception as e:
-                    logging.error("Error processing %s/%s on strategy %s: %s",
-                                  ticker, interval, strategy_name, e)
-
+    jobs = _agrupar_jobs_por_ticker_intervalo(
+        strategies_dict, selected_tickers, intervals_filter)
+    logging.info("Scheduled %d (ticker, interval) jobs covering %d strategy runs.",
+                 len(jobs), sum(len(runs) for runs in jobs.values()))
+
+    workers = max(1, int(args.workers or 1))
+    resultados_ordenados: List[Tuple[Tuple[int, int, int], Dict[str, Any]]] = []
+    if workers > 1 and len(jobs) > 1:
+        logging.info("Running jobs on %d worker processes.", workers)
+        resultados_ordenados = _executar_jobs_em_paralelo(
+            jobs, wanted_patterns, workers)
+    else:
+        # Downloads run concurrently (rate limited) while series are processed here
+        for (ticker, interval), dados in baixar_series_concorrentes(list(jobs), Config.DATA_PERIOD):
+            resultados_ordenados.extend(_processar_ticker_intervalo(
+                ticker, interval, jobs[(ticker, interval)], wanted_patterns, dados))
+
+    # Restore the strategy → interval → ticker order so that de-duplication
+    # (keep='first') picks the same rows as the per-strategy loop did, whatever
+    # the order in which workers finished
+    resultados_ordenados.sort(key=lambda item: item[0])
+    todos_os_padroes_finais = [padrao for _, padrao in resultados_ordenados]
+
+    log_connection_stats(logging.getLogger())
     logging.info("--- Finished. Saving dataset... ---")
 
     if not todos_os_padroes_finais:
@@ -7,17 +7,27 @@ import tkinter as tk
 from tkinter import messagebox
 import pandas as pd
 import numpy as np
-import requests
 import mplfinance as mpf
 import pandas_ta as ta
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 import os
+import sys
 import time
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 load_dotenv()
 
+# Shared keep-alive HTTP sessions (src/tools/http_pool.py), imported as the src.tools
+# package when src/tools is not already on the import path
+try:
+    from http_pool import get_session
+except ImportError:
+    _RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+    if _RAIZ not in sys.path:
+        sys.path.insert(0, _RAIZ)
+    from src.tools.http_pool import get_session
+
 
 class Config:
     """Centralized configuration parameters for the GUI."""
@@ -160,7 +170,7 @@ def _interval_to_pandas_freq(interval: str) -> str:
 
 
 def _coingecko_request(endpoint_path: str, params: Dict[str, Any]) -> Dict[str, Any]:
-    """GET request to CoinGecko Pro using API key from env."""
+    """GET request to CoinGecko Pro using API key from env (pooled keep-alive session)."""
     api_key = os.getenv(Config.COINGECKO_API_KEY_ENV)
     if not api_key:
         raise RuntimeError(
@@ -171,7 +181,7 @@ def _coingecko_request(endpoint_path: str, params: Dict[str, Any]) -> Dict[str,
         'Accept': 'application/json',
         'User-Agent': 'pattern-gui/1.0'
     }
-    resp = requests.get(url, headers=headers, params=params, timeout=30)
+    resp = get_session().get(url, headers=headers, params=params, timeout=30)
     if resp.status_code != 200:
         raise ConnectionError(
             f"CoinGecko request failed {resp.status_code}: {resp.text[:200]}")
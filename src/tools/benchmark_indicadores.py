@@ -0,0 +1,65 @@
+# Arquivo: src/tools/benchmark_indicadores.py
+# Compara o motor NumPy de indicadores com o caminho pandas_ta em frames grandes.
+#   python src/tools/benchmark_indicadores.py --barras 100000 --repeticoes 5
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import src.patterns.OCOs.necklineconfirmada as nc  # noqa: E402
+
+
+def gerar_frame(barras: int, seed: int = 42) -> pd.DataFrame:
+    """Random-walk OHLCV frame with `barras` hourly bars."""
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, barras))
+    return pd.DataFrame({
+        'open': close + rng.normal(0.0, 0.2, barras),
+        'high': close + rng.random(barras),
+        'low': close - rng.random(barras),
+        'close': close,
+        'volume': rng.random(barras) * 1000.0,
+    }, index=pd.date_range('2015-01-01', periods=barras, freq='h'))
+
+
+def medir(funcao, df: pd.DataFrame, repeticoes: int) -> float:
+    """Best wall time (seconds) of `funcao` over `repeticoes` fresh copies of `df`."""
+    tempos = []
+    for _ in range(repeticoes):
+        copia = df.copy()
+        inicio = time.perf_counter()
+        funcao(copia)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do motor de indicadores')
+    parser.add_argument('--barras', type=int, default=100_000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    df = gerar_frame(args.barras)
+    ref = nc._calcular_indicadores_pandas_ta(df.copy())
+    novo = nc._calcular_indicadores_numpy(df.copy())
+    # Columns both engines produce (newer pandas_ta releases add extras, e.g. STOCHh)
+    colunas = [c for c in ref.columns if c not in df.columns and c in novo.columns]
+    erros = {c: float(np.nanmax(np.abs(ref[c].to_numpy(float) - novo[c].to_numpy(float))))
+             for c in colunas}
+    pior = max(erros, key=erros.get)
+
+    t_ta = medir(nc._calcular_indicadores_pandas_ta, df, args.repeticoes)
+    t_np = medir(nc._calcular_indicadores_numpy, df, args.repeticoes)
+    print(f"Barras: {args.barras}  colunas: {len(colunas)}  max |diff|: {erros[pior]:.3e} ({pior})")
+    print(f"pandas_ta: {t_ta * 1000:.1f} ms")
+    print(f"numpy:     {t_np * 1000:.1f} ms  (speedup {t_ta / t_np:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
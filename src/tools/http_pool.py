@@ -0,0 +1,182 @@
+# Arquivo: src/tools/http_pool.py
+# Sessões HTTP keep-alive compartilhadas pelos toolkits, pelo motor de padrões e pelo anotador.
+#   python src/tools/http_pool.py https://api.alternative.me/fng/ --repeticoes 5
+
+"""
+Shared HTTP connection pools
+============================
+
+Every HTTP caller in the repo goes through `get_session()` instead of the
+module-level `requests.get`, so repeated calls to the same host reuse a
+keep-alive TCP/TLS connection instead of paying a new handshake each time.
+
+- One `requests.Session` per retry profile, shared by all threads of the process.
+- Adapters are mounted per host, sized by `POOL_MAXSIZE_BY_HOST` (or `configure_host`).
+- `retry_status=True` sessions retry idempotent requests on 429/5xx (honouring
+  `Retry-After`); `retry_status=False` sessions only retry failed connects, for
+  callers that run their own rate-limited retry loop.
+- `connection_stats()` reports, per host, requests sent vs connections opened.
+- Every request is also reported to `tool_telemetry`, which attributes it to
+  the tool call (and analysis request) in progress, if any.
+"""
+
+import argparse
+import logging
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import tool_telemetry
+except ImportError:  # imported as src.tools.http_pool without src/tools on sys.path
+    from . import tool_telemetry
+
+# Connections kept alive per host when the host has no explicit entry
+DEFAULT_POOL_MAXSIZE = 10
+POOL_MAXSIZE_BY_HOST: Dict[str, int] = {
+    # The pattern engine downloads up to COINGECKO_MAX_CONCURRENT_REQUESTS series at once
+    'pro-api.coingecko.com': 16,
+    'api.coingecko.com': 16,
+}
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+
+_lock = threading.Lock()
+_sessions: Dict[bool, requests.Session] = {}
+_mounted_hosts: Dict[bool, set] = {}
+
+
+def _build_retry(retry_status: bool) -> Retry:
+    if retry_status:
+        return Retry(
+            total=RETRY_TOTAL, connect=RETRY_TOTAL, read=RETRY_TOTAL - 1, status=RETRY_TOTAL - 1,
+            status_forcelist=RETRY_STATUS_FORCELIST, allowed_methods=frozenset({'GET', 'HEAD'}),
+            backoff_factor=RETRY_BACKOFF_FACTOR, respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+    # Connect failures never reached the server, so retrying them is always safe
+    return Retry(total=RETRY_TOTAL, connect=RETRY_TOTAL, read=0, status=0, other=0,
+                 backoff_factor=RETRY_BACKOFF_FACTOR, raise_on_status=False)
+
+
+def _build_adapter(retry_status: bool, pool_maxsize: int) -> HTTPAdapter:
+    return HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize,
+                       max_retries=_build_retry(retry_status))
+
+
+def _mount_host(session: requests.Session, retry_status: bool, scheme: str, host: str) -> None:
+    """Mount a dedicated adapter for `scheme://host` sized by the per-host table."""
+    pool_maxsize = POOL_MAXSIZE_BY_HOST.get(host, DEFAULT_POOL_MAXSIZE)
+    session.mount(f"{scheme}://{host}/", _build_adapter(retry_status, pool_maxsize))
+    _mounted_hosts.setdefault(retry_status, set()).add((scheme, host))
+
+
+class _PooledSession(requests.Session):
+    """Session that lazily mounts a per-host adapter the first time a host is seen."""
+
+    def __init__(self, retry_status: bool):
+        super().__init__()
+        self._retry_status = retry_status
+        for scheme in ('https', 'http'):
+            self.mount(f"{scheme}://", _build_adapter(retry_status, DEFAULT_POOL_MAXSIZE))
+
+    def get_adapter(self, url: str) -> HTTPAdapter:
+        parts = urlsplit(url)
+        chave = (parts.scheme.lower(), parts.netloc.lower())
+        if parts.netloc and chave not in _mounted_hosts.get(self._retry_status, set()):
+            with _lock:
+                if chave not in _mounted_hosts.get(self._retry_status, set()):
+                    _mount_host(self, self._retry_status, *chave)
+        return super().get_adapter(url)
+
+    def request(self, method, url, *args, **kwargs):
+        tool_telemetry.count_http_request()
+        return super().request(method, url, *args, **kwargs)
+
+
+def get_session(retry_status: bool = True) -> requests.Session:
+    """Process-wide pooled session (thread-safe; one per retry profile)."""
+    session = _sessions.get(retry_status)
+    if session is None:
+        with _lock:
+            session = _sessions.get(retry_status)
+            if session is None:
+                session = _PooledSession(retry_status)
+                _sessions[retry_status] = session
+    return session
+
+
+def configure_host(host: str, pool_maxsize: int) -> None:
+    """Set the keep-alive pool size of `host`; already mounted adapters are replaced."""
+    with _lock:
+        POOL_MAXSIZE_BY_HOST[host.lower()] = int(pool_maxsize)
+        for retry_status, session in _sessions.items():
+            for scheme, mounted in list(_mounted_hosts.get(retry_status, set())):
+                if mounted == host.lower():
+                    _mount_host(session, retry_status, scheme, mounted)
+
+
+def connection_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-host requests sent, connections opened and reuse rate across all sessions.
+
+    Counters come from the urllib3 pools, so a request counts once per attempt
+    and `conexoes` is the number of TCP/TLS handshakes actually paid.
+    """
+    stats: Dict[str, Dict[str, Any]] = {}
+    with _lock:
+        adapters = [a for s in _sessions.values() for a in s.adapters.values()]
+    for adapter in adapters:
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+            entry = stats.setdefault(host, {'requisicoes': 0, 'conexoes': 0})
+            entry['requisicoes'] += pool.num_requests
+            entry['conexoes'] += pool.num_connections
+    for entry in stats.values():
+        entry['reutilizadas'] = max(0, entry['requisicoes'] - entry['conexoes'])
+        entry['taxa_reuso'] = round(entry['reutilizadas'] / entry['requisicoes'], 4) \
+            if entry['requisicoes'] else 0.0
+    return stats
+
+
+def log_connection_stats(logger: Optional[logging.Logger] = None) -> None:
+    """Log one line per host with the connection-reuse counters."""
+    logger = logger or logging.getLogger(__name__)
+    for host, entry in sorted(connection_stats().items()):
+        logger.info("HTTP pool %s: %d requests, %d connections, %d reused (%.0f%%).",
+                    host, entry['requisicoes'], entry['conexoes'], entry['reutilizadas'],
+                    100.0 * entry['taxa_reuso'])
+
+
+def reset_sessions() -> None:
+    """Close every pooled session (tests, forked workers)."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _mounted_hosts.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede o reuso de conexões do pool HTTP')
+    parser.add_argument('url')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    for _ in range(args.repeticoes):
+        resp = get_session().get(args.url, timeout=10)
+        print(f"{resp.status_code} {resp.elapsed.total_seconds() * 1000:.1f} ms")
+    for host, entry in connection_stats().items():
+        print(f"{host}: {entry}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+# Arquivo: src/tools/response_cache.py
+# Cache TTL de respostas das APIs (CoinGecko, Fear & Greed, CoinDesk) usado pelos toolkits.
+#   RESPONSE_CACHE_BACKEND=sqlite RESPONSE_CACHE_PATH=data/cache/respostas.sqlite python src/agente/app.py serve
+
+"""
+TTL response cache
+==================
+
+Market data, the Fear & Greed index and news change on minute-to-hour
+timescales, so toolkit responses are kept locally for a per-endpoint TTL.
+
+- `MemoryLRUBackend`: in-process LRU bounded by entry count (default).
+- `SQLiteBackend`: JSON rows in a SQLite file, shared across restarts and
+  processes, bounded by entry count (least recently used rows are evicted).
+- `ResponseCache`: resolves the TTL of (namespace, endpoint, params) from
+  `DEFAULT_TTL_RULES`, never stores API keys in cache keys, and keeps
+  hit/miss/store/eviction counters per namespace.
+
+`get_response_cache()` returns the process-wide instance configured from
+`RESPONSE_CACHE_BACKEND` (`memory` | `sqlite` | `off`), `RESPONSE_CACHE_PATH` and
+`RESPONSE_CACHE_MAX_ENTRIES`.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_SQLITE_PATH = os.path.join('data', 'cache', 'respostas.sqlite')
+# Query params that must never end up in a cache key (or on disk)
+SECRET_PARAMS = frozenset({'api_key', 'x_cg_pro_api_key', 'x-cg-pro-api-key'})
+
+# Sentinel returned by backends and `ResponseCache.get` when nothing fresh is cached
+MISS = object()
+
+TTLRule = Union[float, Callable[[Dict[str, Any]], float]]
+
+
+def _market_chart_ttl(params: Dict[str, Any]) -> float:
+    """TTL by CoinGecko granularity: 5-minute (<=1 day), hourly (<=90 days) or daily points."""
+    days = str(params.get('days', '1')).lower()
+    if str(params.get('interval', '')).lower() == 'daily' or days == 'max':
+        return 3600.0
+    try:
+        dias = float(days)
+    except ValueError:
+        return 300.0
+    if dias <= 1:
+        return 60.0
+    if dias <= 90:
+        return 300.0
+    return 3600.0
+
+
+# (endpoint regex, TTL seconds or callable(params) -> seconds); first match wins, no match = not cached
+DEFAULT_TTL_RULES: Dict[str, List[Tuple[str, TTLRule]]] = {
+    'coingecko': [
+        (r'^coins/list$', 86400.0),
+        (r'^search/trending$', 600.0),
+        (r'^coins/markets$', 60.0),
+        (r'^coins/[^/]+/market_chart$', _market_chart_ttl),
+        (r'^coins/[^/]+/ohlc$', _market_chart_ttl),
+        (r'^coins/[^/]+/history$', 86400.0),
+        (r'^coins/[^/]+$', 300.0),
+    ],
+    'fear_greed': [
+        # The index is published once a day; an hour keeps intraday reads fresh enough
+        (r'^/fng/$', 3600.0),
+    ],
+    'coindesk': [
+        (r'^news/v1/article/list$', 300.0),
+    ],
+}
+
+
+class MemoryLRUBackend:
+    """In-process LRU of (expires_at, value), bounded by `max_entries`."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(1, int(max_entries))
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, now: float) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return MISS
+            if item[0] <= now:
+                del self._data[key]
+                return MISS
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value: Any, expires_at: float) -> int:
+        """Store and return how many entries were evicted to stay within bounds."""
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            evicted = 0
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """SQLite table of JSON values with expiry and last-access columns, bounded by `max_entries`."""
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS respostas ("
+            " chave TEXT PRIMARY KEY, valor TEXT NOT NULL,"
+            " expira_em REAL NOT NULL, acesso_em REAL NOT NULL)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_respostas_acesso ON respostas (acesso_em)")
+
+    def get(self, key: str, now: float) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT valor, expira_em FROM respostas WHERE chave = ?", (key,)).fetchone()
+            if row is None:
+                return MISS
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM respostas WHERE chave = ?", (key,))
+                return MISS
+            self._conn.execute(
+                "UPDATE respostas SET acesso_em = ? WHERE chave = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, expires_at: float) -> int:
+        valor = json.dumps(value, separators=(',', ':'))
+        agora = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO respostas (chave, valor, expira_em, acesso_em) VALUES (?, ?, ?, ?)",
+                (key, valor, expires_at, agora))
+            total = self._conn.execute("SELECT COUNT(*) FROM respostas").fetchone()[0]
+            excesso = total - self.max_entries
+            if excesso <= 0:
+                return 0
+            # Expired rows go first, then the least recently used
+            self._conn.execute(
+                "DELETE FROM respostas WHERE chave IN ("
+                " SELECT chave FROM respostas ORDER BY expira_em > ?, acesso_em LIMIT ?)",
+                (agora, excesso))
+            return excesso
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM respostas")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM respostas").fetchone()[0]
+
+
+class ResponseCache:
+    """Per-endpoint TTL cache in front of a backend, with counters per namespace."""
+
+    MISS = MISS
+
+    def __init__(self, backend=None, ttl_rules: Optional[Dict[str, List[Tuple[str, TTLRule]]]] = None):
+        self.backend = backend if backend is not None else MemoryLRUBackend()
+        rules = ttl_rules if ttl_rules is not None else DEFAULT_TTL_RULES
+        self._rules = {ns: [(re.compile(pat), ttl) for pat, ttl in lst] for ns, lst in rules.items()}
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Counter] = {}
+
+    @staticmethod
+    def make_key(namespace: str, endpoint: str, params: Optional[Dict[str, Any]]) -> str:
+        limpos = sorted((str(k), str(v)) for k, v in (params or {}).items()
+                        if str(k).lower() not in SECRET_PARAMS)
+        return json.dumps([namespace, endpoint, limpos], separators=(',', ':'))
+
+    def ttl_for(self, namespace: str, endpoint: str, params: Optional[Dict[str, Any]]) -> float:
+        """TTL in seconds for this request; 0 means the response is not cached."""
+        for padrao, ttl in self._rules.get(namespace, ()):
+            if padrao.search(endpoint):
+                return float(ttl(params or {}) if callable(ttl) else ttl)
+        return 0.0
+
+    def _count(self, namespace: str, campo: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters.setdefault(namespace, Counter())[campo] += n
+
+    def get(self, namespace: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Cached value or `MISS`; requests without a TTL rule are not counted."""
+        if self.ttl_for(namespace, endpoint, params) <= 0:
+            return MISS
+        valor = self.backend.get(self.make_key(namespace, endpoint, params), time.time())
+        self._count(namespace, 'misses' if valor is MISS else 'hits')
+        return valor
+
+    def store(self, namespace: str, endpoint: str, params: Optional[Dict[str, Any]], value: Any) -> Any:
+        """Store `value` under the endpoint TTL (no-op without a rule) and return it."""
+        ttl = self.ttl_for(namespace, endpoint, params)
+        if ttl > 0:
+            evicted = self.backend.set(self.make_key(namespace, endpoint, params), value, time.time() + ttl)
+            self._count(namespace, 'stores')
+            if evicted:
+                self._count(namespace, 'evictions', evicted)
+        return value
+
+    def get_or_fetch(self, namespace: str, endpoint: str, params: Optional[Dict[str, Any]],
+                     fetch: Callable[[], Any]) -> Any:
+        """Serve from cache or call `fetch()` and store its result; exceptions are not cached."""
+        valor = self.get(namespace, endpoint, params)
+        if valor is not MISS:
+            return valor
+        return self.store(namespace, endpoint, params, fetch())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {}
+            for ns, c in self._counters.items():
+                consultas = c['hits'] + c['misses']
+                out[ns] = {'hits': c['hits'], 'misses': c['misses'], 'stores': c['stores'],
+                           'evictions': c['evictions'],
+                           'hit_rate': round(c['hits'] / consultas, 4) if consultas else 0.0}
+        out['entries'] = len(self.backend)
+        out['backend'] = type(self.backend).__name__
+        return out
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._lock:
+            self._counters.clear()
+
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_built = False
+_shared_lock = threading.Lock()
+
+
+def build_cache_from_env() -> Optional[ResponseCache]:
+    """ResponseCache for `RESPONSE_CACHE_BACKEND` (`memory` default, `sqlite`, `off`)."""
+    backend = os.getenv('RESPONSE_CACHE_BACKEND', 'memory').lower()
+    max_entries = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+    if backend in ('off', 'none', '0'):
+        return None
+    if backend == 'sqlite':
+        return ResponseCache(SQLiteBackend(os.getenv('RESPONSE_CACHE_PATH', DEFAULT_SQLITE_PATH), max_entries))
+    return ResponseCache(MemoryLRUBackend(max_entries))
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide cache shared by the toolkits (None when disabled)."""
+    global _shared_cache, _shared_built
+    if not _shared_built:
+        with _shared_lock:
+            if not _shared_built:
+                _shared_cache = build_cache_from_env()
+                _shared_built = True
+    return _shared_cache
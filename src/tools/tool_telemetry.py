@@ -0,0 +1,152 @@
+# Arquivo: src/tools/tool_telemetry.py
+# Telemetria estruturada das chamadas de ferramentas dos toolkits, coletada por requisição.
+#   with collect(request_id) as coletor: agent.run(...); coletor.summary()
+
+"""
+Tool-call telemetry
+===================
+
+Every public toolkit method is wrapped with `@instrumented_tool`, which records
+one `ToolCall` (toolkit, function, args hash, duration, size of the returned
+payload, upstream HTTP requests, error) into the collector of the current
+request instead of scraping debug prints from stdout.
+
+- `collect()` opens a `ToolCallCollector` bound to a `contextvars.ContextVar`,
+  so concurrent analyses on different threads (or tasks) never see each other's
+  calls. Outside `collect()` the wrapper is a plain pass-through.
+- `count_http_request()` is called by the pooled HTTP session for every request
+  it sends; the count is attributed to the innermost tool call in progress.
+- Recording is O(1) per call: no stdout capture, no regex scan, no payload copy
+  (`bytes_returned` is `len()` of the returned str/bytes).
+
+Threads started inside a tool call only report HTTP requests when they run in a
+copy of the caller's context (`contextvars.copy_context().run`).
+"""
+
+import contextvars
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_COLLECTOR: contextvars.ContextVar = contextvars.ContextVar('tool_call_collector', default=None)
+# Mutable [http_count] cell of the innermost tool call running in this context
+_CURRENT_CALL: contextvars.ContextVar = contextvars.ContextVar('tool_call_http_cell', default=None)
+
+
+@dataclass
+class ToolCall:
+    toolkit: str
+    function: str
+    args_hash: str
+    duration_ms: float
+    bytes_returned: int
+    http_requests: int
+    error: Optional[str] = None
+
+
+def args_hash(args: tuple, kwargs: Dict[str, Any]) -> str:
+    """Short stable hash of the call arguments (tells repeated identical calls apart)."""
+    chave = repr((args, sorted(kwargs.items())))
+    return hashlib.blake2b(chave.encode('utf-8', 'replace'), digest_size=6).hexdigest()
+
+
+class ToolCallCollector:
+    """Calls recorded for one request, with running per-toolkit/per-function counts."""
+
+    def __init__(self, request_id: Optional[str] = None,
+                 on_call: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.request_id = request_id
+        # Listener notified with each recorded call as a dict (e.g. to stream progress)
+        self.on_call = on_call
+        self.calls: List[ToolCall] = []
+        self.http_requests = 0
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, call: ToolCall) -> None:
+        with self._lock:
+            self.calls.append(call)
+            funcoes = self._counts.setdefault(call.toolkit, {})
+            funcoes[call.function] = funcoes.get(call.function, 0) + 1
+        if self.on_call is not None:
+            self.on_call(asdict(call))
+
+    def add_http(self, cell: Optional[list]) -> None:
+        with self._lock:
+            self.http_requests += 1
+            if cell is not None:
+                cell[0] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """`api_calls_summary` shape (total_calls/tools) plus per-call details."""
+        with self._lock:
+            tools = {nome: {"functions": dict(funcoes), "total_calls": sum(funcoes.values())}
+                     for nome, funcoes in self._counts.items()}
+            calls = [asdict(c) for c in self.calls]
+            http_total = self.http_requests
+        return {
+            "total_calls": len(calls),
+            "tools": tools,
+            "upstream_http_requests": http_total,
+            "tool_time_ms": round(sum(c["duration_ms"] for c in calls), 1),
+            "calls": calls,
+        }
+
+
+@contextmanager
+def collect(request_id: Optional[str] = None, *,
+            collector: Optional[ToolCallCollector] = None,
+            on_call: Optional[Callable[[Dict[str, Any]], None]] = None) -> Iterator[ToolCallCollector]:
+    """Bind a fresh collector (or re-bind `collector`) to the current context for the block."""
+    collector = collector if collector is not None else ToolCallCollector(request_id, on_call)
+    token = _COLLECTOR.set(collector)
+    try:
+        yield collector
+    finally:
+        _COLLECTOR.reset(token)
+
+
+def current_collector() -> Optional[ToolCallCollector]:
+    return _COLLECTOR.get()
+
+
+def count_http_request() -> None:
+    """Attribute one upstream HTTP request to the current request/tool call (no-op outside `collect`)."""
+    collector = _COLLECTOR.get()
+    if collector is not None:
+        collector.add_http(_CURRENT_CALL.get())
+
+
+def instrumented_tool(func: Callable) -> Callable:
+    """Decorator for toolkit methods: record the call into the active collector."""
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        collector = _COLLECTOR.get()
+        if collector is None:
+            return func(self, *args, **kwargs)
+        cell = [0]
+        token = _CURRENT_CALL.set(cell)
+        inicio = time.perf_counter()
+        erro = None
+        resultado = None
+        try:
+            resultado = func(self, *args, **kwargs)
+            return resultado
+        except Exception as exc:
+            erro = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            _CURRENT_CALL.reset(token)
+            tamanho = len(resultado) if isinstance(resultado, (str, bytes)) else 0
+            collector.record(ToolCall(
+                toolkit=type(self).__name__, function=func.__name__,
+                args_hash=args_hash(args, kwargs),
+                duration_ms=round((time.perf_counter() - inicio) * 1000.0, 2),
+                bytes_returned=tamanho, http_requests=cell[0], error=erro))
+
+    return wrapper
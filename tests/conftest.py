@@ -0,0 +1,88 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+# Same import path as the API, which runs with src/agente as its script directory
+_AGENTE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'agente'))
+if _AGENTE_DIR not in sys.path:
+    sys.path.append(_AGENTE_DIR)
+
+import _paths  # noqa: E402,F401  (src/tools on the import path)
+
+
+class _RespostaHttp:
+    """Stand-in for requests.Response with a fixed JSON payload."""
+
+    def __init__(self, payload=None, status_code=200, headers=None):
+        self._payload = {} if payload is None else payload
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = str(self._payload)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f'{self.status_code} Error')
+
+    def json(self):
+        return self._payload
+
+
+class _SessaoHttp:
+    """
+    Stand-in for the pooled requests.Session: every `get` is recorded in `chamadas`
+    as (url, params) and answered from `resposta` - a payload, an exception to
+    raise, or a callable returning a response - after `atraso` seconds.
+    """
+
+    def __init__(self, resposta=None, atraso=0.0):
+        self.resposta = resposta
+        self.atraso = atraso
+        self.chamadas = []
+        self._lock = threading.Lock()
+
+    def get(self, url=None, params=None, **kwargs):
+        with self._lock:
+            self.chamadas.append((url, dict(params or {})))
+        time.sleep(self.atraso)
+        if isinstance(self.resposta, Exception):
+            raise self.resposta
+        if callable(self.resposta):
+            return self.resposta()
+        return _RespostaHttp(self.resposta)
+
+
+def _ohlcv_aleatorio(n, seed=11, inicio='2024-01-01'):
+    """Hourly OHLCV random walk (log-returns with 1% volatility)."""
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'open': close,
+        'high': close * (1 + rng.random(n) * 0.005),
+        'low': close * (1 - rng.random(n) * 0.005),
+        'close': close,
+        'volume': rng.random(n) * 1000,
+    }, index=pd.date_range(inicio, periods=n, freq='H'))
+
+
+@pytest.fixture
+def resposta_http():
+    """Fake HTTP response class: resposta_http(payload, status_code=200, headers=None)."""
+    return _RespostaHttp
+
+
+@pytest.fixture
+def sessao_http():
+    """Fake session class: sessao_http(resposta, atraso=0.0)."""
+    return _SessaoHttp
+
+
+@pytest.fixture
+def ohlcv_aleatorio():
+    """Random OHLCV frame factory: ohlcv_aleatorio(n, seed=11, inicio='2024-01-01')."""
+    return _ohlcv_aleatorio
@@ -0,0 +1,215 @@
+import threading
+
+import pytest
+
+from src.agente.analysisCache import AnalysisCache, analysis_cache_from_env
+from src.agente.analysisWorkers import AnalysisPool, InMemoryJobStore, JobManager
+
+
+class _Relogio:
+    def __init__(self):
+        self.agora = 1_000_000.0
+
+    def __call__(self):
+        return self.agora
+
+
+class _Analise:
+    def __init__(self):
+        self.chamadas = []
+        self.falhar = False
+        self.liberar = None
+        self._lock = threading.Lock()
+
+    def __call__(self, coin_id, **params):
+        with self._lock:
+            self.chamadas.append((coin_id, params.get('vs_currency'), params.get('term_type')))
+            n = len(self.chamadas)
+        emitir = params.get('on_event') or (lambda evento, dados: None)
+        emitir('started', {'n': n})
+        if self.liberar is not None:
+            self.liberar.wait(5)
+        emitir('thoughts', {'n': n})
+        if self.falhar:
+            return {'ok': False, 'data': {}, 'errors': ['boom'], 'meta': {}}
+        return {'ok': True, 'data': {'versao': n}, 'errors': [], 'meta': {'request_id': f'r{n}'}}
+
+
+@pytest.fixture
+def pool():
+    p = AnalysisPool(max_workers=2, max_queue=2)
+    yield p
+    p.shutdown(wait=True)
+
+
+def _cache(analise, relogio, pool=None, **kwargs):
+    return AnalysisCache(analise, submit=pool.try_submit if pool else None,
+                         ttl_by_term={'short': 300, 'medium': 900, 'long': 3600},
+                         stale_seconds=600, clock=relogio, **kwargs)
+
+
+def test_fresh_hits_within_the_term_window():
+    analise, relogio = _Analise(), _Relogio()
+    cache = _cache(analise, relogio)
+
+    assert cache.lookup('bitcoin', 'usd', 'short') is None
+    primeira = cache.compute('bitcoin', vs_currency='usd', term_type='short')
+    assert primeira['meta']['cache']['status'] == 'miss'
+
+    relogio.agora += 299
+    hit = cache.run('BITCOIN', vs_currency='USD', term_type='short')
+    assert hit['data'] == {'versao': 1}
+    assert hit['meta'] == {'request_id': 'r1', 'cache': {'status': 'fresh', 'age_seconds': 299.0,
+                                                         'refreshing': False}}
+    assert len(analise.chamadas) == 1
+    # Different term type (and unknown term -> short) are separate keys
+    assert cache.lookup('bitcoin', 'usd', 'long') is None
+    assert cache.lookup('bitcoin', 'usd', 'weird')['data'] == {'versao': 1}
+
+
+def test_stale_hit_answers_immediately_and_refreshes_once_in_background(pool):
+    analise, relogio = _Analise(), _Relogio()
+    cache = _cache(analise, relogio, pool)
+    cache.compute('ethereum', vs_currency='usd', term_type='short')
+
+    analise.liberar = threading.Event()
+    relogio.agora += 301
+    stale = [cache.lookup('ethereum', 'usd', 'short') for _ in range(3)]
+    analise.liberar.set()
+    assert all(s['data'] == {'versao': 1} and s['meta']['cache']['status'] == 'stale' for s in stale)
+    assert all(s['meta']['cache']['refreshing'] for s in stale)
+
+    pool.shutdown(wait=True)
+    assert len(analise.chamadas) == 2  # one refresh for three stale hits
+    novo = cache.lookup('ethereum', 'usd', 'short')
+    assert novo['data'] == {'versao': 2} and novo['meta']['cache']['status'] == 'fresh'
+    assert cache.stats()['refreshes'] == 1 and cache.stats()['refreshing'] == 0
+
+
+def test_concurrent_misses_share_one_analysis(pool):
+    analise, relogio = _Analise(), _Relogio()
+    cache = _cache(analise, relogio, pool)
+    analise.liberar = threading.Event()
+    respostas = []
+
+    def pedir():
+        respostas.append(cache.run('cardano', vs_currency='usd', term_type='medium'))
+
+    threads = [threading.Thread(target=pedir) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for _ in range(500):
+        if cache.stats()['coalesced'] == 4:
+            break
+        threading.Event().wait(0.01)
+    assert cache.stats()['computing'] == 1
+    # A stale-refresh of the same key joins the running analysis as well
+    assert cache.refresh('cardano', 'usd', 'medium') is True
+    analise.liberar.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(analise.chamadas) == 1
+    assert [r['data'] for r in respostas] == [{'versao': 1}] * 5
+    assert all(r['meta']['cache']['status'] == 'miss' for r in respostas)
+    stats = cache.stats()
+    assert stats['coalesced'] == 4 and stats['computing'] == 0 and stats['refreshes'] == 0
+    assert cache.lookup('cardano', 'usd', 'medium')['meta']['cache']['status'] == 'fresh'
+
+
+def test_joined_requests_take_no_worker_and_get_the_events():
+    analise, relogio = _Analise(), _Relogio()
+    pool = AnalysisPool(max_workers=2, max_queue=0)
+    cache = _cache(analise, relogio, pool)
+    analise.liberar = threading.Event()
+    lider, seguidor = [], []
+
+    futuro = pool.try_submit(cache.compute, 'bitcoin', vs_currency='usd', term_type='short',
+                             on_event=lambda *e: lider.append(e))
+    for _ in range(500):
+        if lider:
+            break
+        threading.Event().wait(0.01)
+    assert cache.join('ethereum', 'usd', 'short') is None
+    juntado = cache.join('BITCOIN', 'usd', 'short', on_event=lambda *e: seguidor.append(e))
+    assert seguidor == [('started', {'n': 1})]  # events emitted before joining are replayed
+    jobs = JobManager(pool, InMemoryJobStore(), cache.run, join=cache.join)
+    job = jobs.submit({'coin_id': 'bitcoin', 'vs_currency': 'usd', 'term_type': 'short'})
+    outro = pool.try_submit(cache.compute, 'ethereum', vs_currency='usd', term_type='short')
+    assert outro is not None and pool.stats()['running'] + pool.stats()['queued'] == 2
+    analise.liberar.set()
+
+    resposta = juntado.result(timeout=5)
+    assert resposta == futuro.result(timeout=5)
+    assert resposta['data'] == {'versao': 1} and resposta['meta']['cache']['status'] == 'miss'
+    assert seguidor == lider == [('started', {'n': 1}), ('thoughts', {'n': 1})]
+    outro.result(timeout=5)
+    pool.shutdown(wait=True)
+    assert len(analise.chamadas) == 2  # bitcoin once, ethereum once
+    assert cache.stats()['coalesced'] == 2
+    assert jobs.get(job['job_id'])['status'] == 'succeeded'
+    assert jobs.get(job['job_id'])['result']['data'] == {'versao': 1}
+
+
+def test_expired_entries_and_failures_are_not_served():
+    analise, relogio = _Analise(), _Relogio()
+    cache = _cache(analise, relogio)
+    cache.compute('solana', vs_currency='usd', term_type='short')
+
+    relogio.agora += 300 + 600 + 1
+    assert cache.lookup('solana', 'usd', 'short') is None
+
+    analise.falhar = True
+    resposta = cache.run('solana', vs_currency='usd', term_type='short')
+    assert resposta['ok'] is False and 'cache' not in resposta['meta']
+    assert cache.lookup('solana', 'usd', 'short') is None
+
+
+def test_saturated_pool_skips_refresh_and_keeps_stale_entry(pool):
+    analise, relogio = _Analise(), _Relogio()
+    cache = _cache(analise, relogio, pool)
+    cache.compute('bitcoin', vs_currency='usd', term_type='short')
+
+    liberar = threading.Event()
+    ocupados = [pool.try_submit(liberar.wait, 5) for _ in range(4)]
+    relogio.agora += 400
+    stale = cache.lookup('bitcoin', 'usd', 'short')
+    liberar.set()
+    for f in ocupados:
+        f.result(timeout=5)
+
+    assert stale['meta']['cache'] == {'status': 'stale', 'age_seconds': 400.0, 'refreshing': False}
+    assert cache.stats()['refresh_skipped'] == 1
+    assert len(analise.chamadas) == 1
+
+
+def test_lru_eviction_and_sqlite_persistence(tmp_path):
+    analise, relogio = _Analise(), _Relogio()
+    caminho = str(tmp_path / 'analises.sqlite')
+    cache = _cache(analise, relogio, max_entries=2, path=caminho)
+    for moeda in ('bitcoin', 'ethereum'):
+        cache.compute(moeda, vs_currency='usd', term_type='long')
+    cache.lookup('bitcoin', 'usd', 'long')  # ethereum becomes least recently used
+    cache.compute('solana', vs_currency='usd', term_type='long')
+
+    assert cache.lookup('ethereum', 'usd', 'long') is None
+    assert cache.stats()['evictions'] == 1
+
+    relogio.agora += 60
+    reaberto = _cache(analise, relogio, max_entries=2, path=caminho)
+    assert reaberto.stats()['entries'] == 2
+    hit = reaberto.lookup('solana', 'usd', 'long')
+    assert hit['data'] == {'versao': 3} and hit['meta']['cache']['age_seconds'] == 60.0
+    assert reaberto.lookup('ethereum', 'usd', 'long') is None
+
+
+def test_cache_from_env(monkeypatch):
+    monkeypatch.setenv('ANALYSIS_CACHE_ENABLED', 'false')
+    assert analysis_cache_from_env(_Analise()) is None
+    monkeypatch.setenv('ANALYSIS_CACHE_ENABLED', 'true')
+    monkeypatch.setenv('ANALYSIS_CACHE_TTL_SHORT', '120')
+    monkeypatch.delenv('ANALYSIS_CACHE_PATH', raising=False)
+    cache = analysis_cache_from_env(_Analise())
+    stats = cache.stats()
+    assert stats['ttl_by_term'] == {'short': 120.0, 'medium': 900.0, 'long': 3600.0}
+    assert stats['persistent'] is False and stats['max_entries'] == 256
@@ -0,0 +1,141 @@
+import threading
+import time
+
+import tool_telemetry
+from src.agente.analysisPrefetch import AnalysisPrefetcher, prefetcher_from_env
+
+
+class _CoinGeckoFalso:
+    def __init__(self, atraso):
+        self.atraso = atraso
+        self.chamadas = []
+
+    @tool_telemetry.instrumented_tool
+    def fetch_market_data(self, coin_id, vs_currency='usd'):
+        time.sleep(self.atraso)
+        self.chamadas.append(('market', coin_id, vs_currency))
+        return {'coin_id': coin_id, 'vs_currency': vs_currency, 'price': 1.0}
+
+    def format_market_data(self, valores):
+        return f"price of {valores['coin_id']} in {valores['vs_currency']}"
+
+    @tool_telemetry.instrumented_tool
+    def perform_technical_analysis(self, coin_id, vs_currency='usd', days='90'):
+        time.sleep(self.atraso)
+        self.chamadas.append(('ta', coin_id, days))
+        return f'ta {days}d'
+
+    @tool_telemetry.instrumented_tool
+    def calculate_deterministic_technical_signal(self, coin_id, vs_currency='usd', days='90'):
+        time.sleep(self.atraso)
+        return '{"technical_signal": "hold"}'
+
+
+class _FearGreedFalso:
+    def __init__(self, atraso, erro=None):
+        self.atraso = atraso
+        self.erro = erro
+
+    def fetch_fear_greed_data(self):
+        time.sleep(self.atraso)
+        if self.erro:
+            raise self.erro
+        return {'value': 42, 'classification': 'Fear'}
+
+    def format_fear_greed(self, valores):
+        return f"Fear and Greed: {valores['value']}"
+
+
+class _CoinDeskFalso:
+    def __init__(self, atraso, liberar=None):
+        self.atraso = atraso
+        self.liberar = liberar
+
+    def get_latest_articles(self, limit=15, category=None):
+        if self.liberar is not None:
+            self.liberar.wait(5)
+        time.sleep(self.atraso)
+        return 'x' * 50
+
+
+class _PatternsFalso:
+    def __init__(self, atraso):
+        self.atraso = atraso
+
+    def detect_patterns(self, coin_id, vs_currency='usd', term_type='short', save_csv=False):
+        time.sleep(self.atraso)
+        return '{"ok": true, "found_count": 0, "sample": []}'
+
+
+def _prefetcher(atraso=0.2, fear_greed=None, coindesk=None):
+    return AnalysisPrefetcher(_CoinGeckoFalso(atraso), fear_greed or _FearGreedFalso(atraso),
+                              coindesk or _CoinDeskFalso(atraso), _PatternsFalso(atraso), max_workers=6)
+
+
+def test_sources_run_concurrently_and_feed_the_prompt():
+    prefetcher = _prefetcher(atraso=0.2)
+    inicio = time.perf_counter()
+    handle = prefetcher.start('bitcoin', 'usd', 'medium')
+    resultados = handle.wait(timeout=5)
+    decorrido = time.perf_counter() - inicio
+
+    assert set(resultados) == {'market_data', 'technical_analysis', 'technical_signal',
+                               'fear_greed', 'news', 'patterns'}
+    assert decorrido < 0.6  # sequential would be 6 x 0.2s
+    stats = handle.stats()
+    assert stats['completed'] == 6 and stats['failed'] == 0 and stats['late'] == 0
+    assert stats['sum_seconds'] >= 1.0
+    assert handle.get('technical_analysis') == 'ta 90d'
+    assert handle.get('market_data') == 'price of bitcoin in usd'
+    assert resultados['market_data'].data['price'] == 1.0
+    assert resultados['fear_greed'].data == {'value': 42, 'classification': 'Fear'}
+    assert resultados['patterns'].data == {'ok': True, 'found_count': 0, 'sample': []}
+    assert resultados['news'].data is None
+
+    contexto = handle.as_prompt_context(max_chars=20)
+    assert contexto.startswith('PREFETCHED TOOL RESULTS')
+    assert "### CoinGeckoToolKit.get_market_data(coin_id='bitcoin', vs_currency='usd')" in contexto
+    assert "perform_technical_analysis(coin_id='bitcoin', vs_currency='usd', days='90')" in contexto
+    assert 'x' * 20 + '\n... (truncated' in contexto
+    prefetcher.shutdown()
+
+
+def test_failed_and_late_sources_are_left_to_the_agent():
+    liberar = threading.Event()
+    prefetcher = _prefetcher(atraso=0.0, fear_greed=_FearGreedFalso(0.0, erro=RuntimeError('API down')),
+                             coindesk=_CoinDeskFalso(0.0, liberar=liberar))
+    handle = prefetcher.start('ethereum', 'eur', 'short')
+    resultados = handle.wait(timeout=0.5)
+    liberar.set()
+
+    assert 'news' not in resultados
+    assert resultados['fear_greed'].error == 'API down'
+    assert handle.get('fear_greed') is None
+    stats = handle.stats()
+    assert stats == {**stats, 'completed': 4, 'failed': 1, 'late': 1}
+    contexto = handle.as_prompt_context()
+    assert 'FearGreedToolKit' not in contexto and 'CoinDeskToolKit' not in contexto
+    assert "days='30'" in contexto
+    prefetcher.shutdown()
+
+
+def test_prefetch_calls_are_recorded_in_the_request_collector():
+    prefetcher = _prefetcher(atraso=0.0)
+    with tool_telemetry.collect('req') as coletor:
+        handle = prefetcher.start('solana', 'usd', 'long')
+    handle.wait(timeout=5)
+
+    resumo = coletor.summary()
+    assert resumo['tools']['_CoinGeckoFalso']['functions'] == {
+        'fetch_market_data': 1, 'perform_technical_analysis': 1,
+        'calculate_deterministic_technical_signal': 1}
+    prefetcher.shutdown()
+
+
+def test_prefetcher_from_env(monkeypatch):
+    monkeypatch.setenv('PREFETCH_ENABLED', 'false')
+    assert prefetcher_from_env(None, None, None, None) is None
+    monkeypatch.setenv('PREFETCH_ENABLED', 'true')
+    prefetcher = prefetcher_from_env(None, None, None, None, analysis_workers=3)
+    assert prefetcher.stats() == {'prefetches': 0, 'max_workers': 18}
+    prefetcher.shutdown()
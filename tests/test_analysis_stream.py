@@ -0,0 +1,162 @@
+import asyncio
+import json
+import threading
+
+import src.agente.coingeckoToolKit as cg
+import tool_telemetry
+from src.agente.analysisCache import AnalysisCache
+from src.agente.analysisPrefetch import AnalysisPrefetcher
+from src.agente.analysisStream import AnalysisEventStream, obtainable_from_source, sse_event
+
+
+def test_market_data_fields_from_toolkit_values(monkeypatch):
+    monkeypatch.setenv('COINGECKO_API_KEY', 'test')
+    kit = cg.CoinGeckoToolKit(use_proxy=False)
+    monkeypatch.setattr(kit, '_make_request', lambda endpoint, params: [{
+        'current_price': 67123.45, 'market_cap': 1321000000000, 'total_volume': None,
+        'price_change_percentage_24h': -1.234, 'symbol': 'btc', 'name': 'Bitcoin'}])
+    valores = kit.fetch_market_data('bitcoin', 'usd')
+
+    assert obtainable_from_source('market_data', valores) == {
+        'price_current': 67123.45, 'price_change_24h': -1.234, 'market_cap': 1321000000000}
+    texto = kit.get_market_data('bitcoin', 'usd')
+    assert texto == kit.format_market_data(valores)
+    assert '💰 **Price**: $67,123.45' in texto and '📈 **24h Volume**: N/A' in texto
+
+    monkeypatch.setattr(kit, '_make_request', lambda endpoint, params: [])
+    assert kit.get_market_data('dogecoin', 'usd') == 'No market data found for dogecoin'
+
+
+def test_sentiment_signal_and_pattern_fields():
+    assert obtainable_from_source('fear_greed', {'value': 27, 'classification': 'Fear'}) == {
+        'fear_greed_value': 27, 'fear_greed_classification': 'Fear'}
+
+    sinal = json.loads(json.dumps({'technical_signal': 'hold', 'breakdown': {
+        'rsi': {'value': 48.2, 'score': 0}, 'macd': {'macd': 1.0, 'signal': 2.0, 'score': -2},
+        'sma_20': {'price': 10, 'sma': 9.5, 'score': 1}, 'sma_50': {'price': 10, 'sma': 11.0, 'score': -1}}}))
+    assert obtainable_from_source('technical_signal', sinal) == {
+        'rsi': 48.2, 'macd_signal': 'bearish', 'sma_20': 9.5, 'sma_50': 11.0}
+
+    padroes = {'ok': True, 'found_count': 2, 'sample': [
+        {'padrao_tipo': 'DT', 'score_total': 81, 'timeframe': '1h', 'strategy': 'x', 'extra': 1}]}
+    assert obtainable_from_source('patterns', padroes) == {
+        'patterns_found_count': 2,
+        'patterns_sample': [{'padrao_tipo': 'DT', 'score_total': 81, 'timeframe': '1h', 'strategy': 'x'}]}
+
+    assert obtainable_from_source('news', None) == {}
+    assert obtainable_from_source('technical_signal', None) == {}
+
+
+def test_sse_frame_format():
+    assert sse_event('tool', {'function': 'get_trending'}) == \
+        'event: tool\ndata: {"function": "get_trending"}\n\n'
+
+
+def test_event_stream_bridges_worker_threads_to_the_loop():
+    async def cenario():
+        stream = AnalysisEventStream(asyncio.get_running_loop())
+
+        def trabalhador():
+            for i in range(3):
+                stream.emit('tool', {'i': i})
+            stream.close()
+
+        threading.Thread(target=trabalhador).start()
+        return [item async for item in stream.events(heartbeat=5)]
+
+    assert asyncio.run(cenario()) == [('tool', {'i': 0}), ('tool', {'i': 1}), ('tool', {'i': 2})]
+
+
+def test_event_stream_heartbeat_when_idle():
+    async def cenario():
+        stream = AnalysisEventStream(asyncio.get_running_loop())
+        itens = []
+        async for item in stream.events(heartbeat=0.05):
+            itens.append(item)
+            if item is None:
+                stream.emit('started', {})
+                stream.close()
+        return itens
+
+    assert asyncio.run(cenario()) == [None, ('started', {})]
+
+
+class _Kit:
+    @tool_telemetry.instrumented_tool
+    def fetch_market_data(self, coin_id, vs_currency='usd'):
+        return {'price': 2.5, 'market_cap': None}
+
+    def format_market_data(self, valores):
+        return f"💰 **Price**: ${valores['price']:.2f}"
+
+    @tool_telemetry.instrumented_tool
+    def perform_technical_analysis(self, coin_id, vs_currency='usd', days='90'):
+        return 'ta'
+
+    @tool_telemetry.instrumented_tool
+    def calculate_deterministic_technical_signal(self, coin_id, vs_currency='usd', days='90'):
+        return '{}'
+
+    def fetch_fear_greed_data(self):
+        raise RuntimeError('down')
+
+    def get_latest_articles(self, limit=15):
+        return 'news'
+
+    def detect_patterns(self, **kwargs):
+        return '{"ok": false}'
+
+
+def test_tool_and_prefetch_listeners_fire_per_completion():
+    eventos = []
+    lock = threading.Lock()
+
+    def ouvir(evento, dados):
+        with lock:
+            eventos.append((evento, dados))
+
+    kit = _Kit()
+    prefetcher = AnalysisPrefetcher(kit, kit, kit, kit, max_workers=6)
+    with tool_telemetry.collect('req', on_call=lambda call: ouvir('tool', call)):
+        handle = prefetcher.start('x', 'usd', 'short',
+                                  on_result=lambda nome, r: ouvir(nome, obtainable_from_source(nome, r.data)))
+    handle.wait(timeout=5)
+    prefetcher.shutdown()
+
+    ferramentas = sorted(d['function'] for e, d in eventos if e == 'tool')
+    assert ferramentas == ['calculate_deterministic_technical_signal', 'fetch_market_data',
+                           'perform_technical_analysis']
+    assert ('market_data', {'price_current': 2.5}) in eventos
+    assert ('fear_greed', {}) in eventos
+    assert len([e for e, _ in eventos if e != 'tool']) == 6
+
+
+def test_streamed_follower_receives_the_running_analysis_events():
+    liberar = threading.Event()
+
+    def analise(coin_id, **params):
+        params['on_event']('started', {'coin_id': coin_id})
+        liberar.wait(5)
+        params['on_event']('obtainable', {'price_current': 1.0})
+        params['on_event']('thoughts', {'reasoning': 'r'})
+        return {'ok': True, 'data': {'x': 1}, 'errors': [], 'meta': {}}
+
+    cache = AnalysisCache(analise)
+    lider = threading.Thread(target=cache.compute, args=('bitcoin',),
+                             kwargs={'vs_currency': 'usd', 'term_type': 'short'})
+    lider.start()
+
+    async def cenario():
+        stream = AnalysisEventStream(asyncio.get_running_loop())
+        while (futuro := cache.join('bitcoin', 'usd', 'short', on_event=stream.emit)) is None:
+            await asyncio.sleep(0.01)
+        futuro.add_done_callback(lambda _: stream.close())
+        liberar.set()
+        eventos = [item async for item in stream.events(heartbeat=5)]
+        return eventos, await asyncio.wrap_future(futuro)
+
+    eventos, resposta = asyncio.run(cenario())
+    lider.join(5)
+    assert eventos == [('started', {'coin_id': 'bitcoin'}), ('obtainable', {'price_current': 1.0}),
+                       ('thoughts', {'reasoning': 'r'})]
+    assert resposta['data'] == {'x': 1} and resposta['meta']['cache']['status'] == 'miss'
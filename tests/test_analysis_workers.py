@@ -0,0 +1,154 @@
+import threading
+import time
+
+import pytest
+
+from src.agente.analysisWorkers import AgentPool, AnalysisPool, InMemoryJobStore, JobManager, SQLiteJobStore
+
+
+@pytest.fixture
+def pool():
+    p = AnalysisPool(max_workers=2, max_queue=1)
+    yield p
+    p.shutdown(wait=True)
+
+
+def test_pool_rejects_beyond_workers_plus_queue(pool):
+    liberar = threading.Event()
+    futures = [pool.try_submit(liberar.wait, 5) for _ in range(3)]
+
+    assert all(f is not None for f in futures)
+    assert pool.try_submit(liberar.wait, 5) is None
+    stats = pool.stats()
+    assert stats['accepted'] == 3 and stats['rejected'] == 1
+    assert stats['running'] + stats['queued'] == 3
+
+    liberar.set()
+    for f in futures:
+        assert f.result(timeout=5) is True
+    assert pool.try_submit(lambda: 'ok').result(timeout=5) == 'ok'
+
+
+def test_pool_releases_slot_on_failure(pool):
+    def falha():
+        raise ValueError('boom')
+
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            pool.try_submit(falha).result(timeout=5)
+    stats = pool.stats()
+    assert stats['failed'] == 5
+    assert stats['running'] == 0 and stats['queued'] == 0
+
+
+def _aguardar(manager, job_id, timeout=5.0):
+    fim = time.time() + timeout
+    while time.time() < fim:
+        job = manager.get(job_id)
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError('job did not finish')
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite'])
+def test_job_manager_runs_jobs_and_records_results(backend, pool, tmp_path):
+    store = InMemoryJobStore() if backend == 'memory' else SQLiteJobStore(str(tmp_path / 'jobs.sqlite'))
+
+    def runner(coin_id, **params):
+        if coin_id == 'erro':
+            return {'ok': False, 'data': {}, 'errors': ['agent failed']}
+        return {'ok': True, 'data': {'coin': coin_id}, 'errors': []}
+
+    manager = JobManager(pool, store, runner)
+    ok = manager.submit({'coin_id': 'bitcoin', 'term_type': 'short'})
+    falha = manager.submit({'coin_id': 'erro'})
+    assert ok['status'] == 'queued'
+
+    job = _aguardar(manager, ok['job_id'])
+    assert job['status'] == 'succeeded'
+    assert job['result']['data'] == {'coin': 'bitcoin'}
+    assert [e['stage'] for e in job['progress']] == ['started', 'finished']
+    job = _aguardar(manager, falha['job_id'])
+    assert job['status'] == 'failed' and job['error'] == 'agent failed'
+
+
+def test_job_manager_rejects_when_pool_full(pool):
+    liberar = threading.Event()
+    manager = JobManager(pool, InMemoryJobStore(), lambda **k: liberar.wait(5) and {'ok': True})
+    jobs = [manager.submit({'coin_id': 'bitcoin'}) for _ in range(3)]
+    assert all(jobs)
+    assert manager.submit({'coin_id': 'bitcoin'}) is None
+    assert manager.store.stats()['jobs'] == 3
+    liberar.set()
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite'])
+def test_job_store_expires_and_bounds_finished_jobs(backend, tmp_path, monkeypatch):
+    agora = [1_000.0]
+    monkeypatch.setattr(time, 'time', lambda: agora[0])
+    store = InMemoryJobStore(max_jobs=2, retention_seconds=60) if backend == 'memory' else \
+        SQLiteJobStore(str(tmp_path / 'jobs.sqlite'), max_jobs=2, retention_seconds=60)
+
+    a = store.create({'coin_id': 'a'})['job_id']
+    store.update(a, status='succeeded')
+    agora[0] += 1
+    b = store.create({'coin_id': 'b'})['job_id']
+    agora[0] += 1
+    c = store.create({'coin_id': 'c'})['job_id']
+    assert store.get(a) is None  # oldest finished job evicted to respect max_jobs
+    assert store.get(b)['status'] == 'queued'
+
+    store.update(b, status='failed')
+    agora[0] += 61
+    assert store.get(b) is None
+    assert store.get(c)['status'] == 'queued'
+
+
+def test_sqlite_job_store_marks_interrupted_jobs_failed(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite')
+    job_id = SQLiteJobStore(path).create({'coin_id': 'bitcoin'})['job_id']
+    job = SQLiteJobStore(path).get(job_id)
+    assert job['status'] == 'failed'
+    assert 'restarted' in job['error']
+
+
+def test_agent_pool_reuses_prebuilt_instances_per_key():
+    construidos = []
+
+    def fabrica(termo):
+        construidos.append(termo)
+        return {'termo': termo, 'estado': []}
+
+    pool = AgentPool(fabrica, size_per_key=2, reset=lambda agente: agente['estado'].clear())
+    pool.warm(['short', 'long'])
+    assert construidos == ['short', 'short', 'long', 'long']
+
+    for _ in range(5):
+        agente = pool.acquire('short')
+        assert agente['termo'] == 'short' and agente['estado'] == []
+        agente['estado'].append('request state')
+        pool.release('short', agente)
+    assert len(construidos) == 4
+    assert pool.stats()['built_on_demand'] == 0
+
+
+def test_agent_pool_builds_on_demand_then_blocks_at_size():
+    pool = AgentPool(lambda termo: object(), size_per_key=1)
+    agente = pool.acquire('medium')
+    assert pool.stats()['built_on_demand'] == 1
+
+    threading.Timer(0.05, pool.release, args=('medium', agente)).start()
+    assert pool.acquire('medium', timeout=5) is agente
+    assert pool.stats()['waited'] == 1
+
+
+def test_agent_pool_discards_instances_whose_reset_fails():
+    def reset(agente):
+        raise RuntimeError('dirty')
+
+    pool = AgentPool(lambda termo: object(), size_per_key=1, reset=reset)
+    primeiro = pool.acquire('short')
+    pool.release('short', primeiro)
+    assert pool.acquire('short') is not primeiro
+    assert pool.stats()['discarded'] == 1
@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+import src.agente.coingeckoToolKit as cg
+
+
+@pytest.fixture
+def toolkit(monkeypatch, sessao_http):
+    monkeypatch.setenv('COINGECKO_API_KEY', 'test')
+    monkeypatch.setattr(cg, '_COALESCER', cg._RequestCoalescer(ttl_seconds=30))
+    monkeypatch.setattr(cg, 'get_response_cache', lambda: None)
+    kit = cg.CoinGeckoToolKit(use_proxy=False)
+    kit.session = sessao_http({'prices': [[0, 1.0]]}, atraso=0.05)
+    return kit
+
+
+def test_concurrent_identical_requests_share_one_upstream_call(toolkit):
+    params = {'vs_currency': 'usd', 'days': '90', 'interval': 'daily'}
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(
+        toolkit._make_request('coins/bitcoin/market_chart', dict(params)))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(toolkit.session.chamadas) == 1
+    assert all(r is resultados[0] for r in resultados)
+    stats = cg.CoinGeckoToolKit.request_stats()
+    assert stats['requests'] == 8
+    assert stats['upstream_calls'] == 1
+    assert stats['coalesced'] + stats['ttl_hits'] == 7
+    assert stats['upstream_by_endpoint'] == {'coins/bitcoin/market_chart': 1}
+
+
+def test_ttl_reuses_answer_and_distinguishes_params(toolkit):
+    toolkit._make_request('coins/bitcoin/market_chart', {'vs_currency': 'usd', 'days': 90})
+    toolkit._make_request('coins/bitcoin/market_chart', {'days': '90', 'vs_currency': 'usd'})
+    toolkit._make_request('coins/bitcoin/market_chart', {'vs_currency': 'usd', 'days': '30'})
+
+    assert len(toolkit.session.chamadas) == 2
+    assert cg.CoinGeckoToolKit.request_stats()['ttl_hits'] == 1
+
+
+def test_errors_are_shared_but_not_cached(toolkit, sessao_http):
+    toolkit.session = sessao_http(cg.requests.exceptions.ConnectionError('offline'))
+    for _ in range(2):
+        with pytest.raises(cg.requests.exceptions.ConnectionError):
+            toolkit._make_request('coins/markets', {'ids': 'bitcoin'})
+
+    assert len(toolkit.session.chamadas) == 2
+    assert cg.CoinGeckoToolKit.request_stats()['errors'] == 2
@@ -0,0 +1,73 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import src.tools.http_pool as hp
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    falhas_restantes = 0
+
+    def do_GET(self):
+        if _Handler.falhas_restantes > 0:
+            _Handler.falhas_restantes -= 1
+            corpo, status = b'{"error": "busy"}', 503
+        else:
+            corpo, status = b'{"ok": true}', 200
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor(monkeypatch):
+    monkeypatch.setattr(hp, 'RETRY_BACKOFF_FACTOR', 0)
+    hp.reset_sessions()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    hp.reset_sessions()
+    _Handler.falhas_restantes = 0
+
+
+def test_session_reuses_connections_per_host(servidor):
+    for _ in range(5):
+        assert hp.get_session().get(f"{servidor}/ping", timeout=5).json() == {'ok': True}
+
+    host = servidor.split('//')[1]
+    stats = hp.connection_stats()[host]
+    assert stats['requisicoes'] == 5
+    assert stats['conexoes'] == 1
+    assert stats['reutilizadas'] == 4
+    assert hp.get_session() is hp.get_session()
+
+
+def test_session_retries_server_errors(servidor):
+    _Handler.falhas_restantes = 2
+    resp = hp.get_session().get(f"{servidor}/ping", timeout=5)
+    assert resp.status_code == 200
+
+
+def test_session_without_status_retries_returns_error(servidor):
+    _Handler.falhas_restantes = 1
+    resp = hp.get_session(retry_status=False).get(f"{servidor}/ping", timeout=5)
+    assert resp.status_code == 503
+
+
+def test_configure_host_sizes_pool(servidor):
+    host = servidor.split('//')[1]
+    hp.get_session().get(f"{servidor}/ping", timeout=5)
+    hp.configure_host(host, 3)
+    adapter = hp.get_session().get_adapter(f"{servidor}/ping")
+    assert adapter._pool_maxsize == 3
+    hp.POOL_MAXSIZE_BY_HOST.pop(host)
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.patterns.OCOs.necklineconfirmada as nc
+
+
+@pytest.mark.parametrize('seed_bars', [0, 10, 25, 34, 40, 150])
+def test_incremental_indicators_match_batch(seed_bars, ohlcv_aleatorio):
+    df = ohlcv_aleatorio(200)
+    ref = nc.calcular_indicadores(df.copy())
+
+    estado = nc.IndicadoresIncrementais.a_partir_do_frame(df.iloc[:seed_bars])
+    linhas = [estado.atualizar(row.high, row.low, row.close, row.volume)
+              for row in df.iloc[seed_bars:].itertuples()]
+    out = pd.DataFrame(linhas, index=df.index[seed_bars:])
+
+    assert estado.barras == len(df)
+    for col in out.columns:
+        np.testing.assert_allclose(out[col].to_numpy(float),
+                                   ref[col].to_numpy(float)[seed_bars:],
+                                   rtol=1e-9, atol=1e-7, equal_nan=True, err_msg=col)
+
+
+def test_incremental_seed_equals_last_batch_row(ohlcv_aleatorio):
+    df = ohlcv_aleatorio(120, seed=5)
+    ref = nc.calcular_indicadores(df.copy())
+    valores = nc.IndicadoresIncrementais.a_partir_do_frame(df).valores()
+    for col, valor in valores.items():
+        assert valor == pytest.approx(float(ref[col].iloc[-1]), rel=1e-9)
+
+
+@pytest.mark.parametrize('seed_bars', [5, 30])
+def test_incremental_obv_survives_nan_volume(seed_bars, ohlcv_aleatorio):
+    df = ohlcv_aleatorio(60, seed=7)
+    volume = df['volume'].to_numpy(float)
+    volume[[3, 32, 33]] = np.nan
+    close = df['close'].to_numpy(float)
+    ref = nc._obv_np(close, volume)
+
+    obv = nc.OBVIncremental()
+    obv.semear(close[:seed_bars], volume[:seed_bars])
+    out = [obv.atualizar(c, v) for c, v in zip(close[seed_bars:], volume[seed_bars:])]
+
+    np.testing.assert_allclose(out, ref[seed_bars:], rtol=1e-12, equal_nan=True)
+    assert np.isnan(out[32 - seed_bars]) and not np.isnan(out[-1])
@@ -344,3 +344,100 @@ def test_validate_and_score_dtb_integration(df_index, monkeypatch):
         'valid_volume_breakout_neckline',
     ]:
         assert data.get(flag) == True
+
+
+def _breakout_loop(df, neckline, start_pos, direction, limit):
+    end_pos = min(len(df) - 1, start_pos + limit)
+    for pos in range(start_pos + 1, end_pos + 1):
+        close_val = float(df['close'].iloc[pos])
+        if direction == 'bearish' and close_val < neckline:
+            return df.index[pos]
+        if direction == 'bullish' and close_val > neckline:
+            return df.index[pos]
+    return None
+
+
+def test_breakout_search_vectorized_and_batched(df_index):
+    rng = np.random.default_rng(5)
+    close = 100.0 + np.cumsum(rng.normal(0, 1, len(df_index)))
+    close[rng.integers(0, len(df_index), 5)] = np.nan
+    df = make_df(df_index, close=close)
+
+    necklines = rng.uniform(close[~np.isnan(close)].min(), close[~np.isnan(close)].max(), 200)
+    starts = rng.integers(0, len(df_index), 200)
+    directions = rng.choice(['bearish', 'bullish'], 200)
+    expected = [_breakout_loop(df, nk, st, d, 30) for nk, st, d in zip(necklines, starts, directions)]
+
+    single = [nc.find_breakout_index(df, nk, df.index[st], d, max_bars=30)
+              for nk, st, d in zip(necklines, starts, directions)]
+    batched = nc.find_breakout_indices(
+        df, necklines, df.index[starts], directions, max_bars=30)
+    assert single == expected
+    assert batched == expected
+    assert nc.find_breakout_indices(df, [98.0], [pd.Timestamp('1999-01-01')], 'bearish') == [None]
+
+
+# NumPy indicator engine
+
+def test_numpy_indicator_engine_matches_pandas_ta():
+    rng = np.random.default_rng(7)
+    n = 3000
+    index = pd.date_range(start="2020-01-01", periods=n, freq="H")
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    df = make_df(index, close=close, high=close + rng.random(n),
+                 low=close - rng.random(n), volume=rng.random(n) * 1000)
+    df.iloc[1500:1503] = np.nan
+    df.loc[df.index[10], 'high'] = df.loc[df.index[10], 'low']
+
+    ref = nc._calcular_indicadores_pandas_ta(df.copy())
+    out = nc._calcular_indicadores_numpy(df.copy())
+
+    colunas = [c for c in ref.columns if c not in df.columns]
+    assert {'RSI_14_CLOSE', 'MACD_12_26_9', 'STOCHk_14_3_3', 'OBV', 'ATR_14'} <= set(colunas)
+    for col in colunas:
+        np.testing.assert_allclose(out[col].to_numpy(float), ref[col].to_numpy(float),
+                                   rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=col)
+
+
+def test_calcular_indicadores_uses_configured_engine(df_index, monkeypatch):
+    df = make_df(df_index, close=np.linspace(100, 120, len(df_index)))
+    monkeypatch.setattr(nc.Config, 'INDICATOR_ENGINE', 'pandas_ta')
+    ref = nc.calcular_indicadores(df.copy())
+    monkeypatch.setattr(nc.Config, 'INDICATOR_ENGINE', 'numpy')
+    out = nc.calcular_indicadores(df.copy())
+    pd.testing.assert_frame_equal(out[ref.columns], ref, check_exact=False, rtol=1e-9)
+
+
+# Per-frame indicator store
+
+def test_indicator_fallbacks_computed_once_per_frame(df_index, monkeypatch):
+    df = make_df(df_index, close=np.linspace(100, 110, len(df_index)))
+    k_col = f"STOCHk_{nc.Config.STOCH_K}_{nc.Config.STOCH_D}_{nc.Config.STOCH_SMOOTH_K}"
+    d_col = f"STOCHd_{nc.Config.STOCH_K}_{nc.Config.STOCH_D}_{nc.Config.STOCH_SMOOTH_K}"
+    calls = {'stoch': 0, 'rsi': 0}
+
+    def fake_stoch(**kwargs):
+        calls['stoch'] += 1
+        return pd.DataFrame(index=df.index, data=50.0, columns=[k_col, d_col])
+
+    def fake_rsi(s, length=14):
+        calls['rsi'] += 1
+        return pd.Series(index=s.index, data=50.0)
+
+    monkeypatch.setattr(nc.ta, 'stoch', fake_stoch)
+    monkeypatch.setattr(nc.ta, 'rsi', fake_rsi)
+    for i in range(20, 30):
+        nc.check_stochastic_confirmation(
+            df, df.index[i], df.index[i + 10], 100, 110, direction='bearish')
+        nc.assess_rsi_divergence_strength(
+            df, df.index[i], df.index[i + 10], 100, 110,
+            direction='bearish', source_series=df['high'])
+    assert calls == {'stoch': 1, 'rsi': 1}
+
+    # Columns from calcular_indicadores take precedence over recomputation
+    df2 = df.copy()
+    df2[k_col] = 50.0
+    df2[d_col] = 50.0
+    nc.check_stochastic_confirmation(
+        df2, df2.index[20], df2.index[30], 100, 110, direction='bearish')
+    assert calls['stoch'] == 1
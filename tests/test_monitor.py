@@ -0,0 +1,163 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+import src.patterns.OCOs.necklineconfirmada as nc
+
+
+STRATEGIES = {'teste': {'1h': {'depth': 3, 'deviation': 1.0}}}
+
+
+def _feed(monitor, df, start):
+    emitted = []
+    for row in df.iloc[start:].itertuples():
+        emitted.extend(monitor.processar_barra(
+            'BTC-USD', '1h', row.Index, row.open, row.high, row.low, row.close, row.volume))
+    return emitted
+
+
+def test_monitor_state_matches_batch_after_streaming(monkeypatch, ohlcv_aleatorio):
+    monkeypatch.setattr(nc, '_detectar_padroes', lambda *args, **kwargs: [])
+    df = ohlcv_aleatorio(260)
+    monitor = nc.MonitorPadroes(STRATEGIES)
+    monitor.inicializar('BTC-USD', '1h', df.iloc[:200])
+    _feed(monitor, df, 200)
+
+    estado = monitor.estados[('BTC-USD', '1h')]
+    ref = nc.calcular_indicadores(df.copy())
+    pd.testing.assert_index_equal(estado.df.index, ref.index)
+    for col in ['RSI_14_CLOSE', 'MACDh_12_26_9', 'STOCHd_14_3_3', 'OBV', 'ATR_14']:
+        np.testing.assert_allclose(estado.df[col].to_numpy(float), ref[col].to_numpy(float),
+                                   rtol=1e-9, atol=1e-7, equal_nan=True)
+    assert estado.zigzags['teste'].pivots() == nc.calcular_zigzag_oficial(df, 3, 1.0)
+    assert len(monitor.latencias_ms) == 60
+
+
+def test_monitor_emits_each_new_pattern_once(tmp_path, monkeypatch, ohlcv_aleatorio):
+    def fake_detector(pivots, df_historico, wanted_patterns):
+        # One "pattern" per DT window ending at the third-to-last pivot
+        p3 = pivots[-3]
+        return [{'padrao_tipo': 'DT', 'score_total': 5, 'valid_estrutura_picos_vales': np.bool_(True),
+                 'p3_idx': p3['idx'], 'p3_preco': p3['preco']}]
+
+    monkeypatch.setattr(nc, '_detectar_padroes', fake_detector)
+    df = ohlcv_aleatorio(200)
+    sink = tmp_path / 'sinais.jsonl'
+    received = []
+    monitor = nc.MonitorPadroes(STRATEGIES, sink_path=str(sink), callback=received.append)
+
+    historicos = monitor.inicializar('BTC-USD', '1h', df.iloc[:120])
+    emitted = _feed(monitor, df, 120)
+    # Duplicate / old bars are ignored
+    assert _feed(monitor, df, 190) == []
+
+    keys = [p['p3_idx'] for p in emitted]
+    assert len(keys) == len(set(keys)) > 0
+    assert historicos[0]['p3_idx'] not in keys
+    assert received == emitted
+
+    linhas = [json.loads(line) for line in sink.read_text(encoding='utf-8').splitlines()]
+    assert len(linhas) == len(emitted)
+    first = linhas[0]
+    assert first['ticker'] == 'BTC-USD' and first['timeframe'] == '1h' and first['strategy'] == 'teste'
+    assert first['score_total'] == 5 and first['valid_estrutura_picos_vales'] is True
+    assert first['p3_idx'] == emitted[0]['p3_idx'].isoformat()
+    assert first['latencia_ms'] >= 0
+
+
+def test_barras_fechadas_drops_forming_bar(ohlcv_aleatorio):
+    df = ohlcv_aleatorio(5)
+    agora = df.index[-1] + pd.Timedelta(minutes=30)
+    fechadas = nc._barras_fechadas(df, '1h', agora)
+    assert list(fechadas.index) == list(df.index[:-1])
+
+
+def test_monitor_window_stays_bounded_and_matches_batch_tail(monkeypatch, ohlcv_aleatorio):
+    def fake_detector(pivots, df_historico, wanted_patterns):
+        p3 = pivots[-3]
+        return [{'padrao_tipo': 'DT', 'score_total': 5, 'p3_idx': p3['idx']}]
+
+    monkeypatch.setattr(nc, '_detectar_padroes', fake_detector)
+    monkeypatch.setattr(nc.Config, 'MONITOR_MAX_BARS', 40)
+    df = ohlcv_aleatorio(300)
+    monitor = nc.MonitorPadroes(STRATEGIES)
+    monitor.inicializar('BTC-USD', '1h', df.iloc[:100])
+    estado = monitor.estados[('BTC-USD', '1h')]
+    assert len(estado.df) == 40
+
+    emitted = _feed(monitor, df.iloc[:299], 100)
+    assert 40 <= len(estado.df) < 80
+    keys = [p['p3_idx'] for p in emitted]
+    assert len(keys) == len(set(keys)) > 0
+    assert all(chave[1] >= estado.df.index[0] for chave in estado.emitidos['teste'])
+
+    ref = nc.calcular_indicadores(df.iloc[:299].copy())
+    inicio = ref.index.get_loc(estado.df.index[0])
+    pd.testing.assert_index_equal(estado.df.index, ref.index[inicio:])
+    for col in ['close', 'RSI_14_CLOSE', 'MACDh_12_26_9', 'OBV', 'ATR_14']:
+        np.testing.assert_allclose(estado.df[col].to_numpy(float), ref[col].to_numpy(float)[inicio:],
+                                   rtol=1e-9, atol=1e-7, equal_nan=True)
+    esperados = [{**p, 'pos': p['pos'] - inicio}
+                 for p in nc.calcular_zigzag_oficial(df.iloc[:299], 3, 1.0) if p['pos'] >= inicio]
+    assert [p for p in estado.zigzags['teste'].pivots() if p['pos'] >= 0] == esperados
+
+    # Without a compaction the next bar extends the frame's lookup structures
+    indice = nc.obter_indice_extremos(estado.df)
+    _feed(monitor, df, 299)
+    assert nc.obter_indice_extremos(estado.df) is indice and indice.n == len(estado.df)
+
+
+def test_executar_downloads_only_the_tail_after_seeding(monkeypatch, ohlcv_aleatorio):
+    df = ohlcv_aleatorio(150)
+    chamadas = []
+
+    def completo(ticker, period, interval, usar_cache=None):
+        chamadas.append(('completo', interval, usar_cache))
+        return df.iloc[:120]
+
+    def cauda(ticker, interval, desde, agora=None):
+        chamadas.append(('cauda', interval, desde))
+        return df[df.index >= desde].iloc[:11]
+
+    monkeypatch.setattr(nc, 'buscar_dados', completo)
+    monkeypatch.setattr(nc, 'buscar_dados_desde', cauda)
+    monkeypatch.setattr(nc, '_detectar_padroes', lambda *args, **kwargs: [])
+    monitor = nc.MonitorPadroes(STRATEGIES)
+    monitor.executar(['BTC-USD'], intervals_filter={'1h'}, poll_seconds=0, ciclos=3)
+
+    assert chamadas == [('completo', '1h', False), ('cauda', '1h', df.index[119]),
+                        ('cauda', '1h', df.index[129])]
+    assert monitor.estados[('BTC-USD', '1h')].df.index[-1] == df.index[139]
+
+
+def test_tail_span_keeps_the_full_download_sampling():
+    agora = pd.Timestamp('2024-06-10 12:00')
+    # interval=daily spans: shortest span past `desde`, skipping auto-sampled ones
+    assert nc._dias_cauda('730', agora - pd.Timedelta(hours=3), agora) == '2'
+    assert nc._dias_cauda('730', agora - pd.Timedelta(days=5, hours=12), agora) == '8'
+    assert nc._dias_cauda('max', agora - pd.Timedelta(days=3), agora) == '4'
+    assert nc._dias_cauda('730', agora - pd.Timedelta(days=800), agora) is None
+    # Hourly (7/14/30) and 5-minute (1) spans
+    assert nc._dias_cauda('30', agora - pd.Timedelta(days=2), agora) == '7'
+    assert nc._dias_cauda('7', agora - pd.Timedelta(days=2), agora) is None
+    assert nc._dias_cauda('1', agora - pd.Timedelta(hours=1), agora) is None
+
+
+def test_tail_download_falls_back_when_bars_do_not_line_up(monkeypatch, ohlcv_aleatorio):
+    df = ohlcv_aleatorio(48)
+    chamadas = []
+
+    def grupo(coin_id, vs_currency, days, itens, use_cache):
+        chamadas.append(days)
+        return {itens[0]: df.iloc[30:] if days == '2' else df.shift(freq='30T')}
+
+    monkeypatch.setattr(nc, '_baixar_grupo', grupo)
+    monkeypatch.setattr(nc, 'buscar_dados', lambda *args, **kwargs: df)
+    agora = df.index[-1] + pd.Timedelta(hours=1)
+
+    tail = nc.buscar_dados_desde('BTC-USD', '1h', df.index[40], agora)
+    assert chamadas == ['2'] and list(tail.index) == list(df.index[40:])
+    # Misaligned tail -> full series
+    tail = nc.buscar_dados_desde('BTC-USD', '1h', df.index[20], agora)
+    assert list(tail.index) == list(df.index[20:])
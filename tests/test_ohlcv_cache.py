@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.patterns.OCOs.necklineconfirmada as nc
+
+
+@pytest.fixture
+def cache_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(nc.Config, 'OHLCV_CACHE_ENABLED', True)
+    monkeypatch.setattr(nc.Config, 'OHLCV_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(nc.Config, 'RETRY_DELAY_SEGUNDOS', 0)
+    return tmp_path
+
+
+def _fake_market_chart(calls):
+    def fetch(coin_id, vs_currency, days, interval_hint):
+        calls.append((coin_id, vs_currency, days))
+        idx = pd.date_range('2024-01-01', periods=48, freq='H')
+        prices = pd.DataFrame(
+            {'price': np.linspace(100.0, 110.0, len(idx))}, index=idx)
+        vols = pd.DataFrame({'volume': np.full(len(idx), 10.0)}, index=idx)
+        return prices, vols
+    return fetch
+
+
+def test_buscar_dados_reads_fresh_cache_without_network(cache_config, monkeypatch):
+    calls = []
+    monkeypatch.setattr(nc, '_fetch_market_chart', _fake_market_chart(calls))
+
+    df1 = nc.buscar_dados('BTC-USD', '1y', '1d')
+    df2 = nc.buscar_dados('BTC-USD', '1y', '1d')
+
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(df1, df2, check_freq=False)
+    assert list(cache_config.glob('bitcoin_usd_1d_365.*'))
+
+
+def test_buscar_dados_refetches_stale_cache(cache_config, monkeypatch):
+    calls = []
+    monkeypatch.setattr(nc, '_fetch_market_chart', _fake_market_chart(calls))
+    monkeypatch.setattr(nc.Config, 'OHLCV_CACHE_MAX_AGE_SECONDS', {'1d': 0})
+
+    nc.buscar_dados('BTC-USD', '1y', '1d')
+    nc.buscar_dados('BTC-USD', '1y', '1d')
+
+    assert len(calls) == 2
+
+
+def test_buscar_dados_falls_back_to_stale_cache_on_failure(cache_config, monkeypatch):
+    calls = []
+    monkeypatch.setattr(nc, '_fetch_market_chart', _fake_market_chart(calls))
+    monkeypatch.setattr(nc.Config, 'OHLCV_CACHE_MAX_AGE_SECONDS', {'1d': 0})
+    df1 = nc.buscar_dados('BTC-USD', '1y', '1d')
+
+    def failing_fetch(*args, **kwargs):
+        raise ConnectionError('offline')
+    monkeypatch.setattr(nc, '_fetch_market_chart', failing_fetch)
+
+    df2 = nc.buscar_dados('BTC-USD', '1y', '1d')
+    pd.testing.assert_frame_equal(df1, df2, check_freq=False)
+
+
+def test_baixar_series_concorrentes_shares_one_download_per_request(cache_config, monkeypatch):
+    calls = []
+    monkeypatch.setattr(nc, '_fetch_market_chart', _fake_market_chart(calls))
+
+    pares = [('BTC-USD', '1h'), ('BTC-USD', '4h'), ('ETH-USD', '1h')]
+    out = dict(nc.baixar_series_concorrentes(pares, '2y'))
+
+    assert set(out) == set(pares)
+    assert not any(isinstance(v, Exception) for v in out.values())
+    assert sorted(c[0] for c in calls) == ['bitcoin', 'ethereum']
+    assert len(out[('BTC-USD', '4h')]) < len(out[('BTC-USD', '1h')])
+
+
+def test_baixar_series_concorrentes_reports_failures_per_pair(cache_config, monkeypatch):
+    def failing_fetch(*args, **kwargs):
+        raise ConnectionError('offline')
+    monkeypatch.setattr(nc, '_fetch_market_chart', failing_fetch)
+    monkeypatch.setattr(nc.Config, 'MAX_DOWNLOAD_TENTATIVAS', 1)
+
+    out = dict(nc.baixar_series_concorrentes([('BTC-USD', '1d')], '1y'))
+    assert isinstance(out[('BTC-USD', '1d')], ConnectionError)
+
+
+def test_coingecko_request_retries_rate_limited_answers(monkeypatch, resposta_http, sessao_http):
+    respostas = [resposta_http(status_code=429), resposta_http(status_code=503), resposta_http({'prices': []})]
+    monkeypatch.setenv(nc.Config.COINGECKO_API_KEY_ENV, 'test')
+    monkeypatch.setattr(nc.Config, 'COINGECKO_BACKOFF_BASE_SECONDS', 0)
+    monkeypatch.setattr(nc, 'get_session', lambda **k: sessao_http(lambda: respostas.pop(0)))
+
+    assert nc._coingecko_request('coins/bitcoin/market_chart') == {'prices': []}
+    assert respostas == []
+
+
+def test_coingecko_request_gives_up_after_max_retries(monkeypatch, resposta_http, sessao_http):
+    monkeypatch.setenv(nc.Config.COINGECKO_API_KEY_ENV, 'test')
+    monkeypatch.setattr(nc.Config, 'COINGECKO_BACKOFF_BASE_SECONDS', 0)
+    monkeypatch.setattr(nc.Config, 'COINGECKO_MAX_RETRIES', 2)
+    calls = []
+    monkeypatch.setattr(nc, 'get_session', lambda **k: sessao_http(lambda: calls.append(1) or resposta_http(status_code=500)))
+
+    with pytest.raises(ConnectionError):
+        nc._coingecko_request('coins/bitcoin/market_chart')
+    assert len(calls) == 3
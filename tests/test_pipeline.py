@@ -0,0 +1,100 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+import src.patterns.OCOs.necklineconfirmada as nc
+
+
+def test_jobs_grouped_by_ticker_and_interval():
+    strategies = {
+        'a': {'1h': {'depth': 8, 'deviation': 1.6}, '4h': {'depth': 12, 'deviation': 4.0}},
+        'b': {'1h': {'depth': 10, 'deviation': 2.8}},
+        'c': {'1d': {'depth': 10, 'deviation': 6.0}},
+    }
+    jobs = nc._agrupar_jobs_por_ticker_intervalo(
+        strategies, ['BTC-USD', 'ETH-USD'], {'1h', '4h'})
+
+    assert list(jobs.keys()) == [('BTC-USD', '1h'), ('BTC-USD', '4h'),
+                                 ('ETH-USD', '1h'), ('ETH-USD', '4h')]
+    assert [name for _, name, _ in jobs[('BTC-USD', '1h')]] == ['a', 'b']
+    # order keys follow the strategy -> interval -> ticker loop
+    assert jobs[('ETH-USD', '1h')][1][0] == (1, 0, 1)
+
+
+def test_processar_ticker_intervalo_loads_series_once(monkeypatch):
+    calls = []
+    idx = pd.date_range('2024-01-01', periods=50, freq='H')
+    df = pd.DataFrame({'open': 1.0, 'high': 1.0, 'low': 1.0,
+                       'close': 1.0, 'volume': 1.0}, index=idx)
+
+    def fake_buscar(ticker, period, interval):
+        calls.append((ticker, interval))
+        return df.copy()
+
+    monkeypatch.setattr(nc, 'buscar_dados', fake_buscar)
+    monkeypatch.setattr(nc, 'calcular_indicadores', lambda d: d)
+    monkeypatch.setattr(nc, 'calcular_zigzag_multiplo',
+                        lambda d, pares: [[{'idx': d.index[i], 'tipo': 'PICO', 'preco': 1.0} for i in range(5)]
+                                          for _ in pares])
+    monkeypatch.setattr(nc, '_detectar_padroes',
+                        lambda pivots, d, wanted: [{'padrao_tipo': 'DT', 'score_total': 80}])
+
+    runs = [((0, 0, 0), 'a', {'depth': 8, 'deviation': 1.6}),
+            ((1, 0, 0), 'b', {'depth': 10, 'deviation': 2.8})]
+    out = nc._processar_ticker_intervalo('BTC-USD', '1h', runs, {'ALL'})
+
+    assert calls == [('BTC-USD', '1h')]
+    assert [key for key, _ in out] == [(0, 0, 0), (1, 0, 0)]
+    assert [p['strategy'] for _, p in out] == ['a', 'b']
+    assert all(p['ticker'] == 'BTC-USD' and p['timeframe'] == '1h' for _, p in out)
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = nc._RateLimiter(requests_per_minute=1200)  # 50 ms between calls
+    start = time.time()
+    for _ in range(4):
+        limiter.acquire()
+    assert time.time() - start >= 0.15
+
+
+def test_rate_limiter_allows_burst_then_spaces_calls():
+    limiter = nc._RateLimiter(requests_per_minute=600, burst=3)  # 100 ms per token
+    start = time.time()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.time() - start < 0.05
+    limiter.acquire()
+    assert time.time() - start >= 0.09
+
+
+def _brute_force_windows(pivots, size, start):
+    padroes = {tuple(['VALE', 'PICO'] * 4)[:size]: False, tuple(['PICO', 'VALE'] * 4)[:size]: True}
+    out = []
+    for i in range(start, len(pivots) - size + 1):
+        tipos = tuple(p['tipo'] for p in pivots[i:i + size])
+        if tipos in padroes:
+            out.append((i, padroes[tipos]))
+    return out
+
+
+def test_janelas_alternadas_matches_brute_force():
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        tipos = rng.choice(['PICO', 'VALE'], size=int(rng.integers(0, 40)), p=[0.45, 0.55])
+        pivots = [{'tipo': t} for t in tipos]
+        for size in (5, 7):
+            for start in (0, 3):
+                assert nc._janelas_alternadas(pivots, size, start) == \
+                    _brute_force_windows(pivots, size, start)
+
+
+def test_full_history_scan_covers_every_window(monkeypatch):
+    pivots = [{'tipo': 'VALE' if i % 2 == 0 else 'PICO'} for i in range(20)]
+    monkeypatch.setattr(nc.Config, 'RECENT_PATTERNS_LOOKBACK_COUNT', 1)
+    assert len(nc.identificar_padroes_ttb(pivots)) == 1
+
+    monkeypatch.setattr(nc.Config, 'FULL_HISTORY_SCAN', True)
+    found = nc.identificar_padroes_ttb(pivots)
+    assert len(found) == len(pivots) - 6
+    assert [p['padrao_tipo'] for p in found[:2]] == ['TT', 'TB']
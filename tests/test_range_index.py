@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+import src.patterns.OCOs.necklineconfirmada as nc
+
+
+def _frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.uniform(0, 1, n)
+    low = close - rng.uniform(0, 1, n)
+    high[rng.integers(0, n, n // 20)] = np.nan
+    idx = pd.date_range('2024-01-01', periods=n, freq='H')
+    return pd.DataFrame({'high': high, 'low': low, 'close': close}, index=idx)
+
+
+def test_range_queries_match_pandas():
+    df = _frame(300)
+    indice = nc.obter_indice_extremos(df)
+    rng = np.random.default_rng(1)
+    for _ in range(500):
+        a, b = sorted(rng.integers(0, len(df) + 1, 2))
+        ctx = df.iloc[a:b]
+        exp_hi = ctx['high'].max() if not ctx.empty else np.nan
+        exp_lo = ctx['low'].min() if not ctx.empty else np.nan
+        np.testing.assert_equal(indice.max_high(a, b), exp_hi)
+        np.testing.assert_equal(indice.min_low(a, b), exp_lo)
+
+
+def test_index_is_cached_per_frame():
+    df = _frame(50)
+    assert nc.obter_indice_extremos(df) is nc.obter_indice_extremos(df)
+    assert nc.obter_indice_extremos(df.copy()) is not nc.obter_indice_extremos(df)
+
+
+def test_extended_index_matches_a_rebuild():
+    df = _frame(300, seed=4)
+    indice = nc._RangeExtremaIndex(df['high'].to_numpy()[:1], df['low'].to_numpy()[:1])
+    n = 1
+    for passo in [1] * 70 + [5, 17, 64, 3] + [1] * 40:
+        indice.estender(df['high'].to_numpy()[n:n + passo], df['low'].to_numpy()[n:n + passo])
+        n += passo
+        ref = nc._RangeExtremaIndex(df['high'].to_numpy()[:n], df['low'].to_numpy()[:n])
+        for a in range(0, n, 7):
+            for b in (a + 1, (a + n) // 2 + 1, n):
+                np.testing.assert_equal(indice.max_high(a, b), ref.max_high(a, b))
+                np.testing.assert_equal(indice.min_low(a, b), ref.min_low(a, b))
+    assert indice.n == n
+
+
+def test_artifacts_handed_over_to_an_appended_frame():
+    df = _frame(120, seed=5)
+    anterior = df.iloc[:100]
+    indice, tabela = nc.obter_indice_extremos(anterior), nc.obter_posicoes(anterior)
+    nc._estender_artefatos(anterior, df)
+
+    assert nc.obter_indice_extremos(df) is indice and indice.n == 120
+    assert nc.obter_posicoes(df) is tabela and tabela.get(df.index[110]) == 110
+    np.testing.assert_equal(indice.max_high(90, 120), df['high'].iloc[90:120].max())
+
+
+def _is_head_extreme_slicing(df, head_pivot, lookback_bars, past_only):
+    head_loc = df.index.get_loc(head_pivot['idx'])
+    start = max(0, head_loc - lookback_bars)
+    end = head_loc if past_only else min(len(df), head_loc + lookback_bars + 1)
+    ctx = df.iloc[start:end]
+    if not past_only:
+        ctx = ctx.drop(index=head_pivot['idx'])
+    if ctx.empty:
+        return False
+    if head_pivot['tipo'] == 'PICO':
+        return bool(head_pivot['preco'] > ctx['high'].max())
+    return bool(head_pivot['preco'] < ctx['low'].min())
+
+
+def test_head_extreme_rules_match_slicing(monkeypatch):
+    monkeypatch.setattr(nc.Config, 'HEAD_EXTREME_LOOKBACK_FACTOR', 1)
+    monkeypatch.setattr(nc.Config, 'HEAD_EXTREME_LOOKBACK_MIN_BARS', 8)
+    df = _frame(400, seed=2)
+    rng = np.random.default_rng(3)
+    for pos in rng.integers(0, len(df), 200):
+        tipo = 'PICO' if rng.random() < 0.5 else 'VALE'
+        preco = df['high'].iloc[pos] if tipo == 'PICO' else df['low'].iloc[pos]
+        pivot = {'idx': df.index[pos], 'tipo': tipo, 'preco': preco}
+        avg = int(rng.integers(0, 30))
+        lookback = max(avg, 8)
+        assert bool(nc.is_head_extreme(df, pivot, avg)) == \
+            _is_head_extreme_slicing(df, pivot, lookback, past_only=False)
+        assert bool(nc.is_head_extreme_past_only(df, pivot, avg)) == \
+            _is_head_extreme_slicing(df, pivot, lookback, past_only=True)
+
+
+def test_position_table_lookups():
+    df = _frame(30)
+    tabela = nc.obter_posicoes(df)
+    assert tabela is nc.obter_posicoes(df)
+    assert [tabela.get(ts) for ts in df.index[[0, 7, 29]]] == [0, 7, 29]
+    assert tabela.get(pd.Timestamp('1999-01-01')) is None
+
+    df.index = df.index + pd.Timedelta(hours=1)
+    assert nc.obter_posicoes(df).get(df.index[0]) == 0
+
+
+def test_pivot_positions_drive_validators():
+    df = _frame(200, seed=4).fillna(100.0)
+    pivots = nc.calcular_zigzag_oficial(df, 3, 1.0)
+    assert all(df.index[p['pos']] == p['idx'] for p in pivots)
+    sem_pos = [{k: v for k, v in p.items() if k != 'pos'} for p in pivots]
+    assert nc._distancia_media_pivos(pivots, df) == nc._distancia_media_pivos(sem_pos, df)
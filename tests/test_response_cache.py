@@ -0,0 +1,95 @@
+import pytest
+
+import src.agente.coingeckoToolKit as cg
+import src.agente.fearGreedToolKit as fg
+import src.tools.response_cache as rc
+
+
+class _Relogio:
+    def __init__(self):
+        self.agora = 1_000.0
+
+    def time(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    r = _Relogio()
+    monkeypatch.setattr(rc.time, 'time', r.time)
+    return r
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite'])
+def test_cache_expires_by_endpoint_ttl(backend, tmp_path, relogio):
+    store = rc.MemoryLRUBackend() if backend == 'memory' else rc.SQLiteBackend(str(tmp_path / 'c.sqlite'))
+    cache = rc.ResponseCache(store)
+    chamadas = []
+
+    def fetch():
+        chamadas.append(1)
+        return {'data': [{'value': '42'}]}
+
+    for _ in range(3):
+        assert cache.get_or_fetch('fear_greed', '/fng/', None, fetch) == {'data': [{'value': '42'}]}
+    relogio.agora += 3601
+    cache.get_or_fetch('fear_greed', '/fng/', None, fetch)
+
+    assert len(chamadas) == 2
+    stats = cache.stats()['fear_greed']
+    assert (stats['hits'], stats['misses'], stats['stores']) == (2, 2, 2)
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite'])
+def test_cache_evicts_least_recently_used(backend, tmp_path, relogio):
+    store = rc.MemoryLRUBackend(2) if backend == 'memory' else rc.SQLiteBackend(str(tmp_path / 'c.sqlite'), 2)
+    cache = rc.ResponseCache(store)
+    for coin in ('bitcoin', 'ethereum'):
+        cache.store('coingecko', f'coins/{coin}', {}, {'id': coin})
+        relogio.agora += 1
+    assert cache.get('coingecko', 'coins/bitcoin', {}) == {'id': 'bitcoin'}
+    relogio.agora += 1
+    cache.store('coingecko', 'coins/solana', {}, {'id': 'solana'})
+
+    assert cache.get('coingecko', 'coins/ethereum', {}) is rc.MISS
+    assert cache.get('coingecko', 'coins/bitcoin', {}) == {'id': 'bitcoin'}
+    assert cache.stats()['coingecko']['evictions'] == 1
+    assert cache.stats()['entries'] == 2
+
+
+def test_sqlite_backend_survives_restart(tmp_path):
+    path = str(tmp_path / 'c.sqlite')
+    rc.ResponseCache(rc.SQLiteBackend(path)).store('coingecko', 'coins/list', {}, [{'id': 'bitcoin'}])
+    assert rc.ResponseCache(rc.SQLiteBackend(path)).get('coingecko', 'coins/list', {}) == [{'id': 'bitcoin'}]
+
+
+def test_ttl_rules_and_secret_params():
+    cache = rc.ResponseCache()
+    assert cache.ttl_for('coingecko', 'coins/list', {}) == 86400
+    assert cache.ttl_for('coingecko', 'coins/bitcoin/market_chart', {'days': '1'}) == 60
+    assert cache.ttl_for('coingecko', 'coins/bitcoin/market_chart', {'days': '30'}) == 300
+    assert cache.ttl_for('coingecko', 'coins/bitcoin/market_chart', {'days': '30', 'interval': 'daily'}) == 3600
+    assert cache.ttl_for('coindesk', 'unknown/endpoint', {}) == 0
+    assert 'secret' not in cache.make_key('coindesk', 'news/v1/article/list', {'api_key': 'secret', 'limit': 15})
+
+
+def test_toolkits_serve_repeated_requests_from_cache(monkeypatch, sessao_http):
+    monkeypatch.setenv('COINGECKO_API_KEY', 'test')
+    monkeypatch.setattr(cg, '_COALESCER', cg._RequestCoalescer(ttl_seconds=0))
+    cache = rc.ResponseCache()
+
+    kit = cg.CoinGeckoToolKit(use_proxy=False, cache=cache)
+    kit.session = sessao_http([{'id': 'bitcoin'}])
+    for _ in range(3):
+        kit._make_request('coins/list', {'include_platform': 'false'})
+    assert len(kit.session.chamadas) == 1
+    assert cg.CoinGeckoToolKit.request_stats()['upstream_calls'] == 1
+
+    fear = fg.FearGreedToolKit(cache=cache)
+    fear.session = sessao_http(fg.requests.exceptions.ConnectionError('offline'))
+    assert 'error' in fear._make_request('/fng/')
+    fear.session = sessao_http({'data': [{'value': '10'}]})
+    fear._make_request('/fng/')
+    fear._make_request('/fng/')
+    assert len(fear.session.chamadas) == 1
+    assert cache.stats()['fear_greed']['hits'] == 1
@@ -0,0 +1,127 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http_pool
+import tool_telemetry
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        corpo = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class _KitFalso:
+    def __init__(self, url=None):
+        self.url = url
+
+    @tool_telemetry.instrumented_tool
+    def eco(self, texto: str, repeticoes: int = 1) -> str:
+        """Devolve o texto repetido."""
+        return texto * repeticoes
+
+    @tool_telemetry.instrumented_tool
+    def buscar(self, vezes: int = 1) -> str:
+        for _ in range(vezes):
+            http_pool.get_session().get(self.url, timeout=5)
+        return 'ok'
+
+    @tool_telemetry.instrumented_tool
+    def composta(self) -> str:
+        http_pool.get_session().get(self.url, timeout=5)
+        return self.buscar(vezes=2)
+
+    @tool_telemetry.instrumented_tool
+    def falha(self) -> str:
+        raise ValueError('sem dados')
+
+
+@pytest.fixture
+def servidor():
+    http_pool.reset_sessions()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+    http_pool.reset_sessions()
+
+
+def test_calls_are_recorded_with_counts_hash_and_size():
+    kit = _KitFalso()
+    with tool_telemetry.collect('req-1') as coletor:
+        kit.eco('ab', repeticoes=3)
+        kit.eco('ab', repeticoes=3)
+        kit.eco('zz')
+
+    resumo = coletor.summary()
+    assert resumo['total_calls'] == 3
+    assert resumo['tools'] == {'_KitFalso': {'functions': {'eco': 3}, 'total_calls': 3}}
+    chamadas = resumo['calls']
+    assert [c['bytes_returned'] for c in chamadas] == [6, 6, 2]
+    assert chamadas[0]['args_hash'] == chamadas[1]['args_hash'] != chamadas[2]['args_hash']
+    assert all(c['error'] is None and c['duration_ms'] >= 0 for c in chamadas)
+
+
+def test_wrapper_keeps_metadata_and_is_passthrough_outside_collect():
+    kit = _KitFalso()
+    assert _KitFalso.eco.__name__ == 'eco'
+    assert _KitFalso.eco.__doc__ == 'Devolve o texto repetido.'
+    assert kit.eco('x', 2) == 'xx'
+    assert tool_telemetry.current_collector() is None
+
+
+def test_errors_are_recorded_and_reraised():
+    with tool_telemetry.collect() as coletor:
+        with pytest.raises(ValueError):
+            _KitFalso().falha()
+    chamada = coletor.summary()['calls'][0]
+    assert chamada['function'] == 'falha'
+    assert chamada['error'] == 'ValueError: sem dados'
+
+
+def test_upstream_http_requests_go_to_the_innermost_call(servidor):
+    kit = _KitFalso(servidor)
+    with tool_telemetry.collect() as coletor:
+        kit.buscar(vezes=3)
+        kit.composta()
+    http_pool.get_session().get(servidor, timeout=5)  # outside collect: not attributed
+
+    resumo = coletor.summary()
+    por_funcao = [(c['function'], c['http_requests']) for c in resumo['calls']]
+    assert por_funcao == [('buscar', 3), ('buscar', 2), ('composta', 1)]
+    assert resumo['upstream_http_requests'] == 6
+
+
+def test_concurrent_requests_do_not_share_collectors():
+    kit = _KitFalso()
+    barreira = threading.Barrier(4)
+    resumos = {}
+
+    def analisar(n):
+        with tool_telemetry.collect(f'req-{n}') as coletor:
+            barreira.wait()
+            for _ in range(n):
+                kit.eco('a')
+            barreira.wait()
+        resumos[n] = coletor.summary()
+
+    threads = [threading.Thread(target=analisar, args=(n,)) for n in range(1, 5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert {n: r['total_calls'] for n, r in resumos.items()} == {1: 1, 2: 2, 3: 3, 4: 4}
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.patterns.OCOs.necklineconfirmada as nc
+
+
+def _random_ohlc(seed: int, n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    # Round prices so equal highs/lows (tie-breaking paths) show up regularly
+    close = np.round(close, 1)
+    spread = np.round(np.abs(rng.normal(0, 0.5, n)), 1)
+    high = close + spread
+    low = close - np.round(np.abs(rng.normal(0, 0.5, n)), 1)
+    idx = pd.date_range('2024-01-01', periods=n, freq='H')
+    return pd.DataFrame({'open': close, 'high': high, 'low': low, 'close': close}, index=idx)
+
+
+def _sem_pos(pivots):
+    return [{k: v for k, v in p.items() if k != 'pos'} for p in pivots]
+
+
+def _assert_pos_consistent(df, pivots):
+    assert all(df.index[p['pos']] == p['idx'] for p in pivots)
+
+
+@pytest.mark.parametrize('seed', range(12))
+@pytest.mark.parametrize('extend', [True, False])
+def test_vectorized_zigzag_matches_reference(seed, extend, monkeypatch):
+    monkeypatch.setattr(nc.Config, 'ZIGZAG_EXTEND_TO_LAST_BAR', extend)
+    rng = np.random.default_rng(1000 + seed)
+    df = _random_ohlc(seed, int(rng.integers(5, 600)))
+    for depth, deviation in [(0, 0.5), (1, 1.0), (3, 2.0), (5, 0.0), (12, 3.5), (30, 1.5)]:
+        expected = nc.calcular_zigzag_referencia(df, depth, deviation)
+        got = nc.calcular_zigzag_oficial(df, depth, deviation)
+        assert _sem_pos(got) == _sem_pos(expected), (seed, depth, deviation)
+        _assert_pos_consistent(df, got)
+
+
+def test_vectorized_zigzag_short_frames():
+    df = _random_ohlc(0, 1)
+    assert _sem_pos(nc.calcular_zigzag_oficial(df, 3, 1.0)) == \
+        _sem_pos(nc.calcular_zigzag_referencia(df, 3, 1.0))
+    empty = df.iloc[:0]
+    assert nc.calcular_zigzag_oficial(empty, 3, 1.0) == []
+
+
+def test_zigzag_multiplo_matches_single_runs():
+    df = _random_ohlc(7, 800)
+    pares = [(8, 1.6), (10, 2.8), (8, 3.0), (8, 1.6), (20, 5.0)]
+    lotes = nc.calcular_zigzag_multiplo(df, pares)
+    assert lotes == [nc.calcular_zigzag_oficial(df, d, dev) for d, dev in pares]
+    # Repeated pairs must not share (mutable) pivot dicts
+    assert lotes[0] is not lotes[3] and lotes[0][-1] is not lotes[3][-1]
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('extend', [True, False])
+def test_incremental_zigzag_matches_batch_on_every_bar(seed, extend, monkeypatch):
+    monkeypatch.setattr(nc.Config, 'ZIGZAG_EXTEND_TO_LAST_BAR', extend)
+    df = _random_ohlc(seed, 160)
+    for depth, deviation in [(0, 0.5), (3, 2.0), (12, 3.5)]:
+        seed_bars = 20 * seed
+        zigzag = nc.ZigZagIncremental.a_partir_do_frame(df.iloc[:seed_bars], depth, deviation)
+        assert zigzag.pivots() == nc.calcular_zigzag_oficial(df.iloc[:seed_bars], depth, deviation)
+        for k in range(seed_bars, len(df)):
+            zigzag.atualizar(df.index[k], df['high'].iat[k], df['low'].iat[k])
+            expected = nc.calcular_zigzag_oficial(df.iloc[:k + 1], depth, deviation)
+            assert zigzag.pivots() == expected, (seed, depth, k)
+            confirmados = zigzag.pivos_confirmados()
+            assert confirmados == expected[:len(confirmados)]